@@ -0,0 +1,18 @@
+"""Shared test fixtures."""
+
+import pytest
+
+
+class WordEncoder:
+    """Whitespace tokenizer standing in for tiktoken (no network access in tests)."""
+
+    def encode(self, text: str, **kwargs) -> list[str]:
+        return text.split()
+
+    def decode(self, tokens: list[str]) -> str:
+        return " ".join(tokens)
+
+
+@pytest.fixture
+def word_encoder() -> WordEncoder:
+    return WordEncoder()
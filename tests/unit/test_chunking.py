@@ -0,0 +1,227 @@
+"""Tests for the chunking stage."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from datasets import Dataset, Features
+from yourbench.utils import chunking_utils
+from yourbench.pipeline import chunking
+from yourbench.utils.inference.inference_builders import (
+    build_multi_hop_inference_calls,
+    build_single_shot_inference_calls,
+)
+
+
+def _cfg(**overrides) -> SimpleNamespace:
+    values = {"l_max_tokens": 4, "token_overlap": 1, "encoding_name": "o200k_base", "tokenizer_name": None}
+    return SimpleNamespace(**{**values, **overrides})
+
+
+def test_chunk_text_applies_overlap_and_encoding(word_encoder):
+    with patch.object(chunking_utils.tiktoken, "get_encoding", return_value=word_encoder) as mock_get:
+        chunks = chunking._chunk_text("a b c d e f g", "doc", _cfg())
+
+    mock_get.assert_called_once_with("o200k_base")
+    assert [c["chunk_text"] for c in chunks] == ["a b c d", "d e f g"]
+    assert [c["chunk_id"] for c in chunks] == ["doc_0", "doc_1"]
+
+
+def test_no_window_lies_inside_the_previous_one(word_encoder):
+    with patch.object(chunking_utils.tiktoken, "get_encoding", return_value=word_encoder):
+        words = " ".join(f"w{i}" for i in range(8000))
+        assert len(chunking_utils.split_into_token_chunks(words, chunk_tokens=8192, overlap=512)) == 1
+        assert chunking_utils.split_into_token_chunks("a b c d e f g h i", 4, overlap=1) == [
+            "a b c d",
+            "d e f g",
+            "g h i",
+        ]
+        assert chunking_utils.split_into_token_chunks("", 4, overlap=1) == []
+
+
+def test_overlap_not_below_chunk_size_falls_back_to_half():
+    assert chunking._token_overlap(_cfg(token_overlap=512, l_max_tokens=256)) == 128
+    assert chunking._token_overlap(_cfg(token_overlap=0)) == 0
+    with pytest.raises(ValueError):
+        chunking_utils.split_into_token_chunks("a b", chunk_tokens=2, overlap=2)
+
+
+def test_hf_tokenizer_chunks_are_exact_text_slices():
+    tokenizers = pytest.importorskip("tokenizers")
+    text = "alpha beta,  gamma delta epsilon"
+    vocab = {w: i for i, w in enumerate(["[UNK]", "alpha", "beta", ",", "gamma", "delta", "epsilon"])}
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+
+    with patch.object(chunking_utils, "_get_hf_tokenizer", return_value=tokenizer):
+        chunks = chunking._chunk_text(text, "doc", _cfg(l_max_tokens=3, tokenizer_name="org/model"))
+
+    assert [c["chunk_text"] for c in chunks] == ["alpha beta,", ",  gamma delta", "delta epsilon"]
+
+
+def test_run_writes_chunk_columns_with_explicit_features(word_encoder):
+    dataset = Dataset.from_dict({"document_id": ["a", "b"], "document_text": ["w " * 10, ""]})
+    config = SimpleNamespace(
+        pipeline=SimpleNamespace(chunking=_cfg(h_min=2, h_max=3, num_multihops_factor=1)),
+        hf_configuration=SimpleNamespace(push_to_hub=False),
+    )
+    saved = {}
+
+    def save(dataset, config, subset, **kwargs):
+        saved[subset] = dataset.to_list()
+        saved["features"] = dataset.features
+
+    with (
+        patch.object(chunking_utils.tiktoken, "get_encoding", return_value=word_encoder),
+        patch.object(chunking, "custom_load_dataset", return_value=dataset),
+        patch.object(chunking, "custom_save_dataset", side_effect=save),
+    ):
+        chunking.run(config)
+
+    rows = saved["chunked"]
+    assert [len(row["chunks"]) for row in rows] == [3, 0]
+    assert rows[0]["chunks"][1] == {"chunk_id": "a_1", "chunk_text": "w w w w"}
+    # Multi-hop groups carry their texts unless compact_multihop is set
+    assert rows[0]["multihop_chunks"][0]["chunks_text"]
+    assert rows[1]["multihop_chunks"] == []
+    assert saved["features"] == Features({**dataset.features, **chunking._chunked_features(config.pipeline.chunking)})
+
+
+def test_dedup_marks_repeated_and_boilerplate_chunks():
+    footer = "all rights reserved by the company"
+    dataset = Dataset.from_dict({
+        "document_id": ["a", "b", "c"],
+        "document_text": [f"alpha beta gamma delta\n{footer}", f"{footer}\nalpha beta gamma delta", footer],
+    })
+    cfg = _cfg(l_max_tokens=6, token_overlap=0, h_min=2, h_max=2, num_multihops_factor=1, dedup_chunks=True)
+    config = SimpleNamespace(
+        pipeline=SimpleNamespace(chunking=cfg), hf_configuration=SimpleNamespace(push_to_hub=False)
+    )
+    saved = {}
+
+    def save(dataset, config, subset, **kwargs):
+        saved[subset] = dataset
+
+    with (
+        patch.object(chunking, "split_into_token_chunks", side_effect=lambda text, *args, **kwargs: text.split("\n")),
+        patch.object(chunking, "custom_load_dataset", return_value=dataset),
+        patch.object(chunking, "custom_save_dataset", side_effect=save),
+    ):
+        chunking.run(config)
+
+    result = saved["chunked"]
+    assert chunking._FINGERPRINT_COLUMN not in result.column_names
+    marks = [[(c["chunk_id"], c["duplicate_of"], c["is_boilerplate"]) for c in row] for row in result["chunks"]]
+    assert marks == [
+        [("a_0", None, False), ("a_1", None, True)],
+        [("b_0", "a_1", True), ("b_1", "a_0", False)],
+        [("c_0", "a_1", True)],
+    ]
+
+    stage_cfg = SimpleNamespace(
+        additional_instructions="", single_shot_user_prompt="{title}|{document_summary}|{text_chunk}"
+    )
+    rows = [{**row, "document_summary": ""} for row in result]
+    calls, index_map = build_single_shot_inference_calls(
+        rows, {"role": "system", "content": ""}, stage_cfg, chunking_utils.ChunkSamplingConfig()
+    )
+    assert [entry[2] for entry in index_map] == ["a_0"]
+
+
+def test_num_proc_only_for_large_datasets():
+    assert chunking._num_proc(4, 10) is None
+    assert chunking._num_proc(1, 100_000) is None
+    assert chunking._num_proc(4, 100_000) == 4
+
+
+def test_compact_multihop_groups_resolve_lazily():
+    chunks = [{"chunk_id": f"d_{i}", "chunk_text": f"text {i}"} for i in range(3)]
+    row = {"chunks": chunks, "multihop_chunks": [{"chunk_ids": ["d_0", "d_2"]}, {"chunk_ids": ["d_1", "gone"]}]}
+
+    assert chunking_utils.resolve_multihop_chunks(row) == [
+        {"chunk_ids": ["d_0", "d_2"], "chunks_text": ["text 0", "text 2"]},
+        # A dangling id resolves to no texts rather than misaligned ones
+        {"chunk_ids": ["d_1", "gone"], "chunks_text": []},
+    ]
+
+    expanded = chunking_utils.expand_multihop_chunks(Dataset.from_list([row]))
+    assert expanded[0]["multihop_chunks"][0]["chunks_text"] == ["text 0", "text 2"]
+
+    stage_cfg = SimpleNamespace(
+        additional_instructions="",
+        multi_hop_user_prompt="{title}|{document_summary}|{chunks}|{additional_instructions}",
+    )
+    calls, index_map = build_multi_hop_inference_calls([row], {"role": "system", "content": ""}, stage_cfg)
+    assert len(calls) == 1 and index_map[0][2] == ["d_0", "d_2"]
+    assert "<text_chunk_1>text 2</text_chunk_1>" in calls[0].messages[1]["content"]
+
+
+def test_structural_chunks_follow_headings_and_record_offsets(word_encoder):
+    text = (
+        "# Intro\n\nFirst sentence here. Second one is a bit longer than the first.\n\n"
+        "```python\nx = 1\n\ny = 2\n```\n\n## Details\n\n| a | b |\n|---|---|\n\nFinal words! Really final."
+    )
+    with patch.object(chunking_utils.tiktoken, "get_encoding", return_value=word_encoder):
+        chunks = chunking._chunk_text(text, "doc", _cfg(chunker="structural", l_max_tokens=16, token_overlap=0))
+
+    assert [c["chunk_text"] for c in chunks] == [
+        "# Intro\n\nFirst sentence here. Second one is a bit longer than the first.",
+        "```python\nx = 1\n\ny = 2\n```",
+        "## Details\n\n| a | b |\n|---|---|\n\nFinal words! Really final.",
+    ]
+    assert all(text[c["char_start"] : c["char_end"]] == c["chunk_text"] for c in chunks)
+
+
+def test_structural_chunker_splits_oversized_sentences_with_overlap():
+    text = " ".join(f"w{i}" for i in range(10)) + "."
+    spans = chunking_utils.split_into_structural_chunks(text, 4, lambda t: len(t.split()), overlap=1)
+    assert [text[start:end] for start, end in spans] == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9."]
+
+
+def test_similarity_sampling_groups_topical_chunks_deterministically():
+    texts = [
+        "cats purr and cats nap",
+        "stock markets fell sharply",
+        "cats chase mice at night",
+        "bond markets follow stock prices",
+        "kittens grow into cats",
+        "stock markets rallied on earnings",
+    ]
+    combos = chunking._sample_similar_combinations(texts, 2, 2, 2, "doc")
+
+    assert combos == chunking._sample_similar_combinations(texts, 2, 2, 2, "doc")
+    assert len(combos) == 3
+    topic = ["cats" in text for text in texts]
+    assert all(topic[a] == topic[b] for a, b in combos)
+
+
+def test_similarity_sampling_shares_the_random_sampler_counts():
+    texts = [f"topic {i % 3} note {i} " + " ".join(f"w{i * j}" for j in range(5)) for i in range(30)]
+    combos = chunking._sample_similar_combinations(texts, 2, 4, 3, "doc")
+
+    sizes = [len(combo) for combo in combos]
+    assert sizes == sorted(sizes)
+    assert {size: sizes.count(size) for size in range(2, 5)} == chunking._combination_counts(30, 2, 4, 3)
+    assert len({tuple(combo) for combo in combos}) == len(combos) == 10
+
+
+def test_multihop_sampler_draws_exact_distinct_counts():
+    combos = chunking._sample_multihop_combinations(20_000, 2, 5, 1, "big")
+    assert len(combos) == 20_000
+    assert len({tuple(c) for c in combos}) == 20_000
+    assert all(c == sorted(set(c)) and 0 <= c[0] and c[-1] < 20_000 for c in combos)
+    assert combos == chunking._sample_multihop_combinations(20_000, 2, 5, 1, "big")
+
+    # All 6 chunks form a single combination, so size 5 makes up the rest of the target
+    small = chunking._sample_multihop_combinations(6, 5, 6, 1, "small")
+    assert [len(c) for c in small] == [5] * 5 + [6] and len({tuple(c) for c in small}) == 6
+
+
+def test_multihop_sampler_is_uniform():
+    counts = {}
+    for i in range(3000):
+        (combo,) = chunking._sample_multihop_combinations(6, 2, 2, 6, f"doc{i}")
+        counts[tuple(combo)] = counts.get(tuple(combo), 0) + 1
+    # 15 pairs of 6 chunks, 200 draws each on average
+    assert len(counts) == 15 and min(counts.values()) > 140 and max(counts.values()) < 260
@@ -1,10 +1,17 @@
 import random
 from math import comb
+from types import SimpleNamespace
 from itertools import combinations
 
 import pytest
 
-from yourbench.utils.cross_document_utils import _unrank_comb, _floyd_sample_indices, _sample_exact_combinations
+from datasets import Dataset
+from yourbench.utils.cross_document_utils import (
+    _unrank_comb,
+    _floyd_sample_indices,
+    _sample_exact_combinations,
+    create_cross_document_dataset,
+)
 
 
 def test_comb_basic_cases():
@@ -119,3 +126,39 @@ def test_sample_deterministic_with_seed():
     result1 = _sample_exact_combinations(list(range(20)), k=4, N=5, rng=rng1)
     result2 = _sample_exact_combinations(list(range(20)), k=4, N=5, rng=rng2)
     assert result1 == result2
+
+
+def test_cross_document_resolves_compact_groups():
+    rows = [
+        {
+            "document_id": doc,
+            "document_summary": f"summary {doc}",
+            "chunks": [{"chunk_id": f"{doc}_0", "chunk_text": f"{doc} text"}],
+            "multihop_chunks": [{"chunk_ids": [f"{doc}_0"]}],
+        }
+        for doc in ("a", "b")
+    ]
+    cfg = SimpleNamespace(max_combinations=1, chunks_per_document=1, num_docs_per_combination=[2, 2], random_seed=0)
+
+    cross = create_cross_document_dataset(Dataset.from_list(rows), cfg)
+    group = cross[0]["multihop_chunks"][0]
+    assert sorted(zip(group["chunk_ids"], group["chunks_text"])) == [("a_0", "a text"), ("b_0", "b text")]
+
+
+def test_cross_document_dataset_is_returned():
+    rows = [
+        {
+            "document_id": doc,
+            "document_summary": f"summary {doc}",
+            "chunks": [{"chunk_id": f"{doc}_0", "chunk_text": f"{doc} text"}],
+            "multihop_chunks": [{"chunk_ids": [f"{doc}_0"], "chunks_text": [f"{doc} text"]}],
+        }
+        for doc in ("a", "b", "c")
+    ]
+    cfg = SimpleNamespace(max_combinations=2, chunks_per_document=1, num_docs_per_combination=[2, 2], random_seed=0)
+
+    cross = create_cross_document_dataset(Dataset.from_list(rows), cfg)
+
+    assert isinstance(cross, Dataset)
+    assert len(cross) == 2
+    assert all(row["document_id"].startswith("cross_2docs_") for row in cross)
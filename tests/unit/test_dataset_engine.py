@@ -1,6 +1,7 @@
 """Tests for dataset engine functionality."""
 
 import json
+import shutil
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
@@ -9,9 +10,11 @@ import pytest
 from omegaconf import OmegaConf
 
 from datasets import Dataset, DatasetDict
+from yourbench.utils import dataset_engine
 from yourbench.utils.dataset_engine import (
     _export_to_jsonl,
     _extract_settings,
+    custom_load_dataset,
     custom_save_dataset,
 )
 
@@ -173,3 +176,63 @@ class TestJsonlExport:
 
         row3 = json.loads(lines[2])
         assert row3["text"] == "Ñoño"
+
+
+def _local_config(local_dataset_dir: Path):
+    return OmegaConf.create({
+        "hf_configuration": {
+            "hf_dataset_name": "test_dataset",
+            "hf_organization": "test_org",
+            "local_dataset_dir": str(local_dataset_dir),
+        }
+    })
+
+
+class TestLocalCache:
+    """Test reuse of datasets loaded from local directories."""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        with patch.dict(dataset_engine._LOCAL_CACHE, clear=True):
+            yield
+
+    def test_local_loads_are_cached_until_the_dataset_changes(self, temp_dir, sample_dataset):
+        config = _local_config(temp_dir / "datasets")
+        custom_save_dataset(sample_dataset, config, subset="chunked", push_to_hub=False)
+
+        with patch.object(dataset_engine, "load_from_disk", wraps=dataset_engine.load_from_disk) as mock_load:
+            first = custom_load_dataset(config, subset="chunked")
+            assert custom_load_dataset(config, subset="chunked") is first
+            assert mock_load.call_count == 1
+
+            # Saving another subset invalidates the cache; both subsets are then read from the new files
+            custom_save_dataset(sample_dataset.select([0]), config, subset="questions", push_to_hub=False)
+            assert len(custom_load_dataset(config, subset="questions")) == 1
+            assert custom_load_dataset(config, subset="chunked")["answer"] == ["4", "Paris"]
+
+            # A write by another process is noticed through the changed metadata files
+            calls_before = mock_load.call_count
+            DatasetDict({"chunked": sample_dataset.select([1])}).save_to_disk(str(temp_dir / "datasets"))
+            assert custom_load_dataset(config, subset="chunked")["answer"] == ["Paris"]
+            assert mock_load.call_count == calls_before + 1
+
+    def test_vanished_directories_are_evicted(self, temp_dir, sample_dataset):
+        kept, removed = _local_config(temp_dir / "kept"), _local_config(temp_dir / "removed")
+        custom_save_dataset(sample_dataset, removed, subset="chunked", push_to_hub=False)
+        custom_load_dataset(removed, subset="chunked")
+        shutil.rmtree(temp_dir / "removed")
+
+        custom_save_dataset(sample_dataset, kept, subset="chunked", push_to_hub=False)
+        custom_load_dataset(kept, subset="chunked")
+
+        assert list(dataset_engine._LOCAL_CACHE) == [(temp_dir / "kept").resolve()]
+
+    def test_cache_keeps_only_the_most_recently_used_directories(self, temp_dir, sample_dataset):
+        configs = [_local_config(temp_dir / str(i)) for i in range(3)]
+        with patch.object(dataset_engine, "_LOCAL_CACHE_SIZE", 2):
+            for config in configs:
+                custom_save_dataset(sample_dataset, config, subset="chunked", push_to_hub=False)
+            for config in [configs[0], configs[1], configs[0], configs[2]]:
+                custom_load_dataset(config, subset="chunked")
+
+        assert list(dataset_engine._LOCAL_CACHE) == [(temp_dir / "0").resolve(), (temp_dir / "2").resolve()]
@@ -0,0 +1,145 @@
+"""Tests for MinHash/LSH near-duplicate detection."""
+
+import random
+from unittest.mock import patch
+
+import numpy as np
+
+from yourbench.utils import dedup_utils
+from yourbench.utils.dedup_utils import (
+    _roots,
+    simhash64,
+    exact_hash,
+    _lsh_params,
+    _popcount64,
+    _merge_buckets,
+    shingle_hashes,
+    simhash_clusters,
+    minhash_signature,
+    near_duplicate_clusters,
+)
+
+
+def _random_text(rng: random.Random, n_words: int = 400) -> str:
+    vocab = [f"word{i}" for i in range(5000)]
+    return " ".join(rng.choice(vocab) for _ in range(n_words))
+
+
+def test_shingles_and_signature_shapes():
+    assert len(shingle_hashes("one two three", shingle_size=5)) == 1
+    assert len(shingle_hashes("", shingle_size=5)) == 0
+
+    sig = minhash_signature("the quick brown fox jumps over the lazy dog", num_perm=64)
+    assert sig.shape == (64,)
+    assert np.array_equal(sig, minhash_signature("The quick brown fox, jumps over the lazy dog!", num_perm=64))
+
+
+def test_lsh_params_fit_signature():
+    bands, rows = _lsh_params(0.85, 128)
+    assert bands * rows <= 128
+    assert abs((1 / bands) ** (1 / rows) - 0.85) < 0.05
+
+
+def test_near_duplicates_cluster_to_first_occurrence():
+    rng = random.Random(0)
+    base = _random_text(rng)
+    words = base.split()
+    # Change a single word: Jaccard over 5-shingles stays around 0.97
+    edited = " ".join(words[:200] + ["replaced"] + words[201:])
+    other = _random_text(rng)
+
+    sigs = np.stack([minhash_signature(t) for t in (base, other, edited, base)])
+    reps = near_duplicate_clusters(sigs, threshold=0.85)
+    assert reps.tolist() == [0, 1, 0, 0]
+
+
+def test_dissimilar_documents_are_kept():
+    rng = random.Random(1)
+    sigs = np.stack([minhash_signature(_random_text(rng)) for _ in range(20)])
+    reps = near_duplicate_clusters(sigs, threshold=0.5)
+    assert reps.tolist() == list(range(20))
+
+
+def test_exact_hash_ignores_case_and_punctuation():
+    assert exact_hash("Page 1 of 10 --  Confidential") == exact_hash("page 1 of 10: confidential.")
+    assert exact_hash("page 1 of 10") != exact_hash("page 2 of 10")
+
+
+def test_simhash_clusters_near_duplicates():
+    rng = random.Random(2)
+    base = _random_text(rng, n_words=200)
+    words = base.split()
+    edited = " ".join(words[:100] + ["replaced"] + words[101:])
+    hashes = np.array([simhash64(t) for t in (_random_text(rng), base, edited)], dtype=np.uint64)
+
+    assert bin(int(hashes[1]) ^ int(hashes[2])).count("1") <= 3
+    assert simhash_clusters(hashes, max_distance=3).tolist() == [0, 1, 1]
+    assert simhash_clusters(hashes, max_distance=0).tolist() == [0, 1, 2]
+
+
+def test_simhash_clusters_find_near_duplicates_in_large_corpora():
+    rng = np.random.default_rng(0)
+    n_rows, n_pairs = 200_000, 1000
+    hashes = rng.integers(0, 2**64, size=n_rows, dtype=np.uint64)
+    # Pairs of random rows made 2 bits apart; neither is usually the first row of its band buckets
+    originals, copies = rng.choice(n_rows, size=(2, n_pairs), replace=False)
+    bits = np.stack([rng.choice(64, size=2, replace=False) for _ in range(n_pairs)]).astype(np.uint64)
+    hashes[copies] = hashes[originals] ^ (np.uint64(1) << bits[:, 0]) ^ (np.uint64(1) << bits[:, 1])
+
+    reps = simhash_clusters(hashes, max_distance=3)
+    assert (reps[originals] == reps[copies]).all()
+    assert (reps[copies] == np.minimum(originals, copies)).all()
+
+
+def test_near_duplicates_sharing_a_crowded_band_are_found():
+    rng = np.random.default_rng(3)
+    _, rows = _lsh_params(0.85, 128)
+    signatures = rng.integers(0, 2**31, size=(2000, 128), dtype=np.uint64)
+    pairs = rng.choice(2000, size=(2, 100), replace=False)
+    originals, copies = pairs
+    # Copies differ once in every band but the first (~93% similar), so only that band links them...
+    signatures[copies] = signatures[originals]
+    signatures[copies, rows::rows] += np.uint64(1)
+    # ...and the band is shared with unrelated rows, so a pair rarely comes first in its bucket
+    others = rng.choice(np.setdiff1d(np.arange(2000), pairs), size=200, replace=False)
+    signatures[np.concatenate([others, originals, copies]), :rows] = np.arange(rows, dtype=np.uint64)
+
+    reps = near_duplicate_clusters(signatures, threshold=0.85)
+    assert (reps[originals] == reps[copies]).all()
+    assert (reps[copies] == np.minimum(originals, copies)).all()
+    assert (reps[others] == others).all()
+
+
+def test_bucket_members_are_compared_with_one_leader_at_a_time():
+    compared = []
+
+    def same_parity(i, j):
+        compared.append(len(i))
+        return i % 2 == j % 2
+
+    # One bucket holding two interleaved clusters
+    labels = np.arange(5000)
+    _merge_buckets(labels, np.zeros(5000, dtype=np.int64), same_parity)
+
+    assert (_roots(labels, np.arange(5000)) == np.arange(5000) % 2).all()
+    # 4999 checks against the first leader, then 2499 odd rows against the second
+    assert sum(compared) == 4999 + 2499
+
+
+def test_simhash_buckets_of_near_copies_are_settled_in_one_pass():
+    base = np.uint64(0x0123456789ABCDEF)
+    # Every variant is two bits from the base, so it shares two or more of the four bands with it
+    variants = [base ^ np.uint64((1 << a) | (1 << b)) for a in range(64) for b in range(a + 1, 64)]
+    hashes = np.array([base, *variants], dtype=np.uint64)
+    compared = []
+
+    def popcount(values):
+        compared.append(len(values))
+        return _popcount64(values)
+
+    with patch.object(dedup_utils, "_popcount64", side_effect=popcount):
+        reps = simhash_clusters(hashes, max_distance=3)
+
+    assert (reps == 0).all()
+    # At most one check per row and band, instead of every pair in each band's bucket
+    assert sum(compared) <= 4 * len(hashes)
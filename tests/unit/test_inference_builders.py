@@ -0,0 +1,83 @@
+"""Tests for question generation call builders and their response parsing."""
+
+import json
+from types import SimpleNamespace
+
+from yourbench.utils.chunking_utils import ChunkSamplingConfig
+from yourbench.utils.parsing_engine import parse_single_shot_responses
+from yourbench.utils.inference.inference_builders import build_single_shot_inference_calls
+
+
+def _stage_cfg(**overrides) -> SimpleNamespace:
+    values = {
+        "additional_instructions": "",
+        "question_mode": "open-ended",
+        "single_shot_user_prompt": "{title}|{document_summary}|{text_chunk}",
+        "single_shot_batched_user_prompt": "{title}|{document_summary}|{text_chunks}",
+        "chunks_per_call": 1,
+    }
+    return SimpleNamespace(**{**values, **overrides})
+
+
+def _qa(question: str) -> str:
+    pair = {"question": question, "answer": "Because.", "question_type": "factual", "citations": []}
+    return f"<output_json>{json.dumps([pair])}</output_json>"
+
+
+def test_batched_single_shot_calls_attribute_questions_to_chunks():
+    chunks = [{"chunk_id": f"d_{i}", "chunk_text": f"text {i}"} for i in range(5)]
+    rows = [{"document_id": "d", "document_summary": "S", "chunks": chunks}]
+    system_msg = {"role": "system", "content": "system"}
+    stage_cfg = _stage_cfg(chunks_per_call=2)
+
+    calls, index_map = build_single_shot_inference_calls(rows, system_msg, stage_cfg, ChunkSamplingConfig())
+
+    assert [entry[2] for entry in index_map] == [["d_0", "d_1"], ["d_2", "d_3"], ["d_4"]]
+    assert calls[0].messages[0] is system_msg
+    assert calls[0].messages[1]["content"] == (
+        'doc_0|S|<text_chunk id="1">text 0</text_chunk>\n<text_chunk id="2">text 1</text_chunk>\n'
+    )
+
+    replies = [
+        f'<chunk_output id="2">{_qa("Q1")}</chunk_output><chunk_output id="1">{_qa("Q0")}</chunk_output>',
+        # The model skipped chunk 2 and made up a chunk 3
+        f'<chunk_output id="2">{_qa("Q3")}</chunk_output><chunk_output id="3">{_qa("Q?")}</chunk_output>',
+        f'<chunk_output id="1">{_qa("Q4")}</chunk_output>',
+    ]
+    rows = parse_single_shot_responses({"m": replies}, index_map, stage_cfg)
+
+    assert sorted((row["chunk_id"], row["question"]) for row in rows) == [
+        ("d_0", "Q0"),
+        ("d_1", "Q1"),
+        ("d_3", "Q3"),
+        ("d_4", "Q4"),
+    ]
+
+
+def test_single_chunk_calls_are_unchanged_by_default():
+    rows = [{"document_id": "d", "chunks": [{"chunk_id": "d_0", "chunk_text": "text"}]}]
+    stage_cfg = _stage_cfg()
+
+    calls, index_map = build_single_shot_inference_calls(rows, {}, stage_cfg, ChunkSamplingConfig())
+
+    assert index_map[0][:3] == (0, "d", "d_0")
+    assert calls[0].messages[1]["content"] == "doc_0||text"
+    rows = parse_single_shot_responses({"m": [_qa("Q")]}, index_map, stage_cfg)
+    assert [(row["chunk_id"], row["question"]) for row in rows] == [("d_0", "Q")]
+    assert rows[0]["generation_fingerprint"] == index_map[0][3]
+
+
+def test_fingerprints_ignore_titles_and_summaries():
+    def fingerprints(rows, **overrides):
+        _, index_map = build_single_shot_inference_calls(rows, {}, _stage_cfg(**overrides), ChunkSamplingConfig())
+        return [entry[3] for entry in index_map]
+
+    chunks = [{"chunk_id": "d_0", "chunk_text": "text 0"}, {"chunk_id": "d_1", "chunk_text": "text 1"}]
+    rows = [{"document_id": "d", "document_summary": "S", "chunks": chunks}]
+    rerun = [{"document_id": "e", "document_filename": "e.md", "document_summary": "New summary", "chunks": chunks}]
+
+    assert fingerprints(rows) == fingerprints(rerun)
+    assert fingerprints(rows) != fingerprints(rows, single_shot_user_prompt="{text_chunk}")
+    # Batched calls key every chunk separately
+    (batched,) = fingerprints(rows, chunks_per_call=2)
+    assert len(set(batched)) == 2 and batched == fingerprints(rerun, chunks_per_call=2)[0]
@@ -1,6 +1,8 @@
 import asyncio
+import threading
 from unittest.mock import AsyncMock, patch
 
+from yourbench.utils.inference import inference_core
 from yourbench.utils.inference.inference_core import Model, InferenceCall, _get_response
 
 
@@ -58,3 +60,38 @@ def test_get_response_merges_extra_parameters():
         "metadata": {"trace": True},
     }
     assert sent_kwargs["messages"] == call.messages
+
+
+def test_run_inference_stream_bounds_calls_in_flight():
+    built, done, peak = 0, 0, 0
+
+    threads = set()
+
+    def call_stream():
+        nonlocal built, peak
+        threads.add(threading.current_thread())
+        for i in range(20):
+            built += 1
+            peak = max(peak, built - done)
+            yield InferenceCall(messages=[{"role": "user", "content": str(i)}]), ("doc", i)
+
+    async def fake_response(model, call, semaphore, concurrency_level):
+        nonlocal done
+        async with semaphore:
+            await asyncio.sleep(0.001 * (int(call.messages[0]["content"]) % 3))
+        done += 1
+        return f"{model.model_name}:{call.messages[0]['content']}"
+
+    models = [Model(model_name="m", max_concurrent_requests=2)]
+    with (
+        patch.object(inference_core, "_load_models", return_value=models),
+        patch.object(inference_core, "_retry_with_backoff", side_effect=fake_response),
+    ):
+        responses, index_map = inference_core.run_inference_stream(None, "step", call_stream())
+
+    assert index_map == [("doc", i) for i in range(20)]
+    assert responses == {"m": [f"m:{i}" for i in range(20)]}
+    # Calls are built only as slots free up: 2x the model's concurrency, plus the one being added
+    assert peak <= 5
+    # Calls are built off the event loop thread
+    assert threading.main_thread() not in threads
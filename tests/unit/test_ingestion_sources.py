@@ -0,0 +1,123 @@
+"""Tests for reading ingestion sources: archives and document dumps."""
+
+import io
+import gzip
+import json
+import tarfile
+import zipfile
+from types import SimpleNamespace
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from yourbench.pipeline.ingestion import _discover_files, _iter_documents, _source_extension
+
+
+def _config(extensions: list[str], **overrides) -> SimpleNamespace:
+    ingestion = SimpleNamespace(
+        supported_file_extensions=extensions,
+        llm_ingestion=False,
+        dump_text_field="text",
+        dump_id_field=None,
+    )
+    for key, value in overrides.items():
+        setattr(ingestion, key, value)
+    return SimpleNamespace(pipeline=SimpleNamespace(ingestion=ingestion))
+
+
+def _collect(path: Path, config, processor=None) -> dict[str, tuple[str, str]]:
+    docs = _iter_documents(path, path.parent, config, processor or MagicMock())
+    return {rel.as_posix(): (doc_id, content) for rel, doc_id, content in docs}
+
+
+def test_source_extension_keeps_compound_suffixes():
+    assert _source_extension(Path("a/bundle.TAR.GZ")) == ".tar.gz"
+    assert _source_extension(Path("dump.jsonl.gz")) == ".jsonl.gz"
+    assert _source_extension(Path("notes.v2.md")) == ".md"
+
+
+def test_zip_members_are_dispatched_by_extension(tmp_path):
+    archive = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("docs/a.md", "# Alpha")
+        zf.writestr("docs/b.pdf", b"%PDF-fake")
+        zf.writestr("skip.bin", b"\x00")
+        zf.writestr("../escape.txt", "outside")
+
+    processor = MagicMock()
+    processor.convert_stream.return_value.text_content = "pdf text"
+    docs = _collect(archive, _config([".zip", ".md", ".txt", ".pdf"]), processor)
+
+    assert set(docs) == {"bundle.zip/docs/a.md", "bundle.zip/docs/b.md", "bundle.zip/escape.md"}
+    assert docs["bundle.zip/docs/a.md"][1] == "# Alpha"
+    assert docs["bundle.zip/docs/b.md"][1] == "pdf text"
+    assert processor.convert_stream.call_args.kwargs["file_extension"] == ".pdf"
+
+    # Ids are derived from archive and member name, so they are stable across runs
+    assert docs == _collect(archive, _config([".zip", ".md", ".txt", ".pdf"]), processor)
+
+
+def test_tar_gz_is_streamed(tmp_path):
+    archive = tmp_path / "bundle.tar.gz"
+    with tarfile.open(archive, "w:gz") as tf:
+        data = b"plain text"
+        info = tarfile.TarInfo("x/readme.txt")
+        info.size = len(data)
+        tf.addfile(info, io.BytesIO(data))
+
+    docs = _collect(archive, _config([".tar.gz", ".txt"]))
+    assert [content for _, content in docs.values()] == ["plain text"]
+
+
+def test_archives_are_skipped_unless_supported(tmp_path):
+    archive = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.md", "# Alpha")
+
+    assert _collect(archive, _config([".md"])) == {}
+
+
+def test_jsonl_and_parquet_dumps(tmp_path):
+    records = [{"id": "doc.1", "body": "first"}, {"id": "doc.2", "body": "second"}, {"id": "doc.3"}]
+    jsonl = tmp_path / "dump.jsonl.gz"
+    with gzip.open(jsonl, "wt", encoding="utf-8") as f:
+        f.write("\n".join(json.dumps(r) for r in records) + "\nnot json\n")
+    parquet = tmp_path / "dump.parquet"
+    pq.write_table(pa.Table.from_pylist(records), parquet)
+
+    config = _config([".jsonl.gz", ".parquet"], dump_text_field="body", dump_id_field="id")
+    for path in (jsonl, parquet):
+        docs = _collect(path, config)
+        assert {rel: content for rel, (_, content) in docs.items()} == {
+            f"{path.name}/doc.1.md": "first",
+            f"{path.name}/doc.2.md": "second",
+        }
+
+
+def test_discover_files_prunes_output_and_applies_filters(tmp_path):
+    source = tmp_path / "raw"
+    for rel, size in {
+        "a.md": 10,
+        "notes/output_summary.md": 10,
+        "notes/big.txt": 4096,
+        "drafts/wip.md": 10,
+        "image.png": 10,
+        "processed/a.md": 10,
+    }.items():
+        (source / rel).parent.mkdir(parents=True, exist_ok=True)
+        (source / rel).write_text("x" * size)
+
+    config = _config(
+        [".md", ".txt"], include_patterns=[], exclude_patterns=["drafts"], max_file_size_mb=1 / 1024
+    ).pipeline.ingestion
+    files = _discover_files(source, source / "processed", config)
+
+    # "output" in a file name no longer causes it to be skipped
+    assert [f.relative_to(source).as_posix() for f in files] == ["a.md", "notes/output_summary.md"]
+
+    config.include_patterns = ["notes/*"]
+    config.max_file_size_mb = None
+    files = _discover_files(source, source / "processed", config)
+    assert [f.relative_to(source).as_posix() for f in files] == ["notes/big.txt", "notes/output_summary.md"]
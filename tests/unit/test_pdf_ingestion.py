@@ -0,0 +1,203 @@
+"""Tests for the LLM-based PDF ingestion helpers."""
+
+import io
+import base64
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import fitz
+from PIL import Image
+
+from yourbench.pipeline.ingestion import (
+    _encode_image,
+    _iter_pdf_images,
+    _process_pdf_llm,
+    _process_pdfs_llm,
+    _usable_text_layer,
+)
+from yourbench.utils.inference.inference_core import Model
+
+
+def _make_pdf(path, num_pages: int = 2) -> None:
+    with fitz.open() as doc:
+        for i in range(num_pages):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page {i} has a perfectly ordinary text layer.")
+        doc.save(path)
+
+
+def _decode(url: str) -> Image.Image:
+    return Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1])))
+
+
+def test_iter_pdf_images_caps_long_edge_and_grayscales_text_pages(tmp_path):
+    pdf_path = tmp_path / "doc.pdf"
+    _make_pdf(pdf_path)
+
+    images = [image for _, image in _iter_pdf_images(pdf_path, dpi=300, max_edge=800, grayscale_text_pages=True)]
+
+    assert len(images) == 2
+    assert all(max(img.size) <= 800 for img in images)
+    assert all(img.mode == "L" for img in images)
+
+
+def test_iter_pdf_images_defaults_keep_dpi_and_color(tmp_path):
+    pdf_path = tmp_path / "doc.pdf"
+    _make_pdf(pdf_path, num_pages=1)
+
+    ((_, image),) = _iter_pdf_images(pdf_path, dpi=72)
+
+    assert image.mode == "RGB"
+    assert image.size == (595, 842)
+
+
+def test_encode_image_uses_configured_format(tmp_path):
+    image = Image.new("RGBA", (64, 32), "white")
+
+    for image_format, pil_format in [("png", "PNG"), ("jpeg", "JPEG"), ("webp", "WEBP")]:
+        cfg = SimpleNamespace(pdf_image_format=image_format, pdf_image_quality=70)
+        url = _encode_image(image, cfg)
+
+        assert url.startswith(f"data:image/{image_format};base64,")
+        assert _decode(url).format == pil_format
+
+
+def _fake_stream(reply, sent_calls: list | None = None):
+    """Fake `run_inference_stream` answering each page call with `reply(call)`."""
+
+    def run_inference_stream(config, step_name, call_stream):
+        calls, entries = [], []
+        for call, entry in call_stream:
+            calls.append(call)
+            entries.append(entry)
+        if sent_calls is not None:
+            sent_calls.append(calls)
+        return {"vision-model": [reply(call) for call in calls]}, entries
+
+    return run_inference_stream
+
+
+def _routing_config(**overrides):
+    ingestion = {
+        "pdf_dpi": 72,
+        "pdf_llm_prompt": "Convert this page.",
+        "pdf_image_format": "png",
+        "pdf_image_quality": 85,
+        "pdf_text_layer_routing": True,
+        **overrides,
+    }
+    return SimpleNamespace(pipeline=SimpleNamespace(ingestion=SimpleNamespace(**ingestion)))
+
+
+def test_text_layer_routing_only_sends_pages_without_text(tmp_path):
+    pdf_path = tmp_path / "mixed.pdf"
+    with fitz.open() as doc:
+        text_page = doc.new_page()
+        for line in range(40):
+            text_page.insert_text((72, 72 + 14 * line), f"Line {line} of a digital page with a real text layer.")
+        doc.new_page()  # scanned-like page: no text layer
+        doc.save(pdf_path)
+
+    sent_calls = []
+
+    with (
+        patch("yourbench.pipeline.ingestion._load_models", return_value=[Model("vision-model")]),
+        patch("yourbench.pipeline.ingestion.run_inference_stream", _fake_stream(lambda call: "LLM page", sent_calls)),
+    ):
+        content = _process_pdf_llm(pdf_path, _routing_config())
+
+    ((call,),) = sent_calls
+    assert "page_2" in call.tags
+    first, second = content.split("\n\n---\n\n")
+    assert first.startswith("Line 0 of a digital page")
+    assert second == "LLM page"
+
+
+def test_text_layer_routing_rejects_sparse_text(tmp_path):
+    pdf_path = tmp_path / "sparse.pdf"
+    _make_pdf(pdf_path, num_pages=1)
+
+    with fitz.open(pdf_path) as doc:
+        assert _usable_text_layer(doc[0], _routing_config().pipeline.ingestion) is None
+        dense_enough = _routing_config(pdf_text_min_char_density=0.1).pipeline.ingestion
+        assert _usable_text_layer(doc[0], dense_enough).startswith("Page 0")
+
+
+def test_pages_from_all_pdfs_share_one_inference_run(tmp_path):
+    small, large = tmp_path / "small.pdf", tmp_path / "large.pdf"
+    _make_pdf(small, num_pages=1)
+    _make_pdf(large, num_pages=3)
+
+    def reply(call):
+        # The second page of large.pdf fails
+        return "" if {"large.pdf", "page_2"} <= set(call.tags) else "ok"
+
+    sent_calls = []
+    with (
+        patch("yourbench.pipeline.ingestion._load_models", return_value=[Model("vision-model")]),
+        patch("yourbench.pipeline.ingestion.run_inference_stream", _fake_stream(reply, sent_calls)),
+    ):
+        results = _process_pdfs_llm([small, large], _routing_config(pdf_text_layer_routing=False))
+
+    assert [len(calls) for calls in sent_calls] == [4]
+    assert results == {small: "ok", large: None}
+
+
+def test_pages_are_encoded_in_workers_a_few_pages_ahead(tmp_path):
+    pdf_path = tmp_path / "doc.pdf"
+    _make_pdf(pdf_path, num_pages=8)
+    encoded = []
+
+    def encode(image, ingestion_config):
+        encoded.append(threading.current_thread())
+        return "data:image/png;base64,"
+
+    def run_inference_stream(config, step_name, call_stream):
+        entries = []
+        for position, (_, entry) in enumerate(call_stream):
+            # One page per worker is prefetched beyond the one handed over
+            assert len(encoded) <= position + 3
+            entries.append(entry)
+        return {"vision-model": ["ok"] * len(entries)}, entries
+
+    with (
+        patch("yourbench.pipeline.ingestion._load_models", return_value=[Model("vision-model")]),
+        patch("yourbench.pipeline.ingestion.os.cpu_count", return_value=2),
+        patch("yourbench.pipeline.ingestion._encode_image", side_effect=encode),
+        patch("yourbench.pipeline.ingestion.run_inference_stream", side_effect=run_inference_stream),
+    ):
+        content = _process_pdf_llm(pdf_path, _routing_config(pdf_text_layer_routing=False))
+
+    assert threading.main_thread() not in encoded
+    assert content == "\n\n---\n\n".join(["ok"] * 8)
+
+
+def test_page_cache_skips_unchanged_pages(tmp_path):
+    pdf_path = tmp_path / "doc.pdf"
+    _make_pdf(pdf_path, num_pages=2)
+    config = _routing_config(pdf_text_layer_routing=False, pdf_llm_cache_dir=str(tmp_path / "cache"))
+
+    sent_calls = []
+
+    with (
+        patch("yourbench.pipeline.ingestion._load_models", return_value=[Model("vision-model")]),
+        patch(
+            "yourbench.pipeline.ingestion.run_inference_stream",
+            _fake_stream(lambda call: f"LLM {call.tags[1]}", sent_calls),
+        ),
+    ):
+        first = _process_pdf_llm(pdf_path, config)
+        second = _process_pdf_llm(pdf_path, config)
+
+        config.pipeline.ingestion.pdf_llm_prompt = "A different prompt."
+        _process_pdf_llm(pdf_path, config)
+
+        config.pipeline.ingestion.pdf_llm_prompt = "Convert this page."
+        config.pipeline.ingestion.pdf_image_format = "jpeg"
+        _process_pdf_llm(pdf_path, config)
+        config.pipeline.ingestion.pdf_image_quality = 30
+        _process_pdf_llm(pdf_path, config)
+
+    assert first == second == "LLM page_1\n\n---\n\nLLM page_2"
+    assert [len(calls) for calls in sent_calls] == [2, 0, 2, 2, 2]
@@ -0,0 +1,129 @@
+"""Tests for incremental question generation."""
+
+import json
+from unittest.mock import patch
+
+from datasets import Dataset
+from yourbench.conf.schema import ModelConfig, YourbenchConfig
+from yourbench.utils.dataset_engine import custom_load_dataset, custom_save_dataset
+from yourbench.pipeline.question_generation import _core
+
+
+def _config() -> YourbenchConfig:
+    config = YourbenchConfig(model_list=[ModelConfig(model_name="m")])
+    stage_cfg = config.pipeline.single_shot_question_generation
+    stage_cfg.run = True
+    stage_cfg.incremental = True
+    stage_cfg.single_shot_system_prompt = "system"
+    stage_cfg.single_shot_user_prompt = "{title} {document_summary} {text_chunk}"
+    return config
+
+
+def _chunked(texts: dict[str, list[str]], summary: str = "S") -> Dataset:
+    return Dataset.from_list([
+        {
+            "document_id": doc_id,
+            "document_summary": summary,
+            "chunks": [{"chunk_id": f"{doc_id}_{i}", "chunk_text": text} for i, text in enumerate(chunk_texts)],
+        }
+        for doc_id, chunk_texts in texts.items()
+    ])
+
+
+def _inference(prompts: list[str]):
+    """Fake `run_inference` answering one question about the last word of each prompt."""
+
+    def inference(config, step_name, inference_calls):
+        replies = []
+        for call in inference_calls:
+            text = call.messages[-1]["content"].split()[-1]
+            prompts.append(text)
+            pair = {"question": f"About {text}?", "answer": "Because.", "question_type": "factual"}
+            replies.append(f"<output_json>{json.dumps([pair])}</output_json>")
+        return {"m": replies}
+
+    return inference
+
+
+def _run(config, chunked: Dataset, existing: Dataset | None) -> tuple[list[str], list[dict]]:
+    """Run single-shot generation; return the chunk texts sent to the model and the saved rows."""
+    prompts, saved = [], []
+
+    def load(config, subset):
+        if subset == "chunked":
+            return chunked
+        if existing is None:
+            raise FileNotFoundError(subset)
+        return existing
+
+    with (
+        patch.object(_core, "custom_load_dataset", side_effect=load),
+        patch.object(_core, "run_inference", side_effect=_inference(prompts)),
+        patch.object(_core, "custom_save_dataset", side_effect=lambda dataset, **kwargs: saved.extend(dataset)),
+    ):
+        _core.run_single_shot(config)
+    return prompts, saved
+
+
+def test_incremental_run_only_generates_for_new_or_changed_chunks():
+    config = _config()
+    prompts, saved = _run(config, _chunked({"a": ["alpha", "beta"], "b": ["gamma"]}), None)
+    assert prompts == ["alpha", "beta", "gamma"]
+
+    # Chunk a_1 changed and document c is new; b was removed
+    prompts, merged = _run(config, _chunked({"a": ["alpha", "delta"], "c": ["omega"]}), Dataset.from_list(saved))
+    assert prompts == ["delta", "omega"]
+    assert sorted(row["question"] for row in merged) == ["About alpha?", "About delta?", "About omega?"]
+
+    # Nothing changed: no calls and nothing saved
+    prompts, unchanged = _run(config, _chunked({"a": ["alpha", "delta"], "c": ["omega"]}), Dataset.from_list(merged))
+    assert prompts == [] and unchanged == []
+
+
+def test_reused_questions_follow_new_document_ids_and_summaries():
+    config = _config()
+    _, saved = _run(config, _chunked({"a": ["alpha", "beta"]}), None)
+
+    # Re-ingestion gives the document a new id, and summarization a new summary
+    prompts, merged = _run(config, _chunked({"a-new": ["alpha", "beta", "gamma"]}, "S2"), Dataset.from_list(saved))
+
+    assert prompts == ["gamma"]
+    assert sorted((row["question"], row["document_id"], row["chunk_id"]) for row in merged) == [
+        ("About alpha?", "a-new", "a-new_0"),
+        ("About beta?", "a-new", "a-new_1"),
+        ("About gamma?", "a-new", "a-new_2"),
+    ]
+
+
+def test_incremental_run_does_not_duplicate_questions_when_concatenating(tmp_path, monkeypatch):
+    monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+    config = _config()
+    config.hf_configuration.hf_dataset_name = "incremental"
+    config.hf_configuration.local_dataset_dir = str(tmp_path)
+    config.hf_configuration.concat_if_exist = True
+    config.hf_configuration.push_to_hub = False
+
+    prompts = []
+    for texts in ({"a": ["alpha", "beta"]}, {"a": ["alpha", "delta"], "b": ["gamma"]}):
+        custom_save_dataset(_chunked(texts), config=config, subset="chunked", push_to_hub=False, overwrite=True)
+        with patch.object(_core, "run_inference", side_effect=_inference(prompts)):
+            _core.run_single_shot(config)
+
+    assert prompts == ["alpha", "beta", "delta", "gamma"]
+    saved = custom_load_dataset(config=config, subset="single_shot_questions")
+    assert sorted(saved["question"]) == ["About alpha?", "About delta?", "About gamma?"]
+
+
+def test_reused_multi_hop_questions_point_at_current_chunk_ids():
+    previous = [
+        {"generation_fingerprint": "f", "generating_model": "m", "document_id": "a", "source_chunk_ids": ["a_0"]}
+    ]
+    reused = {}
+    pairs = [(None, (0, "a-new", ["a-new_0", "a-new_1"], "f")), (None, (0, "a-new", ["a-new_2"], "g"))]
+
+    remaining = list(_core._skip_answered_calls(pairs, previous, ["m"], reused))
+
+    assert remaining == pairs[1:]
+    assert _core._relink_reused_rows(previous, reused) == [
+        {**previous[0], "document_id": "a-new", "source_chunk_ids": ["a-new_0", "a-new_1"]}
+    ]
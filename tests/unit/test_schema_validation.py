@@ -43,6 +43,10 @@ class TestChunkingConfig:
         with pytest.raises(ValidationError, match="h_max.*must be >= h_min"):
             ChunkingConfig(h_min=5, h_max=2)
 
+    def test_invalid_chunker(self):
+        with pytest.raises(ValidationError, match="chunker must be"):
+            ChunkingConfig(chunker="semantic")
+
 
 class TestCrossDocConfig:
     def test_valid_config(self):
@@ -0,0 +1,27 @@
+"""Tests for chunk embeddings and nearest-neighbour search."""
+
+import numpy as np
+
+from yourbench.utils.similarity_utils import nearest_neighbors, hashed_tfidf_vectors, approximate_neighbors
+
+
+def test_hashed_tfidf_vectors_are_normalized_and_topical():
+    vectors = hashed_tfidf_vectors(["the cat sat on the mat", "a cat on a mat", "quantum field theory", ""])
+    sims = vectors @ vectors.T
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1) and not vectors[3].any()
+    assert sims[0, 1] > 0.3 and abs(sims[0, 2]) < 1e-9
+
+
+def test_exact_and_approximate_neighbors_find_cluster_mates():
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 20, 3000)
+    vectors = rng.standard_normal((20, 32))[labels] + 0.2 * rng.standard_normal((3000, 32))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    exact = nearest_neighbors(vectors, 4)
+    approx = approximate_neighbors(vectors, 4, np.random.default_rng(1))
+
+    assert exact.shape == approx.shape == (3000, 4)
+    assert not (exact == np.arange(3000)[:, None]).any() and not (approx == np.arange(3000)[:, None]).any()
+    assert (labels[exact] == labels[:, None]).all()
+    assert (labels[approx] == labels[:, None]).mean() > 0.95
@@ -0,0 +1,106 @@
+"""Tests for the streaming pipeline mode."""
+
+import json
+import asyncio
+from unittest.mock import patch
+
+from datasets import Dataset
+from yourbench.pipeline import handler, chunking, streaming, summarization
+from yourbench.conf.schema import ModelConfig, YourbenchConfig
+from yourbench.utils.inference.inference_core import Model, InferenceCall, run_inference_with_semaphores
+
+
+def _make_config() -> YourbenchConfig:
+    config = YourbenchConfig(model_list=[ModelConfig(model_name="m")], streaming=True)
+    pipeline = config.pipeline
+    for stage in ("summarization", "chunking", "single_shot_question_generation", "prepare_lighteval"):
+        getattr(pipeline, stage).run = True
+    pipeline.summarization.max_tokens = 4
+    pipeline.summarization.token_overlap = 0
+    pipeline.summarization.summarization_user_prompt = "{document}"
+    pipeline.summarization.combine_summaries_user_prompt = "{chunk_summaries}"
+    pipeline.chunking.l_max_tokens = 8
+    pipeline.single_shot_question_generation.single_shot_system_prompt = "system"
+    pipeline.single_shot_question_generation.single_shot_user_prompt = "{title} {document_summary} {text_chunk}"
+    return config
+
+
+def test_streaming_replaces_covered_stages():
+    config = _make_config()
+    enabled = ["ingestion", "summarization", "chunking", "single_shot_question_generation", "prepare_lighteval"]
+    assert handler._apply_streaming(config, enabled) == ["ingestion", "streaming", "prepare_lighteval"]
+
+    config.streaming = False
+    assert handler._apply_streaming(config, enabled) == enabled
+
+
+def test_shared_semaphores_bound_concurrency():
+    in_flight, peak = 0, 0
+
+    async def fake_response(model, call, semaphore, concurrency_level):
+        nonlocal in_flight, peak
+        async with semaphore:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+        return call.messages[0]["content"]
+
+    async def run_batches():
+        models = [Model(model_name="m", max_concurrent_requests=2)]
+        semaphores = streaming.create_model_semaphores(models)
+        batches = [
+            [InferenceCall(messages=[{"role": "user", "content": f"{b}-{i}"}]) for i in range(3)] for b in range(3)
+        ]
+        return await asyncio.gather(
+            *(run_inference_with_semaphores(models, "s", calls, semaphores) for calls in batches)
+        )
+
+    with patch("yourbench.utils.inference.inference_core._retry_with_backoff", side_effect=fake_response):
+        results = asyncio.run(run_batches())
+
+    assert peak == 2
+    assert results[1] == {"m": ["1-0", "1-1", "1-2"]}
+
+
+def test_run_streams_documents_through_all_stages(word_encoder):
+    config = _make_config()
+    dataset = Dataset.from_dict({
+        "document_id": ["a", "b"],
+        "document_filename": ["a.md", "b.md"],
+        "document_text": ["short doc", "one two three four five six"],
+    })
+    saved = {}
+
+    async def fake_inference(models, step_name, calls, semaphores):
+        replies = []
+        for call in calls:
+            content = call.messages[-1]["content"]
+            if step_name == "summarization":
+                replies.append(f"<final_summary>S({content})</final_summary>")
+            else:
+                qa = [{"question": f"Q {content}?", "answer": "A", "citations": []}]
+                replies.append(f"<output_json>{json.dumps(qa)}</output_json>")
+        return {"m": replies}
+
+    def save(dataset, config, subset, **kwargs):
+        saved[subset] = dataset
+
+    with (
+        patch.object(summarization, "_get_encoder", return_value=word_encoder),
+        patch.object(chunking, "split_into_token_chunks", side_effect=lambda text, max_tokens, **kwargs: [text]),
+        patch.object(streaming, "custom_load_dataset", return_value=dataset),
+        patch.object(streaming, "custom_save_dataset", side_effect=save),
+        patch.object(streaming, "run_inference_with_semaphores", side_effect=fake_inference),
+        patch.object(streaming, "_save_questions") as mock_save_questions,
+    ):
+        streaming.run(config)
+
+    assert list(saved["summarized"]["document_summary"]) == [
+        "S(short doc)",
+        "S(- S(one two three four)\n- S(five six))",
+    ]
+    assert [chunks[0]["chunk_id"] for chunks in saved["chunked"]["chunks"]] == ["a_0", "b_0"]
+    rows, _, subset = mock_save_questions.call_args.args
+    assert subset == "single_shot_questions"
+    assert [row["document_id"] for row in rows] == ["a", "b"]
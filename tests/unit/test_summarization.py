@@ -0,0 +1,123 @@
+"""Tests for summarization call building."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from datasets import Dataset
+from yourbench.pipeline import summarization
+
+
+@pytest.fixture(autouse=True)
+def patch_encoder(word_encoder):
+    with patch.object(summarization, "_get_encoder", return_value=word_encoder):
+        yield
+
+
+def test_build_calls_splits_only_long_documents():
+    long_doc = " ".join(f"w{i}" for i in range(10))
+    dataset = Dataset.from_dict({"document_text": ["short doc", long_doc]})
+
+    calls, mapping, packs = summarization._build_calls(dataset, 4, 1, "words", "{document}", num_proc=1)
+
+    assert mapping == [(0, -1), (1, 0), (1, 1), (1, 2)] and packs == []
+    assert [c.messages[0]["content"] for c in calls[1:]] == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"]
+
+
+def test_split_documents_tokenizes_each_document_once(word_encoder):
+    with patch.object(word_encoder, "encode", wraps=word_encoder.encode) as mock_encode:
+        summarization._split_documents(["a b c d e f", "a b"], 4, 0, "words", num_proc=1)
+    assert mock_encode.call_count == 2
+
+
+def test_batch_summaries_respects_budget_and_shrinks():
+    summaries = ["a b c", "d e f", "g h i", "j k l", "m n o"]
+    batches = summarization._batch_summaries(summaries, summarization._get_encoder("words"), 6)
+    assert batches == [["a b c", "d e f"], ["g h i", "j k l", "m n o"]]
+
+    # An oversized summary still gets a partner so every batch reduces the count
+    assert summarization._batch_summaries(["a b c d e f g", "h"], summarization._get_encoder("words"), 3) == [
+        ["a b c d e f g", "h"]
+    ]
+
+
+def test_tree_reduce_runs_one_inference_per_level():
+    chunks_by_doc = [["s1", "s2", "s3", "s4"], ["only"], ["x", "y"], ["lost", "too"]]
+    seen_levels = []
+
+    def fake_inference(config, step_name, inference_calls):
+        seen_levels.append(len(inference_calls))
+        replies = []
+        for call in inference_calls:
+            content = call.messages[0]["content"]
+            if "lost" in content:
+                replies.append("")
+            else:
+                replies.append(
+                    "<final_summary>" + "+".join(line[2:] for line in content.splitlines()) + "</final_summary>"
+                )
+        return {"model": replies}
+
+    with patch.object(summarization, "run_inference", side_effect=fake_inference):
+        final = summarization._tree_reduce(None, chunks_by_doc, "{chunk_summaries}", 2, "words")
+
+    assert seen_levels == [4, 1]
+    assert final == ["s1+s2+s3+s4", "only", "x+y", "No summary available."]
+
+
+def test_pack_documents_first_fit_decreasing():
+    packs = summarization._pack_documents([3, 5, None, 2, 9, 4, 1], 8)
+    # Document 2 needs chunking and document 4 exceeds the budget, so neither is packed
+    assert packs == [[0, 1], [3, 5, 6]]
+
+
+def test_packed_calls_parse_and_fall_back_to_single_calls():
+    texts = ["faq one", "faq two", "faq three", " ".join(["long"] * 20)]
+    dataset = Dataset.from_dict({"document_text": texts})
+
+    calls, mapping, packs = summarization._build_calls(
+        dataset, 10, 0, "words", "{document}", num_proc=1, pack_max_tokens=6, packed_prompt="{documents}"
+    )
+    assert packs == [[0, 1, 2]]
+    assert [doc for doc, _ in mapping] == [3, 3]
+    assert calls[-1].tags == ["packed_summary"] and '<document id="3">\nfaq three' in calls[-1].messages[0]["content"]
+
+    packed_reply = (
+        '<document_summary id="1">One.</document_summary>\n<document_summary id="3">Three.</document_summary>'
+    )
+    responses = {"model": ["<final_summary>L1</final_summary>", "<final_summary>L2</final_summary>", packed_reply]}
+    _, chunks_by_doc = summarization._parse_chunk_responses(responses, mapping, len(texts), packs)
+    assert chunks_by_doc == [["One."], [], ["Three."], ["L1", "L2"]]
+
+    retry = {"model": ["<final_summary>Two.</final_summary>"]}
+    with patch.object(summarization, "run_inference", return_value=retry) as mock_inference:
+        summarization._retry_unparsed_packs(None, dataset, chunks_by_doc, packs, "{document}")
+    assert mock_inference.call_args.kwargs["inference_calls"][0].messages[0]["content"] == "faq two"
+    assert chunks_by_doc[1] == ["Two."]
+
+
+def test_extractive_mode_needs_no_inference():
+    text = (
+        "Cats are small mammals. Cats like fish and cats sleep a lot.\n"
+        "The weather is nice. Dogs and cats are pets! Unrelated sentence about taxes?"
+    )
+    config = SimpleNamespace(
+        pipeline=SimpleNamespace(
+            summarization=SimpleNamespace(mode="extractive", encoding_name="words", extractive_max_tokens=9)
+        ),
+        hf_configuration=SimpleNamespace(push_to_hub=False),
+    )
+
+    with (
+        patch.object(summarization, "custom_load_dataset", return_value=Dataset.from_dict({"document_text": [text]})),
+        patch.object(summarization, "custom_save_dataset") as mock_save,
+        patch.object(summarization, "run_inference") as mock_inference,
+    ):
+        summarization.run(config)
+
+    mock_inference.assert_not_called()
+    saved = mock_save.call_args.kwargs["dataset"]
+    # The two most central sentences within budget, in document order
+    assert saved["document_summary"] == ["Cats are small mammals. Dogs and cats are pets!"]
+    assert saved["summarization_model"] == ["extractive"]
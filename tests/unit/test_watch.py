@@ -0,0 +1,96 @@
+"""Tests for watch mode delta runs."""
+
+from unittest.mock import patch
+
+from datasets import Dataset, load_from_disk
+from yourbench.utils import dataset_engine
+from yourbench.conf.schema import YourbenchConfig
+from yourbench.pipeline.watch import _sync, snapshot, run_delta, changed_files
+from yourbench.utils.dataset_engine import custom_load_dataset, custom_save_dataset
+
+
+def _config(tmp_path) -> YourbenchConfig:
+    return YourbenchConfig.model_validate({
+        "hf_configuration": {
+            "hf_dataset_name": "watch-test",
+            "local_dataset_dir": str(tmp_path / "dataset"),
+            "push_to_hub": False,
+        },
+        "pipeline": {
+            "ingestion": {
+                "run": True,
+                "source_documents_dir": str(tmp_path / "raw"),
+                "output_dir": str(tmp_path / "raw" / "processed"),
+            }
+        },
+    })
+
+
+def test_snapshot_and_changed_files(tmp_path):
+    config = _config(tmp_path)
+    (tmp_path / "raw" / "processed").mkdir(parents=True)
+    (tmp_path / "raw" / "a.md").write_text("alpha")
+    (tmp_path / "raw" / "processed" / "a.md").write_text("alpha")
+
+    first = snapshot(config)
+    assert list(first) == ["a.md"]
+
+    (tmp_path / "raw" / "b[1].md").write_text("beta")
+    (tmp_path / "raw" / "a.md").write_text("alpha, edited")
+    assert changed_files(first, snapshot(config)) == ["a.md", "b[1].md"]
+
+
+def test_run_delta_appends_to_existing_dataset(tmp_path):
+    config = _config(tmp_path)
+    custom_save_dataset(Dataset.from_dict({"document_id": ["old"]}), config, subset="ingested", push_to_hub=False)
+
+    seen_patterns = []
+
+    def fake_stage(stage, delta):
+        seen_patterns.extend(delta.pipeline.ingestion.include_patterns)
+        custom_save_dataset(Dataset.from_dict({"document_id": ["new"]}), delta, subset="ingested", push_to_hub=False)
+        custom_load_dataset(delta, subset="ingested")
+        return 0.0
+
+    with patch("yourbench.pipeline.watch.run_stage", side_effect=fake_stage):
+        run_delta(config, ["b[1].md"])
+
+    assert seen_patterns == ["b[[]1].md"]
+    assert load_from_disk(str(tmp_path / "dataset"))["ingested"]["document_id"] == ["old", "new"]
+    # The scratch directory of the delta is not kept in the local dataset cache
+    assert not any(path.name.startswith("yourbench_watch_") for path in dataset_engine._LOCAL_CACHE)
+
+
+def test_run_delta_stops_when_ingestion_writes_nothing(tmp_path):
+    config = _config(tmp_path)
+    config.pipeline.summarization.run = True
+    stages = []
+
+    def fake_stage(stage, delta):
+        stages.append(stage)
+        return 0.0
+
+    with (
+        patch("yourbench.pipeline.watch.run_stage", side_effect=fake_stage),
+        patch("yourbench.pipeline.watch.custom_save_dataset") as mock_save,
+    ):
+        run_delta(config, ["empty.md"])
+
+    assert stages == ["ingestion"]
+    mock_save.assert_not_called()
+
+
+def test_failed_delta_keeps_previous_state(tmp_path):
+    config = _config(tmp_path)
+    (tmp_path / "raw").mkdir()
+    (tmp_path / "raw" / "a.md").write_text("alpha")
+    state_path = tmp_path / "state.json"
+
+    with patch("yourbench.pipeline.watch.run_delta", side_effect=RuntimeError("boom")):
+        assert _sync(config, {}, state_path) == {}
+    assert not state_path.exists()
+
+    with patch("yourbench.pipeline.watch.run_delta") as mock_delta:
+        state = _sync(config, {}, state_path)
+    mock_delta.assert_called_once_with(config, ["a.md"])
+    assert list(state) == ["a.md"] and state_path.exists()
@@ -37,12 +37,17 @@ PROMPT_FIELDS = [
     (("pipeline", "ingestion", "pdf_llm_prompt"), "pdf_llm_prompt"),
     (("pipeline", "summarization", "summarization_user_prompt"), "summarization_user_prompt"),
     (("pipeline", "summarization", "combine_summaries_user_prompt"), "combine_summaries_user_prompt"),
+    (("pipeline", "summarization", "packed_summarization_user_prompt"), "packed_summarization_user_prompt"),
     (("pipeline", "single_shot_question_generation", "single_shot_system_prompt"), "single_shot_system_prompt"),
     (
         ("pipeline", "single_shot_question_generation", "single_shot_system_prompt_multi"),
         "single_shot_system_prompt_multi",
     ),
     (("pipeline", "single_shot_question_generation", "single_shot_user_prompt"), "single_shot_user_prompt"),
+    (
+        ("pipeline", "single_shot_question_generation", "single_shot_batched_user_prompt"),
+        "single_shot_batched_user_prompt",
+    ),
     (("pipeline", "multi_hop_question_generation", "multi_hop_system_prompt"), "multi_hop_system_prompt"),
     (("pipeline", "multi_hop_question_generation", "multi_hop_system_prompt_multi"), "multi_hop_system_prompt_multi"),
     (("pipeline", "multi_hop_question_generation", "multi_hop_user_prompt"), "multi_hop_user_prompt"),
@@ -117,23 +117,97 @@ class IngestionConfig(BaseModel):
     llm_ingestion: bool = False
     pdf_dpi: int = 300
     pdf_llm_prompt: str = ""
+    pdf_image_format: str = "png"
+    pdf_image_quality: int = 85
+    pdf_max_image_edge: int | None = None
+    pdf_grayscale_text_pages: bool = False
+    pdf_text_layer_routing: bool = False
+    pdf_text_min_char_density: float = 5.0
+    pdf_text_max_garbled_ratio: float = 0.02
+    pdf_text_max_image_coverage: float = 0.25
+    pdf_llm_cache_dir: str | None = None
+    deduplicate: bool = False
+    dedup_threshold: float = 0.85
+    dedup_num_perm: int = 128
+    dedup_shingle_size: int = 5
+    dump_text_field: str = "text"
+    dump_id_field: str | None = None
+    include_patterns: list[str] = Field(default_factory=list)
+    exclude_patterns: list[str] = Field(default_factory=list)
+    max_file_size_mb: float | None = None
     supported_file_extensions: list[str] = Field(default_factory=lambda: [".md", ".txt", ".pdf"])
 
     model_config = {"extra": "allow"}
 
+    @model_validator(mode="after")
+    def validate_image_encoding(self) -> "IngestionConfig":
+        self.pdf_image_format = self.pdf_image_format.strip().lower().replace("jpg", "jpeg")
+        if self.pdf_image_format not in {"png", "jpeg", "webp"}:
+            raise ConfigValidationError(
+                f"pdf_image_format must be 'png', 'jpeg' or 'webp', got '{self.pdf_image_format}'"
+            )
+        if not (1 <= self.pdf_image_quality <= 100):
+            raise ConfigValidationError(f"pdf_image_quality must be in [1, 100], got {self.pdf_image_quality}")
+        if self.pdf_max_image_edge is not None and self.pdf_max_image_edge < 1:
+            raise ConfigValidationError(f"pdf_max_image_edge must be >= 1, got {self.pdf_max_image_edge}")
+        return self
+
+    @model_validator(mode="after")
+    def validate_text_layer_routing(self) -> "IngestionConfig":
+        if self.pdf_text_min_char_density < 0:
+            raise ConfigValidationError(
+                f"pdf_text_min_char_density must be >= 0, got {self.pdf_text_min_char_density}"
+            )
+        for name in ("pdf_text_max_garbled_ratio", "pdf_text_max_image_coverage"):
+            if not (0.0 <= getattr(self, name) <= 1.0):
+                raise ConfigValidationError(f"{name} must be in [0, 1], got {getattr(self, name)}")
+        return self
+
+    @model_validator(mode="after")
+    def validate_deduplication(self) -> "IngestionConfig":
+        if not (0.0 < self.dedup_threshold <= 1.0):
+            raise ConfigValidationError(f"dedup_threshold must be in (0, 1], got {self.dedup_threshold}")
+        if self.dedup_num_perm < 1:
+            raise ConfigValidationError(f"dedup_num_perm must be >= 1, got {self.dedup_num_perm}")
+        if self.dedup_shingle_size < 1:
+            raise ConfigValidationError(f"dedup_shingle_size must be >= 1, got {self.dedup_shingle_size}")
+        return self
+
+    @model_validator(mode="after")
+    def validate_file_filters(self) -> "IngestionConfig":
+        if self.max_file_size_mb is not None and self.max_file_size_mb <= 0:
+            raise ConfigValidationError(f"max_file_size_mb must be > 0, got {self.max_file_size_mb}")
+        return self
+
 
 class SummarizationConfig(BaseModel):
     """Summarization stage configuration."""
 
     run: bool = False
+    mode: str = "llm"
     max_tokens: int = 32768
     token_overlap: int = 512
     encoding_name: str = "cl100k_base"
+    extractive_max_tokens: int = 512
+    num_proc: int | None = None
+    combine_max_tokens: int = 16384
+    pack_documents: bool = False
+    pack_max_tokens: int = 8192
     summarization_user_prompt: str = ""
     combine_summaries_user_prompt: str = ""
+    packed_summarization_user_prompt: str = ""
 
     model_config = {"extra": "allow"}
 
+    @model_validator(mode="after")
+    def validate_mode(self) -> "SummarizationConfig":
+        self.mode = self.mode.strip().lower()
+        if self.mode not in {"llm", "extractive"}:
+            raise ConfigValidationError(f"mode must be 'llm' or 'extractive', got '{self.mode}'")
+        if self.extractive_max_tokens <= 0:
+            raise ConfigValidationError(f"extractive_max_tokens must be > 0, got {self.extractive_max_tokens}")
+        return self
+
     @model_validator(mode="after")
     def validate_tokens(self) -> "SummarizationConfig":
         if self.max_tokens <= 0:
@@ -144,6 +218,12 @@ class SummarizationConfig(BaseModel):
             raise ConfigValidationError(
                 f"token_overlap ({self.token_overlap}) must be < max_tokens ({self.max_tokens})"
             )
+        if self.num_proc is not None and self.num_proc < 1:
+            raise ConfigValidationError(f"num_proc must be >= 1, got {self.num_proc}")
+        if self.combine_max_tokens <= 0:
+            raise ConfigValidationError(f"combine_max_tokens must be > 0, got {self.combine_max_tokens}")
+        if self.pack_max_tokens <= 0:
+            raise ConfigValidationError(f"pack_max_tokens must be > 0, got {self.pack_max_tokens}")
         return self
 
 
@@ -151,17 +231,40 @@ class ChunkingConfig(BaseModel):
     """Chunking stage configuration."""
 
     run: bool = False
+    # "token" cuts fixed token windows; "structural" cuts at headings, paragraphs and sentences
+    chunker: str = "token"
     l_max_tokens: int = 8192
     token_overlap: int = 512
     encoding_name: str = "cl100k_base"
+    # Hugging Face tokenizer (e.g. the generation model's repo id); overrides encoding_name
+    tokenizer_name: str | None = None
     h_min: int = 2
     h_max: int = 5
     num_multihops_factor: int = 1
+    # "random" picks multi-hop chunk groups uniformly; "similarity" groups nearest-neighbour chunks
+    multihop_sampling: str = "random"
+    # sentence-transformers model for similarity sampling (default: hashed TF-IDF)
+    embedding_model: str | None = None
+    # Store multi-hop groups as chunk ids only, instead of copying each chunk's text into them.
+    # Off by default so the published `chunked` subset keeps its `chunks_text` column.
+    compact_multihop: bool = False
+    # Mark chunks repeated across documents so single-shot generation skips them
+    dedup_chunks: bool = False
+    dedup_max_distance: int = 3
+    boilerplate_min_docs: int = 3
+    # Worker processes for chunking (default: all CPUs, for datasets large enough to benefit)
+    num_proc: int | None = None
 
     model_config = {"extra": "allow"}
 
     @model_validator(mode="after")
     def validate_chunking(self) -> "ChunkingConfig":
+        if self.chunker not in {"token", "structural"}:
+            raise ConfigValidationError(f"chunker must be 'token' or 'structural', got '{self.chunker}'")
+        if self.multihop_sampling not in {"random", "similarity"}:
+            raise ConfigValidationError(
+                f"multihop_sampling must be 'random' or 'similarity', got '{self.multihop_sampling}'"
+            )
         if self.l_max_tokens <= 0:
             raise ConfigValidationError(f"l_max_tokens must be > 0, got {self.l_max_tokens}")
         if self.token_overlap < 0:
@@ -172,6 +275,12 @@ class ChunkingConfig(BaseModel):
             raise ConfigValidationError(f"h_max ({self.h_max}) must be >= h_min ({self.h_min})")
         if self.num_multihops_factor < 1:
             raise ConfigValidationError(f"num_multihops_factor must be >= 1, got {self.num_multihops_factor}")
+        if self.num_proc is not None and self.num_proc < 1:
+            raise ConfigValidationError(f"num_proc must be >= 1, got {self.num_proc}")
+        if not 0 <= self.dedup_max_distance <= 15:
+            raise ConfigValidationError(f"dedup_max_distance must be in [0, 15], got {self.dedup_max_distance}")
+        if self.boilerplate_min_docs < 2:
+            raise ConfigValidationError(f"boilerplate_min_docs must be >= 2, got {self.boilerplate_min_docs}")
         return self
 
 
@@ -184,7 +293,12 @@ class SingleShotConfig(BaseModel):
     single_shot_system_prompt: str = ""
     single_shot_system_prompt_multi: str = ""
     single_shot_user_prompt: str = ""
+    single_shot_batched_user_prompt: str = ""
     chunk_sampling: ChunkSamplingConfig = Field(default_factory=ChunkSamplingConfig)
+    # Chunks of the same document sent together in one call (1 = one call per chunk)
+    chunks_per_call: int = 1
+    stream_calls: bool = False
+    incremental: bool = False
 
     question_schema: str | None = None
     model_config = {"extra": "allow"}
@@ -197,6 +311,8 @@ class SingleShotConfig(BaseModel):
             raise ConfigValidationError(
                 f"question_mode must be 'open-ended' or 'multi-choice', got '{self.question_mode}'"
             )
+        if self.chunks_per_call < 1:
+            raise ConfigValidationError(f"chunks_per_call must be >= 1, got {self.chunks_per_call}")
         return self
 
 
@@ -209,6 +325,8 @@ class MultiHopConfig(BaseModel):
     multi_hop_system_prompt: str = ""
     multi_hop_system_prompt_multi: str = ""
     multi_hop_user_prompt: str = ""
+    stream_calls: bool = False
+    incremental: bool = False
 
     question_schema: str | None = None
     model_config = {"extra": "allow"}
@@ -237,6 +355,8 @@ class CrossDocConfig(BaseModel):
     chunks_per_document: int = 1
     num_docs_per_combination: list[int] = Field(default_factory=lambda: [2, 5])
     random_seed: int = 42
+    stream_calls: bool = False
+    incremental: bool = False
 
     model_config = {"extra": "allow"}
 
@@ -334,5 +454,7 @@ class YourbenchConfig(BaseModel):
     model_roles: dict[str, list[str]] = Field(default_factory=dict)
     pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
     debug: bool = False
+    # Overlap summarization, chunking and question generation per document
+    streaming: bool = False
 
     model_config = {"extra": "allow"}
@@ -131,6 +131,38 @@ def run(
         raise typer.Exit(1)
 
 
+@app.command("watch")
+def watch_command(
+    config_path: str = typer.Argument(..., help="Path to YAML config file"),
+    debounce: float = typer.Option(5.0, "--debounce", help="Seconds without changes before processing a batch"),
+    poll_interval: float = typer.Option(2.0, "--poll-interval", help="Polling period when watchfiles is missing"),
+    skip_existing: bool = typer.Option(
+        False, "--skip-existing", help="On first start, record existing files as processed instead of ingesting them"
+    ),
+    debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+) -> None:
+    """Watch the source documents and run the pipeline on new or changed files."""
+    if debug:
+        configure_logging(debug=True)
+
+    config_file = Path(config_path)
+    if not config_file.exists():
+        logger.error(f"Config file not found: {config_path}")
+        raise typer.Exit(1)
+
+    from yourbench.conf.loader import load_config
+    from yourbench.pipeline.watch import watch
+
+    try:
+        config = load_config(config_file)
+        if debug:
+            config.debug = True
+        watch(config, debounce=debounce, poll_interval=poll_interval, skip_existing=skip_existing)
+    except Exception as e:
+        logger.exception(f"Watch failed: {e}")
+        raise typer.Exit(1)
+
+
 @app.command("version")
 def version_command() -> None:
     """Show YourBench version."""
@@ -158,7 +190,7 @@ def main() -> None:
     # If first arg looks like a path (not a command), assume it's 'run'
     if len(sys.argv) > 1:
         first_arg = sys.argv[1]
-        if not first_arg.startswith("-") and first_arg not in ["run", "version"]:
+        if not first_arg.startswith("-") and first_arg not in ["run", "watch", "version"]:
             sys.argv = [sys.argv[0], "run"] + sys.argv[1:]
 
     app()
@@ -1,77 +1,179 @@
 """Document chunking pipeline stage."""
 
+import os
+import math
+import random
 import hashlib
-from functools import cache
+import tempfile
 
 import numpy as np
+import pyarrow.compute as pc
 from loguru import logger
-from tqdm.auto import tqdm
 
-from yourbench.utils.chunking_utils import split_into_token_chunks
+from datasets import Value, Dataset, Features
+from yourbench.utils.dedup_utils import simhash64, exact_hash, simhash_clusters
+from yourbench.utils.chunking_utils import get_token_counter, split_into_token_chunks, split_into_structural_chunks
 from yourbench.utils.dataset_engine import custom_load_dataset, custom_save_dataset
 from yourbench.utils.logging_context import log_step, log_stage
-
-
-@cache
-def _get_rng(seed: str) -> np.random.Generator:
-    """Get deterministic RNG from string seed."""
-    seed_int = int(hashlib.md5(seed.encode()).hexdigest()[:8], 16)
-    return np.random.default_rng(seed_int)
-
-
-def _chunk_text(text: str, doc_id: str, max_tokens: int) -> list[dict]:
-    """Split text into token-based chunks."""
+from yourbench.utils.similarity_utils import embed_texts, nearest_neighbors, approximate_neighbors
+from yourbench.utils.cross_document_utils import _unrank_comb, _floyd_sample_indices
+
+
+# Below this many documents, chunking stays in the main process
+_PARALLEL_MIN_DOCS = 1_000
+_MAP_BATCH_SIZE = 64
+# Above this many chunks in a document, similarity sampling uses approximate neighbour search
+_EXACT_KNN_MAX_CHUNKS = 4096
+_CHUNK_FEATURES = {"chunk_id": Value("string"), "chunk_text": Value("string")}
+# The structural chunker also records where each chunk sits in the source document
+_SPAN_FEATURES = {"char_start": Value("int64"), "char_end": Value("int64")}
+_MULTIHOP_FEATURES = {"chunk_ids": [Value("string")]}
+_INLINE_MULTIHOP_FEATURES = {**_MULTIHOP_FEATURES, "chunks_text": [Value("string")]}
+# Per-chunk hashes computed while chunking for corpus-level deduplication; dropped once chunks are marked
+_FINGERPRINT_COLUMN = "_chunk_fingerprints"
+# Hashes are stored as int64 (Arrow cannot build uint64 columns from Python ints above 2**63)
+_FINGERPRINT_FEATURES = [{"chunk_id": Value("string"), "exact": Value("int64"), "simhash": Value("int64")}]
+_DEDUP_FEATURES = {"duplicate_of": Value("string"), "is_boilerplate": Value("bool")}
+
+
+def _seed_int(seed: str) -> int:
+    """Derive a deterministic integer seed from a string."""
+    return int(hashlib.md5(seed.encode()).hexdigest()[:8], 16)
+
+
+def _chunk_text(text: str, doc_id: str, cfg) -> list[dict]:
+    """Split text into chunks with the configured chunker, tokenizer and overlap."""
     if not text.strip():
         return []
 
-    chunks = split_into_token_chunks(text, max_tokens, overlap=0)
+    encoding_name = getattr(cfg, "encoding_name", "cl100k_base")
+    tokenizer_name = getattr(cfg, "tokenizer_name", None)
+    if getattr(cfg, "chunker", "token") == "structural":
+        count_tokens = get_token_counter(encoding_name, tokenizer_name)
+        spans = split_into_structural_chunks(text, cfg.l_max_tokens, count_tokens, overlap=_token_overlap(cfg))
+        return [
+            {"chunk_id": f"{doc_id}_{i}", "chunk_text": text[start:end], "char_start": start, "char_end": end}
+            for i, (start, end) in enumerate(spans)
+        ]
+
+    chunks = split_into_token_chunks(
+        text,
+        cfg.l_max_tokens,
+        overlap=_token_overlap(cfg),
+        encoding_name=encoding_name,
+        tokenizer_name=tokenizer_name,
+    )
     return [{"chunk_id": f"{doc_id}_{i}", "chunk_text": chunk} for i, chunk in enumerate(chunks)]
 
 
+def _token_overlap(cfg) -> int:
+    """Configured token overlap; one that is not below `l_max_tokens` falls back to half a chunk."""
+    overlap = max(0, getattr(cfg, "token_overlap", 0) or 0)
+    return overlap if overlap < cfg.l_max_tokens else cfg.l_max_tokens // 2
+
+
 def _sample_multihop_combinations(n_chunks: int, h_min: int, h_max: int, factor: int, doc_id: str) -> list[list[int]]:
-    """Generate random multi-hop chunk combinations."""
+    """Generate random multi-hop chunk combinations.
+
+    `n_chunks // factor` distinct combinations are drawn uniformly at random, split evenly across sizes
+    `h_min`..`h_max`. A size with fewer possible combinations than its share contributes all of them
+    and passes the rest to smaller sizes, so the count is exact whenever enough combinations exist.
+    """
 
     # If we have only 1 chunk, create a single-chunk combination for cross-document use
     if n_chunks == 1:
         return [[0]]
 
-    # Original logic for multiple chunks per document
     if n_chunks < h_min or h_min > h_max or h_min <= 0:
         return []
 
-    h_max = min(h_max, n_chunks)
+    counts = _combination_counts(n_chunks, h_min, min(h_max, n_chunks), factor)
+    rng = np.random.default_rng(_seed_int(doc_id))
+    combos = []
+    for size, count in counts.items():
+        if count:
+            combos.extend(_sample_combinations(n_chunks, size, count, rng))
+    return combos
+
+
+def _combination_counts(n_chunks: int, h_min: int, h_max: int, factor: int) -> dict[int, int]:
+    """Number of combinations to draw per size `h_min`..`h_max`, in increasing size order.
+
+    The `n_chunks // factor` target is shared out largest size first, so any shortfall of a size with
+    fewer possible combinations than its share moves to sizes with more combinations.
+    """
     target_count = max(1, n_chunks // max(1, factor))
+    sizes = range(h_min, h_max + 1)
+    base, extra = divmod(target_count, len(sizes))
+    counts, carry = {}, 0
+    for i in reversed(range(len(sizes))):
+        wanted = base + (i < extra) + carry
+        counts[sizes[i]] = min(wanted, math.comb(n_chunks, sizes[i]))
+        carry = wanted - counts[sizes[i]]
+    return dict(sorted(counts.items()))
+
+
+def _sample_combinations(n: int, k: int, count: int, rng: np.random.Generator) -> list[list[int]]:
+    """Draw `count` distinct k-subsets of range(n) uniformly at random, each as a sorted list."""
+    total = math.comb(n, k)
+    if k * k > n or count * 4 > total:
+        # Dense case: pick distinct ranks with Floyd's algorithm and unrank them
+        ranks = _floyd_sample_indices(total, count, rng=random.Random(int(rng.integers(2**32))))
+        return [_unrank_comb(n, k, rank) for rank in sorted(ranks)]
+
+    # Sparse case: k draws with replacement are a uniform k-subset when all distinct (likely, as k^2 <= n).
+    # Keeping the first occurrence of each subset in draw order samples subsets without replacement.
+    found = np.empty((0, k), dtype=np.int64)
+    while len(found) < count:
+        draws = np.sort(rng.integers(0, n, size=(2 * (count - len(found)) + 8, k)), axis=1)
+        found = np.concatenate([found, draws[(np.diff(draws, axis=1) > 0).all(axis=1)]])
+        _, first = np.unique(found, axis=0, return_index=True)
+        found = found[np.sort(first)]
+    return found[:count].tolist()
+
+
+def _sample_similar_combinations(
+    texts: list[str], h_min: int, h_max: int, factor: int, doc_id: str, embedding_model: str | None = None
+) -> list[list[int]]:
+    """Generate multi-hop combinations of mutually similar chunks.
+
+    Each combination is an anchor chunk plus chunks drawn from its nearest neighbours, using
+    `embedding_model` embeddings or hashed TF-IDF. Group sizes and counts follow `_combination_counts`,
+    as for the random sampler.
+    """
+    n_chunks = len(texts)
+    if n_chunks == 1:
+        return [[0]]
+    if n_chunks < h_min or h_min > h_max or h_min <= 0:
+        return []
 
-    # Generate combinations of different sizes
-    rng = _get_rng(doc_id)
-    combinations_list = []
-
-    for size in range(h_min, h_max + 1):
-        n_combos = max(1, target_count // (h_max - h_min + 1))
-        if n_combos >= n_chunks:
-            # If requesting more combos than possible, just take a few
-            n_combos = min(5, n_chunks // size)
-
-        # Generate unique combinations for this size
-        all_indices = list(range(n_chunks))
-        for _ in range(n_combos):
-            if len(all_indices) >= size:
-                combo = sorted(rng.choice(all_indices, size=size, replace=False))
-                # Convert numpy int64 to regular int to avoid serialization issues
-                combo = [int(x) for x in combo]
-                combinations_list.append(combo)
-
-    # Deduplicate
-    seen = set()
-    unique_combos = []
-    for combo in combinations_list:
-        key = tuple(combo)
-        if key not in seen:
-            seen.add(key)
-            unique_combos.append(combo)
-
-    result = unique_combos[:target_count]
-    return result
+    h_max = min(h_max, n_chunks)
+    counts = _combination_counts(n_chunks, h_min, h_max, factor)
+    rng = np.random.default_rng(_seed_int(doc_id))
+
+    vectors = embed_texts(texts, embedding_model)
+    # Twice the neighbours a group needs, so groups around nearby anchors still differ
+    k = 2 * (h_max - 1)
+    if n_chunks <= _EXACT_KNN_MAX_CHUNKS:
+        neighbors = nearest_neighbors(vectors, k)
+    else:
+        neighbors = approximate_neighbors(vectors, k, rng)
+
+    # Largest size first, like `_combination_counts`, so a size short of distinct groups passes the rest down
+    groups, carry = {}, 0
+    for size in reversed(counts):
+        wanted = counts[size] + carry
+        pool_size = min(2 * (size - 1), neighbors.shape[1])
+        seen = {}
+        # Anchors are tried in random order until the count is met, since nearby anchors can yield the same group
+        for anchor in rng.permutation(n_chunks) if wanted else []:
+            picked = rng.choice(neighbors[anchor, :pool_size], size=size - 1, replace=False)
+            seen.setdefault(tuple(sorted([int(anchor), *picked.tolist()])), None)
+            if len(seen) == wanted:
+                break
+        groups[size] = [list(combo) for combo in seen]
+        carry = wanted - len(seen)
+    return [combo for size in counts for combo in groups[size]]
 
 
 def _process_document(row: dict, cfg) -> tuple[list[dict], list[dict]]:
@@ -80,52 +182,196 @@ def _process_document(row: dict, cfg) -> tuple[list[dict], list[dict]]:
     doc_id = row.get("document_id", f"doc_{hash(doc_text) % 10000}")
 
     # Create single-hop chunks
-    chunks = _chunk_text(doc_text, doc_id, cfg.l_max_tokens)
+    chunks = _chunk_text(doc_text, doc_id, cfg)
     if not chunks:
         return [], []
 
     # Create multi-hop combinations
-    combos = _sample_multihop_combinations(len(chunks), cfg.h_min, cfg.h_max, cfg.num_multihops_factor, doc_id)
-
-    multihop_chunks = [
-        {"chunk_ids": [chunks[i]["chunk_id"] for i in combo], "chunks_text": [chunks[i]["chunk_text"] for i in combo]}
-        for combo in combos
-    ]
+    if getattr(cfg, "multihop_sampling", "random") == "similarity":
+        combos = _sample_similar_combinations(
+            [chunk["chunk_text"] for chunk in chunks],
+            cfg.h_min,
+            cfg.h_max,
+            cfg.num_multihops_factor,
+            doc_id,
+            getattr(cfg, "embedding_model", None),
+        )
+    else:
+        combos = _sample_multihop_combinations(len(chunks), cfg.h_min, cfg.h_max, cfg.num_multihops_factor, doc_id)
+
+    if getattr(cfg, "compact_multihop", False):
+        # Texts are resolved from `chunks` when needed (see chunking_utils.resolve_multihop_chunks)
+        multihop_chunks = [{"chunk_ids": [chunks[i]["chunk_id"] for i in combo]} for combo in combos]
+    else:
+        multihop_chunks = [
+            {
+                "chunk_ids": [chunks[i]["chunk_id"] for i in combo],
+                "chunks_text": [chunks[i]["chunk_text"] for i in combo],
+            }
+            for combo in combos
+        ]
 
     return chunks, multihop_chunks
 
 
+def _chunk_batch(batch: dict[str, list], cfg) -> dict[str, list]:
+    """Chunk a batch of documents for `Dataset.map`."""
+    keys = [key for key in ("document_id", "document_text") if key in batch]
+    all_chunks, all_multihops = [], []
+    for values in zip(*(batch[key] for key in keys)):
+        chunks, multihops = _process_document(dict(zip(keys, values)), cfg)
+        all_chunks.append(chunks)
+        all_multihops.append(multihops)
+    result = {"chunks": all_chunks, "multihop_chunks": all_multihops}
+    if getattr(cfg, "dedup_chunks", False):
+        result[_FINGERPRINT_COLUMN] = [
+            [
+                {
+                    "chunk_id": c["chunk_id"],
+                    "exact": _to_int64(exact_hash(c["chunk_text"])),
+                    "simhash": _to_int64(simhash64(c["chunk_text"])),
+                }
+                for c in chunks
+            ]
+            for chunks in all_chunks
+        ]
+    return result
+
+
+def _to_int64(value: int) -> int:
+    """Reinterpret an unsigned 64-bit hash as a signed one."""
+    return value - (1 << 64) if value >> 63 else value
+
+
+def _mark_duplicate_chunks(dataset: Dataset, cfg, cache_dir: str) -> Dataset:
+    """Mark chunks that repeat across the corpus, using the fingerprints computed while chunking.
+
+    Chunks with the same normalized text, or SimHashes within `dedup_max_distance` bits, form a
+    cluster whose earliest chunk is kept. Every later chunk gets `duplicate_of` set to that chunk's id.
+    A cluster spanning at least `boilerplate_min_docs` documents is marked `is_boilerplate`, since
+    it is most likely a header, footer or disclaimer.
+    """
+    column = dataset.data.column(_FINGERPRINT_COLUMN)
+    lengths = pc.fill_null(pc.list_value_length(column), 0).to_numpy()
+    fingerprints = pc.list_flatten(column).combine_chunks()
+    n_chunks = len(fingerprints)
+    doc_index = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).tolist()
+
+    representative = np.arange(n_chunks)
+    if n_chunks:
+        exact = fingerprints.field("exact").to_numpy()
+        simhash = fingerprints.field("simhash").to_numpy().view(np.uint64)
+        # Cluster the first occurrence of each exact text by SimHash, in corpus order
+        _, first, inverse = np.unique(exact, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        position = np.empty_like(order)
+        position[order] = np.arange(len(order))
+        clusters = simhash_clusters(simhash[first[order]], getattr(cfg, "dedup_max_distance", 3))
+        representative = first[order][clusters[position[inverse.ravel()]]]
+
+    doc_pairs = np.unique(np.stack([representative, doc_index]), axis=1)
+    docs_per_cluster = np.bincount(doc_pairs[0], minlength=n_chunks)
+    boilerplate = (docs_per_cluster[representative] >= getattr(cfg, "boilerplate_min_docs", 3)).tolist()
+    chunk_ids = fingerprints.field("chunk_id").to_pylist() if n_chunks else []
+    duplicate_of = [None if rep == i else chunk_ids[rep] for i, rep in enumerate(representative.tolist())]
+    logger.info(
+        f"Chunk dedup: {sum(d is not None for d in duplicate_of)} duplicate and {sum(boilerplate)} boilerplate "
+        f"chunks out of {n_chunks}"
+    )
+
+    features = {name: feature for name, feature in dataset.features.items() if name != _FINGERPRINT_COLUMN}
+    features["chunks"] = [{**_chunked_features(cfg)["chunks"][0], **_DEDUP_FEATURES}]
+    return dataset.map(
+        _mark_batch,
+        batched=True,
+        batch_size=_MAP_BATCH_SIZE,
+        with_indices=True,
+        input_columns=["chunks"],
+        remove_columns=[_FINGERPRINT_COLUMN],
+        fn_kwargs={"offsets": offsets, "duplicate_of": duplicate_of, "boilerplate": boilerplate},
+        features=Features(features),
+        cache_file_name=os.path.join(cache_dir, "deduplicated.arrow"),
+        writer_batch_size=_MAP_BATCH_SIZE,
+        desc="Marking duplicate chunks",
+    )
+
+
+def _mark_batch(
+    chunks: list[list[dict]], indices: list[int], offsets: list[int], duplicate_of: list, boilerplate: list
+) -> dict[str, list]:
+    """Add the dedup marks of a batch of rows to their chunks, for `Dataset.map`."""
+    marked = []
+    for row_chunks, idx in zip(chunks, indices):
+        start = offsets[idx]
+        marked.append([
+            {**chunk, "duplicate_of": duplicate_of[start + j], "is_boilerplate": boilerplate[start + j]}
+            for j, chunk in enumerate(row_chunks)
+        ])
+    return {"chunks": marked}
+
+
+def _chunked_features(cfg) -> dict:
+    """Arrow features of the columns added by chunking."""
+    multihop = _MULTIHOP_FEATURES if getattr(cfg, "compact_multihop", False) else _INLINE_MULTIHOP_FEATURES
+    chunk = (
+        {**_CHUNK_FEATURES, **_SPAN_FEATURES} if getattr(cfg, "chunker", "token") == "structural" else _CHUNK_FEATURES
+    )
+    features = {"chunks": [chunk], "multihop_chunks": [multihop]}
+    if getattr(cfg, "dedup_chunks", False):
+        features[_FINGERPRINT_COLUMN] = _FINGERPRINT_FEATURES
+    return features
+
+
+def _num_proc(num_proc: int | None, num_docs: int) -> int | None:
+    """Worker count for `Dataset.map`, or None to chunk in-process when workers would not pay off."""
+    num_proc = num_proc or os.cpu_count() or 1
+    if num_proc <= 1 or num_docs < _PARALLEL_MIN_DOCS:
+        return None
+    return min(num_proc, num_docs // _MAP_BATCH_SIZE or 1)
+
+
 def run(config) -> None:
     """Execute chunking pipeline stage."""
 
     with log_stage("chunking"):
         logger.info("Starting chunking stage...")
         cfg = config.pipeline.chunking
+        if (overlap := _token_overlap(cfg)) != getattr(cfg, "token_overlap", 0):
+            logger.warning(
+                f"token_overlap ({cfg.token_overlap}) must be < l_max_tokens ({cfg.l_max_tokens}); using {overlap}"
+            )
 
         # Load dataset
         with log_step("loading_dataset"):
             dataset = custom_load_dataset(config=config, subset="summarized")
             logger.info(f"Processing {len(dataset)} documents")
 
-        # Process all documents
-        all_chunks = []
-        all_multihops = []
-
-        with log_step("chunking_documents", num_docs=len(dataset)):
-            for row in tqdm(dataset, desc="Chunking"):
-                chunks, multihops = _process_document(row, cfg)
-                all_chunks.append(chunks)
-                all_multihops.append(multihops)
-
-        # Add to dataset and save
-        with log_step("saving_chunked_dataset"):
-            dataset = dataset.add_column("chunks", all_chunks)
-            dataset = dataset.add_column("multihop_chunks", all_multihops)
-            custom_save_dataset(
-                dataset=dataset, config=config, subset="chunked", push_to_hub=config.hf_configuration.push_to_hub
-            )
-
-            # Log statistics
-            total_chunks = sum(len(c) for c in all_chunks)
-            total_multihop = sum(len(m) for m in all_multihops)
-            logger.success(f"Chunking complete: {total_chunks} chunks, {total_multihop} multihop combinations")
+        # Chunk in batches straight into Arrow; the temporary cache holds the result until it is saved
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with log_step("chunking_documents", num_docs=len(dataset)):
+                dataset = dataset.map(
+                    _chunk_batch,
+                    batched=True,
+                    batch_size=_MAP_BATCH_SIZE,
+                    fn_kwargs={"cfg": cfg},
+                    features=Features({**dataset.features, **_chunked_features(cfg)}),
+                    num_proc=_num_proc(getattr(cfg, "num_proc", None), len(dataset)),
+                    cache_file_name=os.path.join(cache_dir, "chunked.arrow"),
+                    writer_batch_size=_MAP_BATCH_SIZE,
+                    desc="Chunking",
+                )
+
+            if getattr(cfg, "dedup_chunks", False):
+                with log_step("deduplicating_chunks"):
+                    dataset = _mark_duplicate_chunks(dataset, cfg, cache_dir)
+
+            with log_step("saving_chunked_dataset"):
+                custom_save_dataset(
+                    dataset=dataset, config=config, subset="chunked", push_to_hub=config.hf_configuration.push_to_hub
+                )
+
+                # Log statistics
+                total_chunks = pc.sum(pc.list_value_length(dataset.data.column("chunks"))).as_py() or 0
+                total_multihop = pc.sum(pc.list_value_length(dataset.data.column("multihop_chunks"))).as_py() or 0
+                logger.success(f"Chunking complete: {total_chunks} chunks, {total_multihop} multihop combinations")
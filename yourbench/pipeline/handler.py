@@ -35,6 +35,21 @@ def run_stage(stage: str, config) -> float:
         raise
 
 
+def _apply_streaming(config, enabled: list[str]) -> list[str]:
+    """Replace the stages covered by a streaming run with a single `streaming` stage."""
+    if not getattr(config, "streaming", False):
+        return enabled
+    if not {"summarization", "chunking"} <= set(enabled):
+        logger.warning("Streaming needs both summarization and chunking enabled; running stages one by one")
+        return enabled
+
+    from yourbench.pipeline.streaming import STREAMED_STAGES
+
+    first = enabled.index("summarization")
+    rest = [stage for stage in enabled[first:] if stage not in STREAMED_STAGES]
+    return enabled[:first] + ["streaming"] + rest
+
+
 def run_pipeline(config_path: str, debug: bool = False) -> None:
     """Run the full pipeline from a config file path."""
     from yourbench.conf.loader import load_config
@@ -56,6 +71,7 @@ def run_pipeline_with_config(config, debug: bool = False) -> None:
         logger.warning("No pipeline stages enabled")
         return
 
+    enabled = _apply_streaming(config, enabled)
     logger.info(f"Running stages: {', '.join(enabled)}")
 
     for stage in enabled:
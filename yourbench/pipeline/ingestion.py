@@ -1,25 +1,56 @@
 import io
+import os
+import gzip
+import json
 import uuid
 import base64
-from pathlib import Path
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+import unicodedata
+from typing import Iterator
+from fnmatch import fnmatch
+from pathlib import Path, PurePosixPath
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import fitz
+import numpy as np
 import trafilatura
+import pyarrow.parquet as pq
 from PIL import Image
 from loguru import logger
 from markitdown import MarkItDown
 
-from datasets import Dataset
+from datasets import Value, Dataset, Features
 from huggingface_hub import InferenceClient
+from datasets.arrow_writer import ArrowWriter
+from yourbench.utils.dedup_utils import minhash_signature, near_duplicate_clusters
 from yourbench.utils.dataset_engine import custom_save_dataset
 from yourbench.utils.logging_context import log_step, log_stage, log_progress
 from yourbench.utils.inference.inference_core import (
     InferenceCall,
     _load_models,
-    run_inference,
+    run_inference_stream,
 )
 
 
+_IMAGE_MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+_INGESTED_FEATURES = Features({
+    "document_id": Value("string"),
+    "document_text": Value("string"),
+    "document_filename": Value("string"),
+    "document_metadata": {"file_size": Value("int64")},
+})
+_ARCHIVE_EXTENSIONS = {".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz"}
+_DUMP_EXTENSIONS = {".jsonl", ".ndjson", ".jsonl.gz", ".ndjson.gz", ".parquet"}
+# Longest first so `.tar.gz` wins over `.gz`
+_COMPOUND_EXTENSIONS = sorted(_ARCHIVE_EXTENSIONS | _DUMP_EXTENSIONS, key=len, reverse=True)
+# Rows buffered before each Arrow record batch is flushed to disk
+_WRITER_BATCH_SIZE = 64
+
+
 def run(config) -> None:
     """Convert documents to markdown and optionally upload to Hub."""
     with log_stage(
@@ -33,48 +64,295 @@ def run(config) -> None:
 
         # Process files
         processor = _get_processor(config)
-        successful_outputs: list[Path] = []
+        deduplicate = getattr(ingestion_config, "deduplicate", False)
+        filenames: list[str] = []
+        signatures: list[np.ndarray] = []
 
         # Collect all files to process
-        all_files = [f for f in source_dir.rglob("*") if f.is_file()]
+        all_files = _discover_files(source_dir, output_dir, ingestion_config)
         logger.info(f"Found {len(all_files)} files to process")
 
-        for idx, file_path in enumerate(all_files, 1):
-            # Skip files in output directories to prevent recursive processing
-            if "output" in str(file_path):
-                logger.debug(f"Skipping file in output directory: {file_path}")
-                continue
+        # Convert the pages of every PDF in one shared inference run
+        llm_pdf_contents = None
+        if ingestion_config.llm_ingestion and ".pdf" in set(ingestion_config.supported_file_extensions):
+            if pdf_files := [f for f in all_files if f.suffix.lower() == ".pdf"]:
+                with log_step("llm_pdf_ingestion", num_files=len(pdf_files)):
+                    llm_pdf_contents = _process_pdfs_llm(pdf_files, config)
+
+        # Documents are streamed into an on-disk Arrow file as they are converted
+        with tempfile.TemporaryDirectory(prefix="yourbench_ingestion_") as tmp_dir:
+            arrow_path = os.path.join(tmp_dir, "ingested.arrow")
+            writer = ArrowWriter(features=_INGESTED_FEATURES, path=arrow_path, writer_batch_size=_WRITER_BATCH_SIZE)
+
+            for idx, file_path in enumerate(all_files, 1):
+                log_progress(idx, len(all_files), f"file {file_path.name}")
+
+                with log_step(f"converting_{file_path.name}"):
+                    try:
+                        documents = _iter_documents(file_path, source_dir, config, processor, llm_pdf_contents)
+                        for relative_path, document_id, content in documents:
+                            # Preserve relative path to avoid filename collisions
+                            output_path = output_dir / relative_path
+                            output_path.parent.mkdir(parents=True, exist_ok=True)
+                            output_path.write_text(content, encoding="utf-8")
+                            logger.debug(f"Converted {relative_path} → {output_path.name}")
+
+                            if text := content.strip():
+                                row = _document_row(text, output_path.name, len(content.encode("utf-8")), document_id)
+                                writer.write(row)
+                                filenames.append(output_path.name)
+                                if deduplicate:
+                                    signatures.append(
+                                        minhash_signature(
+                                            text,
+                                            num_perm=ingestion_config.dedup_num_perm,
+                                            shingle_size=ingestion_config.dedup_shingle_size,
+                                        )
+                                    )
+                    except Exception as e:
+                        logger.error(f"Failed to process {file_path.name}: {e}")
+
+            writer.finalize()
+            writer.close()
+            logger.info(f"Processed {len(filenames)} documents from {len(all_files)} files")
+
+            if not filenames:
+                logger.warning("No valid documents to upload")
+                return
+
+            dataset = Dataset.from_file(arrow_path)
+            if deduplicate and len(filenames) > 1:
+                with log_step("deduplication", num_files=len(filenames)):
+                    dataset = dataset.select(
+                        _near_duplicate_survivors(filenames, signatures, ingestion_config.dedup_threshold)
+                    )
+
+            # Save dataset locally and/or upload to Hub
+            with log_step("uploading_to_hub"):
+                custom_save_dataset(
+                    dataset, config, subset="ingested", push_to_hub=config.hf_configuration.push_to_hub
+                )
+                logger.info(f"Uploaded {len(dataset)} documents to Hub")
+
+
+def _document_row(text: str, filename: str, file_size: int, document_id: str | None = None) -> dict:
+    """Build a row of the ingested dataset."""
+    return {
+        "document_id": document_id or str(uuid.uuid4()),
+        "document_text": text,
+        "document_filename": filename,
+        "document_metadata": {"file_size": file_size},
+    }
+
+
+def _iter_documents(
+    file_path: Path,
+    source_dir: Path,
+    config,
+    processor: MarkItDown,
+    llm_pdf_contents: dict[Path, str | None] | None = None,
+) -> Iterator[tuple[Path, str | None, str]]:
+    """Yield (output path relative to output_dir, document id, markdown) for every document in a source file.
+
+    Plain files yield one document with a random id. Archives and dumps listed in `supported_file_extensions`
+    are read as streams and yield one document per member or record, with an id derived from the file path
+    and member name so re-ingesting the same bundle gives stable ids.
+    """
+    ingestion_config = config.pipeline.ingestion
+    relative_path = file_path.relative_to(source_dir)
+    source_ext = _source_extension(file_path)
+
+    if source_ext in _ARCHIVE_EXTENSIONS | _DUMP_EXTENSIONS:
+        if source_ext not in set(ingestion_config.supported_file_extensions):
+            logger.warning(f"Unsupported file type: {source_ext} for file {file_path.name}")
+            return
+        if source_ext in _ARCHIVE_EXTENSIONS:
+            members = _iter_archive_members(file_path, config, processor)
+        else:
+            members = _iter_dump_records(file_path, ingestion_config)
+        for member_name, content in members:
+            if content:
+                member_path = Path(*_safe_parts(member_name))
+                if source_ext in _ARCHIVE_EXTENSIONS:
+                    member_path = member_path.with_suffix(".md")
+                else:
+                    # Record ids may contain dots, so keep them whole
+                    member_path = member_path.with_name(f"{member_path.name}.md")
+                yield (
+                    relative_path / member_path,
+                    str(uuid.uuid5(uuid.NAMESPACE_URL, f"{relative_path.as_posix()}/{member_name}")),
+                    content,
+                )
+        return
+
+    if content := _convert_file(file_path, config, processor, llm_pdf_contents):
+        yield relative_path.with_suffix(".md"), None, content
+
+
+def _source_extension(path: Path) -> str:
+    """Lower-cased extension of a path, keeping compound archive/dump suffixes such as `.tar.gz`."""
+    name = path.name.lower()
+    for ext in _COMPOUND_EXTENSIONS:
+        if name.endswith(ext):
+            return ext
+    return path.suffix.lower()
+
+
+def _safe_parts(member_name: str) -> list[str]:
+    """Path components of an archive member or record name that cannot escape the output directory."""
+    parts = [part for part in PurePosixPath(member_name.replace("\\", "/")).parts if part not in {"", ".", "..", "/"}]
+    return parts or ["document"]
 
-            # Skip files in the output directory to prevent recursive processing
+
+def _iter_archive_members(archive_path: Path, config, processor: MarkItDown) -> Iterator[tuple[str, str | None]]:
+    """Yield (member name, markdown) for the files of a zip or tar archive without extracting it to disk."""
+    if _source_extension(archive_path) == ".zip":
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield info.filename, _convert_member(info.filename, archive.read(info), config, processor)
+        return
+
+    # Stream mode reads members sequentially, so compressed tarballs are decompressed only once
+    with tarfile.open(archive_path, mode="r|*") as archive:
+        for member in archive:
+            if member.isfile() and (stream := archive.extractfile(member)):
+                yield member.name, _convert_member(member.name, stream.read(), config, processor)
+
+
+def _convert_member(member_name: str, data: bytes, config, processor: MarkItDown) -> str | None:
+    """Convert an in-memory archive member to markdown based on its extension."""
+    file_ext = PurePosixPath(member_name).suffix.lower()
+    if file_ext not in set(config.pipeline.ingestion.supported_file_extensions):
+        logger.debug(f"Skipping unsupported archive member: {member_name}")
+        return None
+
+    try:
+        if file_ext in {".md", ".txt", ".text"}:
+            return data.decode("utf-8")
+
+        if file_ext in {".html", ".htm"}:
+            if content := _extract_html_text(data.decode("utf-8"), member_name):
+                return content
+
+        return processor.convert_stream(io.BytesIO(data), file_extension=file_ext).text_content
+    except Exception as e:
+        logger.error(f"Failed to process archive member {member_name}: {e}")
+        return None
+
+
+def _iter_dump_records(dump_path: Path, ingestion_config) -> Iterator[tuple[str, str | None]]:
+    """Yield (record name, text) for every record of a JSONL or Parquet document dump.
+
+    Records are named by `dump_id_field` when set, otherwise by their position in the dump.
+    """
+    text_field = ingestion_config.dump_text_field
+    id_field = ingestion_config.dump_id_field
+
+    if _source_extension(dump_path) == ".parquet":
+        columns = [text_field] + ([id_field] if id_field else [])
+        batches = pq.ParquetFile(dump_path).iter_batches(batch_size=_WRITER_BATCH_SIZE, columns=columns)
+        records = (record for batch in batches for record in batch.to_pylist())
+    else:
+        records = _iter_jsonl(dump_path)
+
+    for idx, record in enumerate(records):
+        if not isinstance(record, dict) or not isinstance(text := record.get(text_field), str):
+            logger.warning(f"Skipping record {idx} of {dump_path.name}: no '{text_field}' text field")
+            continue
+        name = str(record[id_field]) if id_field and record.get(id_field) is not None else str(idx)
+        yield name, text
+
+
+def _iter_jsonl(path: Path) -> Iterator[dict | None]:
+    """Lazily parse a (optionally gzipped) JSON Lines file, yielding None for malformed lines."""
+    opener = gzip.open if path.name.lower().endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Invalid JSON on line {line_no} of {path.name}: {e}")
+                yield None
+
+
+def _discover_files(source_dir: Path, output_dir: Path, ingestion_config) -> list[Path]:
+    """List the files to ingest with a single `os.scandir` walk of `source_dir`.
+
+    The output directory is pruned by comparing real paths computed once, so no per-file `resolve()`
+    is needed. Files are filtered by extension and by the `include_patterns` / `exclude_patterns` globs
+    (matched against the path relative to `source_dir`) before any `stat` call; `max_file_size_mb` then
+    costs one `stat` per remaining file. Entries are visited in sorted order so runs are reproducible.
+    """
+    supported = {ext.lower() for ext in ingestion_config.supported_file_extensions}
+    include = list(getattr(ingestion_config, "include_patterns", None) or [])
+    exclude = list(getattr(ingestion_config, "exclude_patterns", None) or [])
+    max_size_mb = getattr(ingestion_config, "max_file_size_mb", None)
+    max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb is not None else None
+
+    source_real = os.path.realpath(source_dir)
+    output_real = os.path.realpath(output_dir)
+    files: list[Path] = []
+    stack = [(str(source_dir), source_real, "")]
+
+    while stack:
+        dir_path, dir_real, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"Cannot list {dir_path}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}{entry.name}"
             try:
-                if output_dir.resolve() in file_path.resolve().parents or file_path.resolve() == output_dir.resolve():
-                    logger.debug(f"Skipping file in output directory: {file_path}")
+                if entry.is_dir(follow_symlinks=False):
+                    entry_real = os.path.join(dir_real, entry.name)
+                    if entry_real == output_real:
+                        logger.debug(f"Skipping output directory: {entry.path}")
+                    elif not any(fnmatch(rel_path, pattern) for pattern in exclude):
+                        subdirs.append((entry.path, entry_real, f"{rel_path}/"))
                     continue
-            except Exception:
-                # If path resolution fails, skip the check
-                pass
-
-            log_progress(idx, len(all_files), f"file {file_path.name}")
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
 
-            with log_step(f"converting_{file_path.name}"):
+            if _source_extension(Path(entry.name)) not in supported:
+                continue
+            if include and not any(fnmatch(rel_path, pattern) for pattern in include):
+                continue
+            if any(fnmatch(rel_path, pattern) for pattern in exclude):
+                continue
+            if max_bytes is not None:
                 try:
-                    if content := _convert_file(file_path, config, processor):
-                        # Preserve relative path to avoid filename collisions
-                        relative_path = file_path.relative_to(source_dir)
-                        output_path = output_dir / relative_path.with_suffix(".md")
-                        output_path.parent.mkdir(parents=True, exist_ok=True)
-                        output_path.write_text(content, encoding="utf-8")
-                        logger.debug(f"Converted {file_path.name} → {output_path.name}")
-                        successful_outputs.append(output_path)
-                except Exception as e:
-                    logger.error(f"Failed to process {file_path.name}: {e}")
-
-        logger.info(f"Processed {len(successful_outputs)} files")
-
-        # Save dataset locally and/or upload to Hub
-        if successful_outputs:
-            with log_step("uploading_to_hub"):
-                _upload_to_hub(config, successful_outputs)
+                    if entry.stat().st_size > max_bytes:
+                        logger.info(f"Skipping {rel_path}: larger than {max_size_mb} MB")
+                        continue
+                except OSError:
+                    continue
+            files.append(Path(entry.path))
+
+        stack.extend(reversed(subdirs))
+
+    return files
+
+
+def _near_duplicate_survivors(filenames: list[str], signatures: list[np.ndarray], threshold: float) -> list[int]:
+    """Return the indices of the first document of every near-duplicate cluster."""
+    representatives = near_duplicate_clusters(np.stack(signatures), threshold)
+    kept = []
+    for idx, rep in enumerate(representatives):
+        if rep == idx:
+            kept.append(idx)
+        else:
+            logger.info(f"Dropping {filenames[idx]} as a near-duplicate of {filenames[rep]}")
+    logger.info(f"Deduplication kept {len(kept)}/{len(filenames)} documents")
+    return kept
 
 
 def _get_processor(config) -> MarkItDown:
@@ -93,8 +371,13 @@ def _get_processor(config) -> MarkItDown:
         return MarkItDown()
 
 
-def _convert_file(file_path: Path, config, processor: MarkItDown) -> str | None:
-    """Convert file to markdown based on type."""
+def _convert_file(
+    file_path: Path, config, processor: MarkItDown, llm_pdf_contents: dict[Path, str | None] | None = None
+) -> str | None:
+    """Convert file to markdown based on type.
+
+    `llm_pdf_contents` holds PDFs already converted by `_process_pdfs_llm`; other PDFs are converted here.
+    """
     ingestion_config = config.pipeline.ingestion
     supported_extensions = set(ingestion_config.supported_file_extensions)
 
@@ -117,7 +400,10 @@ def _convert_file(file_path: Path, config, processor: MarkItDown) -> str | None:
         return processor.convert(str(file_path)).text_content
 
     if file_ext == ".pdf" and config.pipeline.ingestion.llm_ingestion:
-        content = _process_pdf_llm(file_path, config)
+        if llm_pdf_contents is not None and file_path in llm_pdf_contents:
+            content = llm_pdf_contents[file_path]
+        else:
+            content = _process_pdf_llm(file_path, config)
         if content is not None:
             return content
         # Fallback to standard conversion if LLM processing fails
@@ -130,105 +416,303 @@ def _extract_html(path: Path) -> str | None:
     """Extract markdown from HTML using trafilatura."""
     try:
         html = path.read_text(encoding="utf-8")
+    except Exception as e:
+        logger.debug(f"Failed to read {path.name}: {e}")
+        return None
+    return _extract_html_text(html, path.name)
+
+
+def _extract_html_text(html: str, name: str) -> str | None:
+    """Extract markdown from an HTML string using trafilatura."""
+    try:
         return trafilatura.extract(html, output_format="markdown", include_comments=False, include_tables=True)
     except Exception as e:
-        logger.debug(f"Trafilatura failed for {path.name}: {e}")
+        logger.debug(f"Trafilatura failed for {name}: {e}")
         return None
 
 
 def _process_pdf_llm(pdf_path: Path, config) -> str | None:
     """Convert every page of a PDF to Markdown using an LLM."""
+    return _process_pdfs_llm([pdf_path], config)[pdf_path]
+
+
+def _process_pdfs_llm(pdf_paths: list[Path], config) -> dict[Path, str | None]:
+    """Convert the pages of many PDFs to Markdown in one shared streamed inference run.
+
+    Pages from all files are scheduled together so the endpoint stays saturated, then regrouped
+    per file. Pages are rendered and encoded only as inference slots free up, so memory scales with
+    concurrency rather than with the corpus. With `pdf_text_layer_routing`, pages whose embedded text
+    layer passes `_usable_text_layer` are taken as-is. A file maps to None when any of its LLM pages
+    failed, so the caller can fall back to standard conversion for that file. With `pdf_llm_cache_dir`,
+    page outputs are cached by rendered page, prompt and model, and only uncached pages are sent.
+    """
     models = _load_models(config, "ingestion")
     ingestion_config = config.pipeline.ingestion
 
     if not models:
-        logger.warning(f"No LLM models configured for PDF ingestion of {pdf_path.name}.")
-        return None
-
-    dpi = ingestion_config.pdf_dpi
-    images = _pdf_to_images(pdf_path, dpi)
-    if not images:
-        return None  # Error already logged in _pdf_to_images
-
+        logger.warning("No LLM models configured for PDF ingestion.")
+        return dict.fromkeys(pdf_paths)
+
+    cache_dir = getattr(ingestion_config, "pdf_llm_cache_dir", None)
+    cache_dir = Path(cache_dir) if cache_dir else None
+    model_names = ",".join(sorted(model.model_name for model in models))
+
+    results: dict[Path, str | None] = {}
+    pages_by_file: dict[Path, list[str | None]] = {}
+
+    for pdf_path in pdf_paths:
+        if getattr(ingestion_config, "pdf_text_layer_routing", False):
+            pages = _extract_text_layers(pdf_path, ingestion_config)
+        else:
+            pages = [None] * _count_pages(pdf_path)
+        if not pages:
+            results[pdf_path] = None  # Error already logged
+            continue
+
+        llm_pages = sum(page is None for page in pages)
+        logger.debug(f"{pdf_path.name}: {len(pages) - llm_pages}/{len(pages)} pages served from text layer")
+        pages_by_file[pdf_path] = pages
+
+    if any(None in pages for pages in pages_by_file.values()):
+        logger.info(f"Streaming PDF pages from {len(pages_by_file)} files to the LLM")
+        page_calls = _iter_page_calls(pages_by_file, ingestion_config, cache_dir, model_names)
+        responses, call_pages = run_inference_stream(config, "ingestion", page_calls)
+        if not responses:
+            logger.error("LLM inference failed for all models during PDF ingestion")
+
+        # Regroup per file, taking the first model that produced each page
+        for call_idx, (pdf_path, page_idx, cache_key) in enumerate(call_pages):
+            page = next((replies[call_idx] for replies in responses.values() if replies[call_idx]), None)
+            pages_by_file[pdf_path][page_idx] = page
+            if page and cache_key:
+                _write_page_cache(cache_dir, cache_key, page)
+
+    for pdf_path, pages in pages_by_file.items():
+        if failed := sum(page is None for page in pages):
+            logger.warning(f"LLM ingestion failed for {failed}/{len(pages)} pages of {pdf_path.name}")
+            results[pdf_path] = None
+        else:
+            results[pdf_path] = "\n\n---\n\n".join(filter(None, pages))
+
+    return results
+
+
+def _iter_page_calls(
+    pages_by_file: dict[Path, list[str | None]], ingestion_config, cache_dir: Path | None, model_names: str
+) -> Iterator[tuple[InferenceCall, tuple[Path, int, str | None]]]:
+    """Yield `(call, (pdf_path, page_idx, cache_key))` for the pages still missing from `pages_by_file`.
+
+    Pages are rendered one at a time and encoded in worker threads, at most one page per worker
+    ahead of the consumer, so only a few rendered pages are held at once.
+    """
     prompt = ingestion_config.pdf_llm_prompt
-    calls = [
-        InferenceCall(
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:image/png;base64,{_img_to_b64(img)}"},
-                        },
-                    ],
-                }
-            ],
-            tags=["pdf_ingestion", f"page_{idx + 1}", pdf_path.name],
+    workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        encoding = deque()
+        for pdf_path, page_idx, image, cache_key in _iter_uncached_pages(
+            pages_by_file, ingestion_config, cache_dir, model_names
+        ):
+            encoding.append((pool.submit(_encode_image, image, ingestion_config), pdf_path, page_idx, cache_key))
+            if len(encoding) > workers:
+                url, pdf_path, page_idx, cache_key = encoding.popleft()
+                yield _make_page_call(url.result(), prompt, pdf_path, page_idx), (pdf_path, page_idx, cache_key)
+        while encoding:
+            url, pdf_path, page_idx, cache_key = encoding.popleft()
+            yield _make_page_call(url.result(), prompt, pdf_path, page_idx), (pdf_path, page_idx, cache_key)
+
+
+def _iter_uncached_pages(
+    pages_by_file: dict[Path, list[str | None]], ingestion_config, cache_dir: Path | None, model_names: str
+) -> Iterator[tuple[Path, int, Image.Image, str | None]]:
+    """Render the pages still missing from `pages_by_file`, one at a time.
+
+    Cached pages are filled in place; the others are yielded as `(pdf_path, page_idx, image, cache_key)`.
+    """
+    prompt = ingestion_config.pdf_llm_prompt
+    # The model sees the encoded image, so the encoding is part of the cache key
+    encoding = (
+        f"{getattr(ingestion_config, 'pdf_image_format', 'png')}:{getattr(ingestion_config, 'pdf_image_quality', 85)}"
+    )
+    cache_hits = 0
+
+    for pdf_path, pages in pages_by_file.items():
+        images = _iter_pdf_images(
+            pdf_path,
+            ingestion_config.pdf_dpi,
+            max_edge=getattr(ingestion_config, "pdf_max_image_edge", None),
+            grayscale_text_pages=getattr(ingestion_config, "pdf_grayscale_text_pages", False),
+            page_numbers=[i for i, page in enumerate(pages) if page is None],
         )
-        for idx, img in enumerate(images)
-    ]
+        try:
+            for page_idx, image in images:
+                cache_key = _page_cache_key(image, encoding, prompt, model_names) if cache_dir else None
+                if cache_key and (cached := _read_page_cache(cache_dir, cache_key)) is not None:
+                    pages[page_idx] = cached
+                    cache_hits += 1
+                    continue
+                yield pdf_path, page_idx, image, cache_key
+        except Exception as e:
+            # Pages not rendered stay None, so the file falls back to standard conversion
+            logger.error(f"Failed to convert {pdf_path.name} to images: {e}")
+
+    if cache_dir:
+        logger.info(f"Reused {cache_hits} cached PDF pages")
+
+
+def _page_cache_key(image: Image.Image, encoding: str, prompt: str, model_names: str) -> str:
+    """Hash a rendered page and its image encoding together with the prompt and models that convert it."""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.width}x{image.height}".encode())
+    digest.update(image.tobytes())
+    digest.update(encoding.encode("utf-8"))
+    digest.update(prompt.encode("utf-8"))
+    digest.update(model_names.encode("utf-8"))
+    return digest.hexdigest()
 
-    pages: list[str] = []
-    responses = run_inference(config, "ingestion", calls)
-    if not responses:
-        logger.error(f"LLM inference failed for all models on {pdf_path.name}")
+
+def _read_page_cache(cache_dir: Path, key: str) -> str | None:
+    """Return the cached Markdown for a page, if any."""
+    path = cache_dir / key[:2] / f"{key}.md"
+    try:
+        return path.read_text(encoding="utf-8") if path.is_file() else None
+    except OSError as e:
+        logger.debug(f"Failed to read page cache {path}: {e}")
         return None
 
-    # Consolidate responses from all models
-    for model_name in responses:
-        pages.extend(responses[model_name])
 
-    return "\n\n---\n\n".join(filter(None, pages))
+def _write_page_cache(cache_dir: Path, key: str, content: str) -> None:
+    """Store the Markdown for a page, replacing the file atomically."""
+    path = cache_dir / key[:2] / f"{key}.md"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        tmp_path.replace(path)
+    except OSError as e:
+        logger.warning(f"Failed to write page cache {path}: {e}")
+
+
+def _make_page_call(image_url: str, prompt: str, pdf_path: Path, page_idx: int) -> InferenceCall:
+    """Create a vision inference call for one rendered PDF page."""
+    return InferenceCall(
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": image_url}},
+                ],
+            }
+        ],
+        tags=["pdf_ingestion", f"page_{page_idx + 1}", pdf_path.name],
+    )
+
+
+def _count_pages(pdf_path: Path) -> int:
+    """Return the number of pages in a PDF, or 0 if it cannot be opened."""
+    try:
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception as e:
+        logger.error(f"Failed to open {pdf_path.name}: {e}")
+        return 0
 
 
-def _pdf_to_images(pdf_path: Path, dpi: int) -> list[Image.Image]:
-    """Convert PDF pages to images."""
+def _extract_text_layers(pdf_path: Path, ingestion_config) -> list[str | None] | None:
+    """Return each page's embedded text, or None for pages that need the LLM."""
     try:
         with fitz.open(pdf_path) as doc:
-            images = []
-            for page in doc:
-                pix = page.get_pixmap(dpi=dpi)
-                mode = "RGBA" if pix.alpha else "RGB"
-                img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-                images.append(img)
-            return images
+            return [_usable_text_layer(page, ingestion_config) for page in doc]
     except Exception as e:
-        logger.error(f"Failed to convert {pdf_path.name} to images: {e}")
-        return []
+        logger.error(f"Failed to read text layer of {pdf_path.name}: {e}")
+        return None
 
 
-def _img_to_b64(image: Image.Image) -> str:
-    """Convert PIL image to base64."""
-    with io.BytesIO() as buffer:
-        image.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode()
+def _usable_text_layer(page: fitz.Page, ingestion_config) -> str | None:
+    """Return the page's text layer if it is dense, clean and not dominated by images."""
+    text = page.get_text("text").strip()
+    if not text:
+        return None
 
+    page_area = page.rect.width * page.rect.height
+    if page_area <= 0:
+        return None
 
-def _upload_to_hub(config, md_files: list[Path]):
-    """Upload markdown files to Hugging Face Hub."""
-    if not md_files:
-        logger.warning("No markdown files to upload")
-        return
+    char_density = len(text) / (page_area / 72**2)  # characters per square inch
+    if char_density < getattr(ingestion_config, "pdf_text_min_char_density", 5.0):
+        return None
 
-    docs = []
-    for path in md_files:
-        try:
-            if content := path.read_text(encoding="utf-8").strip():
-                docs.append({
-                    "document_id": str(uuid.uuid4()),
-                    "document_text": content,
-                    "document_filename": path.name,
-                    "document_metadata": {"file_size": path.stat().st_size},
-                })
-        except Exception as e:
-            logger.error(f"Failed to read {path.name} for upload: {e}")
+    garbled = sum(1 for char in text if _is_garbled_char(char))
+    if garbled / len(text) > getattr(ingestion_config, "pdf_text_max_garbled_ratio", 0.02):
+        return None
 
-    if not docs:
-        logger.warning("No valid documents to upload")
-        return
+    image_area = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page.rect
+        if not bbox.is_empty:
+            image_area += bbox.width * bbox.height
+    if min(image_area / page_area, 1.0) > getattr(ingestion_config, "pdf_text_max_image_coverage", 0.25):
+        return None
+
+    return text
+
+
+def _is_garbled_char(char: str) -> bool:
+    """Whether a character points at a broken font mapping (replacement, private-use or control glyphs)."""
+    if char in "\n\t\r":
+        return False
+    return char == "\ufffd" or unicodedata.category(char) in {"Co", "Cn", "Cc", "Cs"}
+
+
+def _iter_pdf_images(
+    pdf_path: Path,
+    dpi: int,
+    max_edge: int | None = None,
+    grayscale_text_pages: bool = False,
+    page_numbers: list[int] | None = None,
+) -> Iterator[tuple[int, Image.Image]]:
+    """Render PDF pages one at a time as `(page_idx, image)`.
+
+    Pages are rendered at `dpi`, lowered per page so the long edge stays within `max_edge`
+    pixels. Pages without embedded images are rendered in grayscale when `grayscale_text_pages` is set.
+    Only the zero-based `page_numbers` are rendered when given.
+    """
+    with fitz.open(pdf_path) as doc:
+        for page_idx in range(doc.page_count) if page_numbers is None else page_numbers:
+            page = doc[page_idx]
+            zoom = _page_zoom(page, dpi, max_edge)
+            colorspace = fitz.csGRAY if grayscale_text_pages and not page.get_images() else fitz.csRGB
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace)
+            mode = "L" if pix.n - pix.alpha == 1 else "RGB"
+            if pix.alpha:
+                mode += "A"
+            yield page_idx, Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+
+def _page_zoom(page: fitz.Page, dpi: int, max_edge: int | None) -> float:
+    """Return the render zoom for a page, capped so its long edge fits in `max_edge` pixels."""
+    zoom = dpi / 72
+    long_edge = max(page.rect.width, page.rect.height)
+    if max_edge and long_edge * zoom > max_edge:
+        zoom = max_edge / long_edge
+    return zoom
+
+
+def _encode_image(image: Image.Image, ingestion_config) -> str:
+    """Encode a page image as a base64 data URL in the configured format."""
+    image_format = getattr(ingestion_config, "pdf_image_format", "png")
+    quality = getattr(ingestion_config, "pdf_image_quality", 85)
+    return f"data:{_IMAGE_MIME_TYPES[image_format]};base64,{_img_to_b64(image, image_format, quality)}"
+
+
+def _img_to_b64(image: Image.Image, image_format: str = "png", quality: int = 85) -> str:
+    """Convert PIL image to base64 in the given format (png, jpeg or webp)."""
+    save_kwargs = {}
+    if image_format in {"jpeg", "webp"}:
+        save_kwargs["quality"] = quality
+        if image_format == "jpeg" and image.mode not in {"L", "RGB"}:
+            image = image.convert("RGB")
 
-    dataset = Dataset.from_list(docs)
-    custom_save_dataset(dataset, config, subset="ingested", push_to_hub=config.hf_configuration.push_to_hub)
-    logger.info(f"Uploaded {len(docs)} documents to Hub")
+    with io.BytesIO() as buffer:
+        image.save(buffer, format=image_format.upper(), **save_kwargs)
+        return base64.b64encode(buffer.getvalue()).decode()
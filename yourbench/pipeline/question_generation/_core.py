@@ -15,13 +15,22 @@ from yourbench.utils.parsing_engine import (
 from yourbench.utils.prompt_builder import build_system_prompt
 from yourbench.utils.logging_context import log_step, log_stage
 from yourbench.utils.cross_document_utils import create_cross_document_dataset
-from yourbench.utils.inference.inference_core import run_inference
+from yourbench.utils.inference.inference_core import _load_models, run_inference, run_inference_stream
 from yourbench.utils.inference.inference_builders import (
+    iter_multi_hop_inference_calls,
     build_multi_hop_inference_calls,
+    iter_single_shot_inference_calls,
     build_single_shot_inference_calls,
 )
 
 
+# Lazy counterparts of the list builders, used when a stage sets `stream_calls`
+_LAZY_BUILDERS = {
+    build_single_shot_inference_calls: iter_single_shot_inference_calls,
+    build_multi_hop_inference_calls: iter_multi_hop_inference_calls,
+}
+
+
 def _get_system_prompt(stage_cfg: Any, mode: str, is_multi: bool = False) -> str:
     """Get system prompt, substituting schema placeholders if custom schema is specified."""
     prefix = "multi_hop_" if is_multi else "single_shot_"
@@ -46,35 +55,128 @@ def _validate_mode(mode: str) -> str:
 
 
 def _build_and_run_inference(
-    dataset: Dataset, system_msg: dict, stage_cfg: Any, builder_func: callable, step_name: str, config
-) -> tuple[dict, list]:
-    """Common pattern: build calls, run inference, return responses + index map."""
+    dataset: Dataset,
+    system_msg: dict,
+    stage_cfg: Any,
+    builder_func: callable,
+    step_name: str,
+    config,
+    subset: str | None = None,
+) -> tuple[dict, list, list[dict]]:
+    """Common pattern: build calls, run inference, return responses + index map.
+
+    With `incremental` set on the stage, calls already answered in the existing `subset` are skipped.
+    Their previous question rows are returned third, to be saved along with the new ones; it is
+    empty when nothing changed, or when the stage is not incremental.
+    """
     sampling_cfg = (
         get_sampling_cfg(stage_cfg) if hasattr(builder_func, "__name__") and "single" in builder_func.__name__ else {}
     )
-
-    calls, index_map = (
-        builder_func(dataset, system_msg, stage_cfg, sampling_cfg)
-        if sampling_cfg
-        else builder_func(dataset, system_msg, stage_cfg)
+    stream = getattr(stage_cfg, "stream_calls", False) and builder_func in _LAZY_BUILDERS
+    build = _LAZY_BUILDERS[builder_func] if stream else builder_func
+    built = (
+        build(dataset, system_msg, stage_cfg, sampling_cfg) if sampling_cfg else build(dataset, system_msg, stage_cfg)
     )
-
-    if not calls:
+    pairs = built if stream else zip(*built)
+
+    previous_rows, reused = [], {}
+    if subset and getattr(stage_cfg, "incremental", False):
+        previous_rows = _load_previous_questions(config, subset)
+        model_names = [model.model_name for model in _load_models(config, step_name)]
+        pairs = _skip_answered_calls(pairs, previous_rows, model_names, reused)
+
+    if stream:
+        responses, index_map = run_inference_stream(config=config, step_name=step_name, call_stream=pairs)
+    else:
+        calls, index_map = [], []
+        for call, entry in pairs:
+            calls.append(call)
+            index_map.append(entry)
+        responses = run_inference(config=config, step_name=step_name, inference_calls=calls) if calls else {}
+
+    kept_rows = _relink_reused_rows(previous_rows, reused)
+    if previous_rows:
+        logger.info(
+            f"Incremental {step_name}: reusing {len(reused)} answered chunks or groups ({len(kept_rows)} questions), "
+            f"dropping {len(previous_rows) - len(kept_rows)} outdated questions, running {len(index_map)} calls"
+        )
+        if not index_map and len(kept_rows) == len(previous_rows):
+            logger.info(f"{subset} is up to date")
+            return {}, [], []
+    elif not index_map:
         logger.warning(f"No valid inference calls for {step_name}")
-        return {}, []
-
-    responses = run_inference(config=config, step_name=step_name, inference_calls=calls)
-    return responses, index_map
-
-
-def _save_questions(rows: list[dict], config, subset: str) -> None:
-    """Save question rows after deduplication."""
+    return responses, index_map, kept_rows
+
+
+def _load_previous_questions(config, subset: str) -> list[dict]:
+    """Rows of an existing question subset that carry a generation fingerprint."""
+    try:
+        dataset = custom_load_dataset(config=config, subset=subset)
+    except Exception as e:
+        logger.info(f"No existing {subset} to extend, generating all questions: {e}")
+        return []
+    if not dataset or "generation_fingerprint" not in dataset.column_names:
+        return []
+    return [row for row in dataset.to_list() if row["generation_fingerprint"]]
+
+
+def _skip_answered_calls(pairs, previous_rows: list[dict], model_names: list[str], reused: dict[str, tuple]):
+    """Drop `(call, index_entry)` pairs every model already answered.
+
+    A fingerprint covers the chunk texts, prompt template, instructions, schema and sampling
+    parameters, so changed chunks, prompts or schemas produce new calls. A call is rerun for all
+    models if any model has no questions for it yet. Each fingerprint of a skipped call is mapped in
+    `reused` to its current `(document_id, chunk_ref)`, since ids change when documents are re-ingested.
+    """
+    answered: dict[str, set[str]] = {}
+    for row in previous_rows:
+        answered.setdefault(row["generation_fingerprint"], set()).add(row["generating_model"])
+
+    required = set(model_names)
+    for call, entry in pairs:
+        # Batched single-shot calls hold one fingerprint per chunk
+        if isinstance(entry[3], list):
+            refs = dict(zip(entry[3], entry[2]))
+        else:
+            refs = {entry[3]: entry[2]}
+        models = set().union(*(answered.get(fingerprint, set()) for fingerprint in refs))
+        if required and required <= models:
+            reused.update((fingerprint, (entry[1], chunk_ref)) for fingerprint, chunk_ref in refs.items())
+            continue
+        yield call, entry
+
+
+def _relink_reused_rows(previous_rows: list[dict], reused: dict[str, tuple]) -> list[dict]:
+    """Previous rows of reused calls, pointed at the current document and chunk ids."""
+    kept_rows = []
+    for row in previous_rows:
+        if (current := reused.get(row["generation_fingerprint"])) is None:
+            continue
+        document_id, chunk_ref = current
+        row = {**row, "document_id": document_id}
+        if isinstance(chunk_ref, list):
+            row["source_chunk_ids"] = chunk_ref
+        else:
+            row["chunk_id"] = chunk_ref
+        kept_rows.append(row)
+    return kept_rows
+
+
+def _save_questions(rows: list[dict], config, subset: str, overwrite: bool = False) -> None:
+    """Save question rows after deduplication.
+
+    Incremental stages pass `overwrite`, since their rows already include the reused questions.
+    """
     if not (clean_rows := _remove_duplicate_questions(rows)):
         return
 
     logger.info(f"Saving {len(clean_rows)} {subset}")
     custom_save_dataset(
-        Dataset.from_list(clean_rows), config=config, subset=subset, push_to_hub=config.hf_configuration.push_to_hub
+        Dataset.from_list(clean_rows),
+        config=config,
+        subset=subset,
+        push_to_hub=config.hf_configuration.push_to_hub,
+        overwrite=overwrite,
     )
 
 
@@ -98,18 +200,19 @@ def run_single_shot(config) -> None:
             logger.debug(f"Loaded {len(dataset) if dataset else 0} documents")
 
         with log_step("generating_questions"):
-            responses, index_map = _build_and_run_inference(
+            responses, index_map, previous_rows = _build_and_run_inference(
                 dataset,
                 system_msg,
                 stage_cfg,
                 build_single_shot_inference_calls,
                 "single_shot_question_generation",
                 config,
+                subset="single_shot_questions",
             )
 
         with log_step("saving_questions"):
-            if rows := parse_single_shot_responses(responses, index_map, stage_cfg):
-                _save_questions(rows, config, "single_shot_questions")
+            if rows := previous_rows + parse_single_shot_responses(responses, index_map, stage_cfg):
+                _save_questions(rows, config, "single_shot_questions", overwrite=stage_cfg.incremental)
                 logger.info(f"Saved {len(rows)} single-shot questions")
 
 
@@ -172,9 +275,9 @@ def _process_questions(dataset: Dataset, label: str, system_msg: dict, stage_cfg
         logger.warning(f"No valid {label} dataset")
         return
 
-    responses, index_map = _build_and_run_inference(
-        dataset, system_msg, stage_cfg, build_multi_hop_inference_calls, step_name, config
+    responses, index_map, previous_rows = _build_and_run_inference(
+        dataset, system_msg, stage_cfg, build_multi_hop_inference_calls, step_name, config, subset=label
     )
 
-    if rows := parse_multi_hop_responses(responses, index_map, stage_cfg):
-        _save_questions(rows, config, label)
+    if rows := previous_rows + parse_multi_hop_responses(responses, index_map, stage_cfg):
+        _save_questions(rows, config, label, overwrite=getattr(stage_cfg, "incremental", False))
@@ -0,0 +1,181 @@
+"""Streaming execution of summarization, chunking and question generation.
+
+In the staged pipeline every document waits for the slowest summary before chunking starts, and for
+the last chunk before any question is requested. Here each document moves on as soon as its own
+summary is ready, so summarization and question generation calls are in flight at the same time.
+Each stage keeps its own per-model concurrency limit.
+"""
+
+import asyncio
+
+from loguru import logger
+
+from yourbench.pipeline import chunking, summarization
+from yourbench.utils.chunking_utils import get_sampling_cfg
+from yourbench.utils.dataset_engine import custom_load_dataset, custom_save_dataset
+from yourbench.utils.parsing_engine import parse_multi_hop_responses, parse_single_shot_responses
+from yourbench.utils.logging_context import log_step, log_stage
+from yourbench.utils.inference.inference_core import (
+    _load_models,
+    create_model_semaphores,
+    run_inference_with_semaphores,
+)
+from yourbench.pipeline.question_generation._core import _validate_mode, _save_questions, _get_system_prompt
+from yourbench.utils.inference.inference_builders import (
+    build_multi_hop_inference_calls,
+    build_single_shot_inference_calls,
+)
+
+
+# Stages covered by a streaming run, in pipeline order
+STREAMED_STAGES = (
+    "summarization",
+    "chunking",
+    "single_shot_question_generation",
+    "multi_hop_question_generation",
+)
+
+
+class _StageRunner:
+    """Runs one stage's inference calls with that stage's models and concurrency limits."""
+
+    def __init__(self, config, step_name: str):
+        self.step_name = step_name
+        self.models = _load_models(config, step_name)
+        self.semaphores = create_model_semaphores(self.models)
+
+    async def __call__(self, calls) -> dict[str, list[str]]:
+        if not calls or not self.models:
+            return {}
+        return await run_inference_with_semaphores(self.models, self.step_name, calls, self.semaphores)
+
+
+def run(config) -> None:
+    """Summarize, chunk and generate questions per document, overlapping the stages."""
+    with log_stage("streaming"):
+        dataset = custom_load_dataset(config=config, subset="ingested")
+        if not dataset:
+            logger.warning("No documents to process")
+            return
+
+        pipeline = config.pipeline
+        if getattr(pipeline.chunking, "dedup_chunks", False):
+            logger.warning("dedup_chunks needs the whole corpus and is not applied in streaming mode")
+        question_stages = [
+            stage for stage in STREAMED_STAGES[2:] if getattr(getattr(pipeline, stage, None), "run", False)
+        ]
+        logger.info(f"Streaming {len(dataset)} documents through summarization, chunking and {question_stages}")
+
+        with log_step("streaming_documents", num_docs=len(dataset)):
+            results = asyncio.run(_run_documents(config, list(dataset), question_stages))
+
+        with log_step("saving_results"):
+            push_to_hub = config.hf_configuration.push_to_hub
+            dataset = dataset.add_column("document_summary", [r["summary"] for r in results])
+            dataset = dataset.add_column("summarization_model", [r["summarization_model"] for r in results])
+            custom_save_dataset(dataset=dataset, config=config, subset="summarized", push_to_hub=push_to_hub)
+
+            dataset = dataset.add_column("chunks", [r["chunks"] for r in results])
+            dataset = dataset.add_column("multihop_chunks", [r["multihop_chunks"] for r in results])
+            custom_save_dataset(dataset=dataset, config=config, subset="chunked", push_to_hub=push_to_hub)
+
+            for stage, subset in (
+                ("single_shot_question_generation", "single_shot_questions"),
+                ("multi_hop_question_generation", "multi_hop_questions"),
+            ):
+                if stage in question_stages:
+                    _save_questions([q for r in results for q in r[stage]], config, subset)
+
+        logger.success(f"Streaming complete for {len(dataset)} documents")
+
+
+async def _run_documents(config, rows: list[dict], question_stages: list[str]) -> list[dict]:
+    """Process all documents concurrently; results keep the input order."""
+    pipeline = config.pipeline
+    runners = {stage: _StageRunner(config, stage) for stage in ["summarization", *question_stages]}
+    system_msgs = {
+        stage: {
+            "role": "system",
+            "content": _get_system_prompt(
+                getattr(pipeline, stage),
+                _validate_mode(getattr(pipeline, stage).question_mode),
+                is_multi=stage.startswith("multi_hop"),
+            ),
+        }
+        for stage in question_stages
+    }
+    return await asyncio.gather(*(_process_document(config, row, runners, system_msgs) for row in rows))
+
+
+async def _process_document(config, row: dict, runners: dict, system_msgs: dict) -> dict:
+    """Run one document through every streamed stage."""
+    summary, model_name = await _summarize(config.pipeline.summarization, row["document_text"], runners)
+    row = {**row, "document_summary": summary, "summarization_model": model_name}
+
+    chunks, multihop_chunks = await asyncio.to_thread(chunking._process_document, row, config.pipeline.chunking)
+    row.update(chunks=chunks, multihop_chunks=multihop_chunks)
+
+    questions = await asyncio.gather(
+        *(_generate_questions(config, stage, row, runners, system_msgs) for stage in system_msgs)
+    )
+    return {
+        "summary": summary,
+        "summarization_model": model_name,
+        "chunks": chunks,
+        "multihop_chunks": multihop_chunks,
+        **dict(zip(system_msgs, questions)),
+    }
+
+
+async def _summarize(cfg, text: str, runners: dict) -> tuple[str, str]:
+    """Summarize one document, chunking and tree-reducing it like the summarization stage."""
+    if getattr(cfg, "mode", "llm") == "extractive":
+        enc = summarization._get_encoder(cfg.encoding_name)
+
+        def count_tokens(t: str) -> int:
+            return len(enc.encode(t, disallowed_special=()))
+
+        summary = await asyncio.to_thread(
+            summarization.extractive_summary, text, cfg.extractive_max_tokens, count_tokens
+        )
+        return summary, "extractive"
+
+    run = runners["summarization"]
+    _, chunks = await asyncio.to_thread(
+        summarization._split_document, text, cfg.max_tokens, cfg.token_overlap, cfg.encoding_name
+    )
+    pieces = [text] if chunks is None else chunks
+    calls = [summarization._make_call(piece, cfg.summarization_user_prompt) for piece in pieces]
+    mapping = [(0, -1 if chunks is None else j) for j in range(len(pieces))]
+    model_name, chunks_by_doc = summarization._parse_chunk_responses(await run(calls), mapping, 1)
+
+    steps = summarization._tree_reduce_steps(
+        chunks_by_doc,
+        cfg.combine_summaries_user_prompt,
+        getattr(cfg, "combine_max_tokens", cfg.max_tokens),
+        cfg.encoding_name,
+    )
+    try:
+        combine_calls = next(steps)
+        while True:
+            responses = await run(combine_calls)
+            combine_calls = steps.send(list(responses.values())[0] if responses else [])
+    except StopIteration as done:
+        return done.value[0], model_name
+
+
+async def _generate_questions(config, stage: str, row: dict, runners: dict, system_msgs: dict) -> list[dict]:
+    """Build, run and parse one question generation stage for a single chunked document."""
+    stage_cfg = getattr(config.pipeline, stage)
+    if stage == "single_shot_question_generation":
+        calls, index_map = build_single_shot_inference_calls(
+            [row], system_msgs[stage], stage_cfg, get_sampling_cfg(stage_cfg)
+        )
+        parse = parse_single_shot_responses
+    else:
+        calls, index_map = build_multi_hop_inference_calls([row], system_msgs[stage], stage_cfg)
+        parse = parse_multi_hop_responses
+
+    if not calls:
+        return []
+    return parse(await runners[stage](calls), index_map, stage_cfg)
@@ -1,14 +1,28 @@
+import os
+import re
+from typing import Generator
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
 import tiktoken
 from loguru import logger
 
 from datasets import Dataset
-from yourbench.utils.chunking_utils import split_into_token_chunks
+from yourbench.utils.chunking_utils import _window_starts
 from yourbench.utils.dataset_engine import custom_load_dataset, custom_save_dataset
 from yourbench.utils.parsing_engine import extract_content_from_xml_tags
 from yourbench.utils.logging_context import log_step, log_stage
+from yourbench.utils.extractive_utils import extractive_summary
 from yourbench.utils.inference.inference_core import InferenceCall, run_inference
 
 
+# Below this many characters, tokenization stays in the main process
+_PARALLEL_MIN_CHARS = 2_000_000
+# Upper bound on documents per packed call, to keep the tagged output within typical completion limits
+_MAX_DOCS_PER_PACK = 16
+_PACKED_SUMMARY_RE = re.compile(r'<document_summary id="(\d+)">(.*?)</document_summary>', re.DOTALL)
+
+
 def run(config) -> None:
     """Execute hierarchical document summarization."""
     with log_stage("summarization"):
@@ -18,29 +32,14 @@ def run(config) -> None:
             logger.warning("No documents to summarize")
             return
 
-        logger.info(f"Summarizing {len(dataset)} documents")
+        mode = getattr(cfg, "mode", "llm")
+        logger.info(f"Summarizing {len(dataset)} documents ({mode})")
 
-        # Stage 1: Chunk summaries
-        with log_step("chunk_summaries", num_docs=len(dataset)):
-            calls, mapping = _build_calls(
-                dataset, cfg.max_tokens, cfg.token_overlap, cfg.encoding_name, cfg.summarization_user_prompt
-            )
-            logger.debug(f"Created {len(calls)} summarization calls")
-            responses = run_inference(config=config, step_name="summarization", inference_calls=calls)
-            model_name, chunks_by_doc = _parse_chunk_responses(responses, mapping, len(dataset))
-
-        # Stage 2: Combine summaries for multi-chunk docs
-        with log_step("combine_summaries"):
-            combine_calls, combine_indices = _build_combine_calls(chunks_by_doc, cfg.combine_summaries_user_prompt)
-            if combine_calls:
-                logger.debug(f"Combining summaries for {len(combine_calls)} multi-chunk documents")
-                combine_responses = run_inference(
-                    config=config, step_name="summarization", inference_calls=combine_calls
-                )
-                combined = list(combine_responses.values())[0] if combine_responses else []
-                final_summaries = _merge_summaries(chunks_by_doc, combined, combine_indices)
-            else:
-                final_summaries = [chunks[0] if chunks else "" for chunks in chunks_by_doc]
+        if mode == "extractive":
+            with log_step("extractive_summaries", num_docs=len(dataset)):
+                model_name, final_summaries = "extractive", _summarize_extractive(dataset, cfg)
+        else:
+            model_name, final_summaries = _summarize_llm(config, dataset, cfg)
 
         # Save results
         with log_step("saving_results"):
@@ -52,24 +51,134 @@ def run(config) -> None:
             logger.success(f"Summarization complete for {len(dataset)} documents")
 
 
+def _summarize_llm(config, dataset: Dataset, cfg) -> tuple[str, list[str]]:
+    """Summarize documents with the summarization model, returning the model name and summaries."""
+    # Stage 1: Chunk summaries
+    with log_step("chunk_summaries", num_docs=len(dataset)):
+        pack_documents = getattr(cfg, "pack_documents", False)
+        calls, mapping, packs = _build_calls(
+            dataset,
+            cfg.max_tokens,
+            cfg.token_overlap,
+            cfg.encoding_name,
+            cfg.summarization_user_prompt,
+            num_proc=getattr(cfg, "num_proc", None),
+            pack_max_tokens=cfg.pack_max_tokens if pack_documents else None,
+            packed_prompt=getattr(cfg, "packed_summarization_user_prompt", ""),
+        )
+        logger.debug(f"Created {len(calls)} summarization calls ({len(packs)} packed)")
+        responses = run_inference(config=config, step_name="summarization", inference_calls=calls)
+        model_name, chunks_by_doc = _parse_chunk_responses(responses, mapping, len(dataset), packs)
+        if packs:
+            _retry_unparsed_packs(config, dataset, chunks_by_doc, packs, cfg.summarization_user_prompt)
+
+    # Stage 2: Combine summaries for multi-chunk docs, level by level
+    with log_step("combine_summaries"):
+        final_summaries = _tree_reduce(
+            config,
+            chunks_by_doc,
+            cfg.combine_summaries_user_prompt,
+            getattr(cfg, "combine_max_tokens", cfg.max_tokens),
+            cfg.encoding_name,
+        )
+
+    return model_name, final_summaries
+
+
+def _summarize_extractive(dataset: Dataset, cfg) -> list[str]:
+    """Summarize documents locally by selecting their most central sentences."""
+    enc = _get_encoder(cfg.encoding_name)
+
+    def count_tokens(text: str) -> int:
+        return len(enc.encode(text, disallowed_special=()))
+
+    return [extractive_summary(text, cfg.extractive_max_tokens, count_tokens) for text in dataset["document_text"]]
+
+
 def _build_calls(
-    dataset: Dataset, max_tokens: int, overlap: int, encoding: str, prompt: str
-) -> tuple[list[InferenceCall], list[tuple[int, int]]]:
-    """Build inference calls for chunked summaries."""
-    enc = _get_encoder(encoding)
+    dataset: Dataset,
+    max_tokens: int,
+    overlap: int,
+    encoding: str,
+    prompt: str,
+    num_proc: int | None = None,
+    pack_max_tokens: int | None = None,
+    packed_prompt: str = "",
+) -> tuple[list[InferenceCall], list[tuple[int, int]], list[list[int]]]:
+    """Build inference calls for chunked summaries.
+
+    Returns the calls, the (document, chunk) index of each single-document call, and the document
+    indices of each packed call. With `pack_max_tokens`, short documents are bin-packed into
+    multi-document calls, which come after all single-document calls.
+    """
+    texts = dataset["document_text"]
+    splits = _split_documents(texts, max_tokens, overlap, encoding, num_proc)
+    packs = []
+    if pack_max_tokens:
+        # Documents that need chunking are never packed
+        packs = _pack_documents([n if chunks is None else None for n, chunks in splits], pack_max_tokens)
+    packed = {i for pack in packs for i in pack}
     calls, mapping = [], []
 
-    for i, text in enumerate(dataset["document_text"]):
-        if len(enc.encode(text)) <= max_tokens:
+    for i, (text, (_, chunks)) in enumerate(zip(texts, splits)):
+        if i in packed:
+            continue
+        if chunks is None:
             calls.append(_make_call(text, prompt))
             mapping.append((i, -1))
         else:
-            chunks = split_into_token_chunks(text, max_tokens, overlap, encoding)
             for j, chunk in enumerate(chunks):
                 calls.append(_make_call(chunk, prompt))
                 mapping.append((i, j))
 
-    return calls, mapping
+    calls.extend(_make_packed_call([texts[i] for i in pack], packed_prompt) for pack in packs)
+    return calls, mapping, packs
+
+
+def _pack_documents(token_counts: list[int | None], max_tokens: int) -> list[list[int]]:
+    """First-fit-decreasing bin packing of documents into groups of at most `max_tokens` tokens.
+
+    Documents with a count of None are skipped. Only groups of two or more documents are returned;
+    everything else is summarized on its own.
+    """
+    candidates = [i for i, n in enumerate(token_counts) if n is not None and n <= max_tokens]
+    bins: list[tuple[int, list[int]]] = []
+    for idx in sorted(candidates, key=lambda i: -token_counts[i]):
+        n_tokens = token_counts[idx]
+        for b, (used, members) in enumerate(bins):
+            if used + n_tokens <= max_tokens and len(members) < _MAX_DOCS_PER_PACK:
+                bins[b] = (used + n_tokens, members + [idx])
+                break
+        else:
+            bins.append((n_tokens, [idx]))
+    return [sorted(members) for _, members in bins if len(members) > 1]
+
+
+def _split_documents(
+    texts: list[str], max_tokens: int, overlap: int, encoding: str, num_proc: int | None = None
+) -> list[tuple[int, list[str] | None]]:
+    """Split every document that exceeds `max_tokens`, tokenizing each one once.
+
+    Large corpora are tokenized in a process pool of `num_proc` workers (default: all CPUs); small
+    ones stay in-process since spawning workers would cost more than the tokenization itself.
+    """
+    split = partial(_split_document, max_tokens=max_tokens, overlap=overlap, encoding_name=encoding)
+    num_proc = num_proc or os.cpu_count() or 1
+    if num_proc <= 1 or len(texts) < 2 or sum(map(len, texts)) < _PARALLEL_MIN_CHARS:
+        return [split(text) for text in texts]
+
+    with ProcessPoolExecutor(max_workers=min(num_proc, len(texts))) as executor:
+        return list(executor.map(split, texts, chunksize=max(1, len(texts) // (num_proc * 4))))
+
+
+def _split_document(text: str, max_tokens: int, overlap: int, encoding_name: str) -> tuple[int, list[str] | None]:
+    """Return the token count of a document and its token chunks, or None when it fits in `max_tokens`."""
+    enc = _get_encoder(encoding_name)
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return len(tokens), None
+    starts = _window_starts(len(tokens), max_tokens, overlap)
+    return len(tokens), [enc.decode(tokens[i : i + max_tokens]) for i in starts]
 
 
 def _make_call(text: str, prompt: str) -> InferenceCall:
@@ -77,6 +186,40 @@ def _make_call(text: str, prompt: str) -> InferenceCall:
     return InferenceCall(messages=[{"role": "user", "content": prompt.format(document=text)}], tags=["chunk_summary"])
 
 
+def _make_packed_call(texts: list[str], prompt: str) -> InferenceCall:
+    """Create a call summarizing several short documents, each tagged with its position."""
+    documents = "\n\n".join(f'<document id="{k}">\n{text}\n</document>' for k, text in enumerate(texts, 1))
+    return InferenceCall(
+        messages=[{"role": "user", "content": prompt.format(documents=documents)}], tags=["packed_summary"]
+    )
+
+
+def _parse_packed_response(response: str, num_docs: int) -> list[str]:
+    """Split a packed response into per-document summaries, with "" for documents missing from it."""
+    summaries = [""] * num_docs
+    for doc_id, summary in _PACKED_SUMMARY_RE.findall(response or ""):
+        if 1 <= (k := int(doc_id)) <= num_docs:
+            summaries[k - 1] = summary.strip()
+    return summaries
+
+
+def _retry_unparsed_packs(
+    config, dataset: Dataset, chunks_by_doc: list[list[str]], packs: list[list[int]], prompt: str
+) -> None:
+    """Summarize packed documents missing from their packed response with single calls, in place."""
+    failed = [i for pack in packs for i in pack if not chunks_by_doc[i]]
+    if not failed:
+        return
+
+    logger.warning(f"{len(failed)} packed documents were not summarized; retrying them individually")
+    texts = dataset.select(failed)["document_text"]
+    calls = [_make_call(text, prompt) for text in texts]
+    responses = run_inference(config=config, step_name="summarization", inference_calls=calls)
+    _, retried = _parse_chunk_responses(responses, list(enumerate(failed)), len(failed))
+    for summaries, doc_idx in zip(retried, failed):
+        chunks_by_doc[doc_idx] = summaries
+
+
 def _get_encoder(encoding_name: str) -> tiktoken.Encoding:
     """Get tiktoken encoder with fallback."""
     try:
@@ -86,14 +229,21 @@ def _get_encoder(encoding_name: str) -> tiktoken.Encoding:
         return tiktoken.get_encoding("cl100k_base")
 
 
-def _parse_chunk_responses(responses: dict, mapping: list, num_docs: int) -> tuple[str, list[list[str]]]:
-    """Parse chunk summaries back to per-document lists."""
+def _parse_chunk_responses(
+    responses: dict, mapping: list, num_docs: int, packs: list[list[int]] = ()
+) -> tuple[str, list[list[str]]]:
+    """Parse chunk summaries back to per-document lists.
+
+    Responses to packed calls follow those in `mapping`; packed documents missing from their
+    response are left with an empty list.
+    """
     model_name = list(responses.keys())[0] if responses else "unknown"
     raw_responses = responses.get(model_name, [])
 
     # Ensure response count matches
-    if len(raw_responses) < len(mapping):
-        raw_responses.extend([""] * (len(mapping) - len(raw_responses)))
+    expected = len(mapping) + len(packs)
+    if len(raw_responses) < expected:
+        raw_responses.extend([""] * (expected - len(raw_responses)))
 
     # Group by document
     summaries_by_doc = [[] for _ in range(num_docs)]
@@ -105,34 +255,100 @@ def _parse_chunk_responses(responses: dict, mapping: list, num_docs: int) -> tup
         )
         summaries_by_doc[doc_idx].append(summary.strip())
 
+    for resp, pack in zip(raw_responses[len(mapping) :], packs):
+        for doc_idx, summary in zip(pack, _parse_packed_response(resp, len(pack))):
+            if summary:
+                summaries_by_doc[doc_idx].append(summary)
+
     return model_name, summaries_by_doc
 
 
-def _build_combine_calls(summaries_by_doc: list[list[str]], prompt: str) -> tuple[list[InferenceCall], list[int]]:
-    """Build calls to combine multi-chunk summaries."""
-    calls, indices = [], []
+def _tree_reduce(config, chunks_by_doc: list[list[str]], prompt: str, max_tokens: int, encoding: str) -> list[str]:
+    """Combine multi-chunk summaries into one summary per document.
+
+    Each level of the reduction is one inference run across all documents.
+    """
+    steps = _tree_reduce_steps(chunks_by_doc, prompt, max_tokens, encoding)
+    try:
+        calls = next(steps)
+        while True:
+            responses = run_inference(config=config, step_name="summarization", inference_calls=calls)
+            calls = steps.send(list(responses.values())[0] if responses else [])
+    except StopIteration as done:
+        return done.value
+
+
+def _tree_reduce_steps(
+    chunks_by_doc: list[list[str]], prompt: str, max_tokens: int, encoding: str
+) -> Generator[list[InferenceCall], list[str], list[str]]:
+    """Drive a tree reduce of chunk summaries, independent of how inference is run.
+
+    Summaries are grouped into batches that fit `max_tokens` and each batch is combined; this repeats
+    until a single summary remains, so documents of any length stay within the combine context. The
+    generator yields the combine calls of each level, expects their responses to be sent back, and
+    returns the final summaries. Failed combines are dropped.
+    """
+    enc = _get_encoder(encoding)
+    final = [chunks[0] if chunks else "" for chunks in chunks_by_doc]
+    pending = {i: valid for i, chunks in enumerate(chunks_by_doc) if len(valid := [s for s in chunks if s]) > 1}
+
+    level = 0
+    while pending:
+        level += 1
+        calls, owners = _build_combine_calls(pending, prompt, enc, max_tokens)
+        logger.debug(f"Combine level {level}: {len(calls)} calls for {len(pending)} documents")
+        combined = yield calls
+
+        reduced: dict[int, list[str]] = {i: [] for i in pending}
+        for resp, doc_idx in zip(combined, owners):
+            if parsed := extract_content_from_xml_tags(resp, "final_summary"):
+                reduced[doc_idx].append(parsed.strip())
+
+        pending = {}
+        for doc_idx, summaries in reduced.items():
+            if len(summaries) > 1:
+                pending[doc_idx] = summaries
+            else:
+                final[doc_idx] = summaries[0] if summaries else "No summary available."
+
+    return final
+
 
-    for i, summaries in enumerate(summaries_by_doc):
-        valid = [s for s in summaries if s]
-        if len(valid) > 1:
-            bullet_list = "\n".join(f"- {s}" for s in valid)
+def _build_combine_calls(
+    summaries_by_doc: dict[int, list[str]], prompt: str, enc, max_tokens: int
+) -> tuple[list[InferenceCall], list[int]]:
+    """Build one combine call per batch of summaries, returning the calls and their document indices."""
+    calls, owners = [], []
+    for doc_idx, summaries in summaries_by_doc.items():
+        for batch in _batch_summaries(summaries, enc, max_tokens):
+            bullet_list = "\n".join(f"- {s}" for s in batch)
             calls.append(
                 InferenceCall(
                     messages=[{"role": "user", "content": prompt.format(chunk_summaries=bullet_list)}],
                     tags=["merge_summary"],
                 )
             )
-            indices.append(i)
+            owners.append(doc_idx)
+    return calls, owners
 
-    return calls, indices
 
+def _batch_summaries(summaries: list[str], enc, max_tokens: int) -> list[list[str]]:
+    """Greedily group consecutive summaries into batches of at most `max_tokens` tokens.
 
-def _merge_summaries(chunks_by_doc: list[list[str]], combined: list[str], indices: list[int]) -> list[str]:
-    """Merge combined summaries into final list."""
-    final = [chunks[0] if chunks else "" for chunks in chunks_by_doc]
-
-    for resp, idx in zip(combined, indices):
-        parsed = extract_content_from_xml_tags(resp, "final_summary")
-        final[idx] = parsed.strip() if parsed else "No summary available."
+    Every batch holds at least two summaries (except a trailing single one, which is merged into the
+    previous batch) so each level strictly shrinks the number of summaries.
+    """
+    batches, current, current_tokens = [], [], 0
+    for summary in summaries:
+        n_tokens = len(enc.encode(summary, disallowed_special=()))
+        if len(current) >= 2 and current_tokens + n_tokens > max_tokens:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += n_tokens
 
-    return final
+    if len(current) == 1 and batches:
+        batches[-1].extend(current)
+    elif current:
+        batches.append(current)
+    return batches
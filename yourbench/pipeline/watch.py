@@ -0,0 +1,174 @@
+"""Watch mode: keep a benchmark current as source documents change.
+
+`watch` monitors `source_documents_dir`, and whenever files settle after a change it runs the
+enabled stages on just the new or modified files. Each delta run writes to a scratch dataset
+directory, and its subsets are then appended to the configured dataset with `concat_if_exist`
+semantics. The files already processed are tracked in a state file inside `output_dir`, so a
+restarted watcher only picks up what changed while it was down.
+"""
+
+import glob
+import json
+import time
+import tempfile
+from typing import Iterator
+from pathlib import Path
+
+from loguru import logger
+
+from datasets import load_from_disk
+from yourbench.conf.loader import get_enabled_stages
+from yourbench.pipeline.handler import run_stage
+from yourbench.pipeline.ingestion import _discover_files
+from yourbench.utils.dataset_engine import custom_save_dataset, _invalidate_local_cache
+
+
+_STATE_FILENAME = ".yourbench_watch_state.json"
+
+
+def watch(config, *, debounce: float = 5.0, poll_interval: float = 2.0, skip_existing: bool = False) -> None:
+    """Process changed source documents until interrupted.
+
+    Uses `watchfiles` (inotify/FSEvents) when installed and falls back to polling the directory
+    every `poll_interval` seconds. Changes are processed once the tree has been quiet for
+    `debounce` seconds. With `skip_existing`, files present on the first start are recorded as
+    processed instead of being ingested.
+    """
+    ingestion_config = config.pipeline.ingestion
+    if not ingestion_config.run:
+        raise ValueError("Watch mode requires the ingestion stage to be enabled")
+
+    source_dir = Path(ingestion_config.source_documents_dir)
+    state_path = Path(ingestion_config.output_dir) / _STATE_FILENAME
+    state = _load_state(state_path)
+
+    if skip_existing and not state_path.exists():
+        state = snapshot(config)
+        _save_state(state_path, state)
+        logger.info(f"Recorded {len(state)} existing files as processed")
+
+    logger.info(f"Watching {source_dir} for changes (Ctrl+C to stop)")
+    try:
+        state = _sync(config, state, state_path)
+        for _ in _change_events(config, debounce, poll_interval):
+            state = _sync(config, state, state_path)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+
+
+def snapshot(config) -> dict[str, list[int]]:
+    """Map each ingestible file (relative to the source dir) to its [mtime_ns, size]."""
+    ingestion_config = config.pipeline.ingestion
+    source_dir = Path(ingestion_config.source_documents_dir)
+    state = {}
+    for path in _discover_files(source_dir, Path(ingestion_config.output_dir), ingestion_config):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        state[path.relative_to(source_dir).as_posix()] = [stat.st_mtime_ns, stat.st_size]
+    return state
+
+
+def changed_files(previous: dict[str, list[int]], current: dict[str, list[int]]) -> list[str]:
+    """Relative paths that are new or modified in `current`."""
+    return sorted(path for path, stat in current.items() if previous.get(path) != stat)
+
+
+def run_delta(config, relative_paths: list[str]) -> None:
+    """Run the enabled stages on `relative_paths` only and append the results to the dataset."""
+    with tempfile.TemporaryDirectory(prefix="yourbench_watch_") as tmp_dir:
+        try:
+            delta = config.model_copy(deep=True)
+            delta.pipeline.ingestion.include_patterns = [glob.escape(path) for path in relative_paths]
+            delta.hf_configuration.local_dataset_dir = tmp_dir
+            delta.hf_configuration.push_to_hub = False
+            delta.hf_configuration.concat_if_exist = False
+            delta.hf_configuration.export_jsonl = False
+
+            for stage in get_enabled_stages(delta):
+                elapsed = run_stage(stage, delta)
+                logger.success(f"Completed {stage} in {elapsed:.2f}s")
+                # Without a local dataset, later stages would load the whole configured dataset from the Hub
+                if not (Path(tmp_dir) / "dataset_dict.json").exists():
+                    logger.warning(f"Delta run produced no dataset after {stage}; skipping the remaining stages")
+                    return
+
+            target = config.model_copy(deep=True)
+            target.hf_configuration.concat_if_exist = True
+            for subset, dataset in load_from_disk(tmp_dir).items():
+                logger.info(f"Appending {len(dataset)} rows to subset '{subset}'")
+                custom_save_dataset(dataset, target, subset=subset, push_to_hub=config.hf_configuration.push_to_hub)
+        finally:
+            # Every delta gets a fresh directory, so nothing loaded from it is read again
+            _invalidate_local_cache(Path(tmp_dir).resolve())
+
+
+def _sync(config, state: dict[str, list[int]], state_path: Path) -> dict[str, list[int]]:
+    """Process files changed since `state` and return the updated state."""
+    current = snapshot(config)
+    if removed := sorted(set(state) - set(current)):
+        logger.info(f"{len(removed)} files removed; their questions are kept: {removed[:5]}")
+    if not (changed := changed_files(state, current)):
+        if removed:
+            _save_state(state_path, current)
+        return current
+
+    logger.info(f"Processing {len(changed)} new or changed files: {changed[:5]}")
+    try:
+        run_delta(config, changed)
+    except Exception as e:
+        # Keep the old state so the same files are retried on the next change
+        logger.exception(f"Delta run failed: {e}")
+        return state
+
+    _save_state(state_path, current)
+    return current
+
+
+def _change_events(config, debounce: float, poll_interval: float) -> Iterator[None]:
+    """Yield once per settled batch of filesystem changes."""
+    source_dir = config.pipeline.ingestion.source_documents_dir
+    try:
+        from watchfiles import watch as watch_files
+    except ImportError:
+        logger.info(f"watchfiles not installed; polling every {poll_interval}s")
+    else:
+        # `step` is the quiet period before a batch is yielded; `debounce` caps how long a batch can grow
+        quiet_ms = int(debounce * 1000)
+        for _ in watch_files(source_dir, debounce=quiet_ms * 10, step=quiet_ms):
+            yield
+        return
+
+    previous = snapshot(config)
+    while True:
+        time.sleep(poll_interval)
+        current = snapshot(config)
+        if current == previous:
+            continue
+        # Wait until the tree stops changing before handing over a batch
+        while True:
+            time.sleep(debounce)
+            settled = snapshot(config)
+            if settled == current:
+                break
+            current = settled
+        previous = current
+        yield
+
+
+def _load_state(state_path: Path) -> dict[str, list[int]]:
+    try:
+        return json.loads(state_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable watch state {state_path}: {e}")
+        return {}
+
+
+def _save_state(state_path: Path, state: dict[str, list[int]]) -> None:
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state), encoding="utf-8")
+    tmp_path.replace(state_path)
@@ -1,5 +1,8 @@
+import re
+import bisect
 import random
 from typing import Any, Callable, Optional
+from functools import cache
 from dataclasses import dataclass
 
 import tiktoken
@@ -9,6 +12,13 @@ CHUNK_MODE_PERCENT = "percentage"
 CHUNK_MODE_COUNT = "count"
 CHUNK_MODE_ALL = "all"
 
+_HEADING_RE = re.compile(r"^#{1,6}[ \t]", re.MULTILINE)
+_FENCE_RE = re.compile(r"^(```|~~~).*?^\1[^\n]*$", re.MULTILINE | re.DOTALL)
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n")
+# A sentence ends at terminal punctuation followed by whitespace, or at a line break (list items, table rows)
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.!?][\"')\]]*(?=\s|$)|(?=\n)|$)")
+_WORD_RE = re.compile(r"\S+")
+
 
 @dataclass
 class ChunkSamplingConfig:
@@ -23,6 +33,7 @@ def split_into_token_chunks(
     overlap: int = 100,
     encoding_name: str = "cl100k_base",
     preprocess: Optional[Callable[[str], str]] = None,
+    tokenizer_name: Optional[str] = None,
 ) -> list[str]:
     """
     Splits text into token-based chunks, with optional preprocessing.
@@ -33,17 +44,232 @@ def split_into_token_chunks(
         overlap (int): Number of overlapping tokens.
         encoding_name (str): tiktoken encoding name.
         preprocess (Optional[Callable[[str], str]]): Optional preprocessing function.
+        tokenizer_name (Optional[str]): Hugging Face tokenizer to count tokens with instead of tiktoken,
+            e.g. the generation model's repo id. Chunks are then exact slices of the input text.
 
     Returns:
         list[str]: List of decoded text chunks.
     """
+    if overlap >= chunk_tokens:
+        raise ValueError(f"overlap ({overlap}) must be < chunk_tokens ({chunk_tokens})")
     if preprocess:
         text = preprocess(text)
 
+    if tokenizer_name:
+        offsets = _get_hf_tokenizer(tokenizer_name).encode(text, add_special_tokens=False).offsets
+        return [
+            text[offsets[i][0] : offsets[min(i + chunk_tokens, len(offsets)) - 1][1]]
+            for i in _window_starts(len(offsets), chunk_tokens, overlap)
+        ]
+
     enc = tiktoken.get_encoding(encoding_name)
     tokens = enc.encode(text, disallowed_special=())
-    stride = chunk_tokens - overlap
-    return [enc.decode(tokens[i : i + chunk_tokens]) for i in range(0, len(tokens), stride)]
+    return [enc.decode(tokens[i : i + chunk_tokens]) for i in _window_starts(len(tokens), chunk_tokens, overlap)]
+
+
+def _window_starts(n_tokens: int, chunk_tokens: int, overlap: int) -> range:
+    """Start of each token window, stopping at the first window that reaches the end of the tokens.
+
+    A later window would lie entirely inside the previous one and only repeat its text.
+    """
+    if not n_tokens:
+        return range(0)
+    return range(0, max(n_tokens - overlap, 1), chunk_tokens - overlap)
+
+
+def get_token_counter(
+    encoding_name: str = "cl100k_base", tokenizer_name: Optional[str] = None
+) -> Callable[[str], int]:
+    """Return a function counting the tokens of a text with a Hugging Face tokenizer or tiktoken encoding."""
+    if tokenizer_name:
+        tokenizer = _get_hf_tokenizer(tokenizer_name)
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+    enc = tiktoken.get_encoding(encoding_name)
+    return lambda text: len(enc.encode(text, disallowed_special=()))
+
+
+def split_into_structural_chunks(
+    text: str, chunk_tokens: int, count_tokens: Callable[[str], int], overlap: int = 0
+) -> list[tuple[int, int]]:
+    """
+    Split text along its structure and return the (start, end) character span of each chunk.
+
+    The text is cut at markdown headings, then blank-line paragraphs, then sentences, going one level
+    deeper only for pieces over `chunk_tokens`; fenced code blocks are never cut at paragraph level.
+    Consecutive pieces are packed into chunks of about `chunk_tokens`, starting a new chunk at a
+    heading once the current one is half full. A heading never ends a chunk, so a chunk can exceed the
+    budget by a heading line. With `overlap`, a chunk that continues the previous one
+    repeats its trailing pieces, up to `overlap` tokens.
+
+    Args:
+        text (str): The input text.
+        chunk_tokens (int): Max tokens per chunk.
+        count_tokens (Callable[[str], int]): Token counter, see `get_token_counter`.
+        overlap (int): Max tokens repeated from the end of the previous chunk.
+
+    Returns:
+        list[tuple[int, int]]: Chunk spans; `text[start:end]` is the chunk text.
+    """
+    fences = [m.span() for m in _FENCE_RE.finditer(text)]
+    pieces = _structural_pieces(text, 0, len(text), chunk_tokens, count_tokens, fences, level=0)
+
+    spans: list[tuple[int, int]] = []
+    current: list[tuple[int, int, int]] = []
+    used = 0
+    for start, end, n_tokens in pieces:
+        full = used + n_tokens > chunk_tokens
+        at_heading = used >= chunk_tokens // 2 and _HEADING_RE.match(text, start)
+        # A heading that would end a chunk moves on with the content it introduces
+        split_at = len(current)
+        while split_at and _is_heading(text, current[split_at - 1]):
+            split_at -= 1
+        if split_at and (full or at_heading):
+            spans.append((current[0][0], current[split_at - 1][1]))
+            carried = current[split_at:]
+            if not carried and full and not at_heading:
+                # Repeat the trailing pieces that fit in the overlap budget
+                budget = min(overlap, chunk_tokens - n_tokens)
+                for piece in reversed(current):
+                    if sum(p[2] for p in carried) + piece[2] > budget:
+                        break
+                    carried.insert(0, piece)
+            current = carried
+            used = sum(p[2] for p in current)
+        current.append((start, end, n_tokens))
+        used += n_tokens
+    if current:
+        spans.append((current[0][0], current[-1][1]))
+    return spans
+
+
+def _is_heading(text: str, piece: tuple[int, int, int]) -> bool:
+    """Whether a piece is a lone markdown heading line."""
+    start, end, _ = piece
+    return bool(_HEADING_RE.match(text, start)) and "\n" not in text[start:end]
+
+
+def _structural_pieces(
+    text: str,
+    start: int,
+    end: int,
+    chunk_tokens: int,
+    count_tokens: Callable[[str], int],
+    fences: list[tuple[int, int]],
+    level: int,
+) -> list[tuple[int, int, int]]:
+    """Split text[start:end] into (start, end, n_tokens) pieces of at most `chunk_tokens`, coarsest first."""
+    if level == 0:
+        cuts = [m.start() for m in _HEADING_RE.finditer(text, start, end) if not _in_spans(m.start(), fences)]
+        spans = _cut(text, start, end, cuts)
+    elif level == 1:
+        cuts = [m.end() for m in _PARAGRAPH_BREAK_RE.finditer(text, start, end) if not _in_spans(m.start(), fences)]
+        spans = _cut(text, start, end, cuts)
+    elif level == 2:
+        spans = [m.span() for m in _SENTENCE_RE.finditer(text, start, end)]
+    else:
+        return _word_pieces(text, start, end, chunk_tokens, count_tokens)
+
+    pieces = []
+    for span_start, span_end in spans:
+        n_tokens = count_tokens(text[span_start:span_end])
+        if n_tokens <= chunk_tokens:
+            pieces.append((span_start, span_end, n_tokens))
+        else:
+            pieces.extend(
+                _structural_pieces(text, span_start, span_end, chunk_tokens, count_tokens, fences, level + 1)
+            )
+    return pieces
+
+
+def _word_pieces(
+    text: str, start: int, end: int, chunk_tokens: int, count_tokens: Callable[[str], int]
+) -> list[tuple[int, int, int]]:
+    """Split an oversized sentence into runs of whole words, or character windows for a single huge word."""
+    pieces = []
+    for match in _WORD_RE.finditer(text, start, end):
+        n_tokens = count_tokens(match.group())
+        if n_tokens <= chunk_tokens:
+            pieces.append((*match.span(), n_tokens))
+            continue
+        width = max(1, len(match.group()) * chunk_tokens // n_tokens)
+        for window_start in range(match.start(), match.end(), width):
+            window_end = min(window_start + width, match.end())
+            pieces.append((window_start, window_end, count_tokens(text[window_start:window_end])))
+    return pieces
+
+
+def _cut(text: str, start: int, end: int, cuts: list[int]) -> list[tuple[int, int]]:
+    """Split text[start:end] at `cuts`, trimming whitespace and dropping blank spans."""
+    bounds = [start, *cuts, end]
+    spans = []
+    for span_start, span_end in zip(bounds, bounds[1:]):
+        segment = text[span_start:span_end]
+        if stripped := segment.strip():
+            offset = span_start + len(segment) - len(segment.lstrip())
+            spans.append((offset, offset + len(stripped)))
+    return spans
+
+
+def _in_spans(pos: int, spans: list[tuple[int, int]]) -> bool:
+    """Whether `pos` falls strictly inside one of the sorted, non-overlapping `spans`."""
+    i = bisect.bisect_left(spans, (pos,)) - 1
+    return i >= 0 and pos < spans[i][1]
+
+
+@cache
+def _get_hf_tokenizer(tokenizer_name: str):
+    """Load a Hugging Face tokenizer from the Hub, once per process."""
+    try:
+        from tokenizers import Tokenizer
+    except ImportError as e:
+        raise ImportError(
+            "tokenizer_name requires the 'tokenizers' package. Install it with: pip install 'yourbench[tokenizers]'"
+        ) from e
+    return Tokenizer.from_pretrained(tokenizer_name)
+
+
+def chunk_text_lookup(chunks: list[dict[str, Any]] | None) -> dict[str, str]:
+    """Map each chunk's `chunk_id` to its `chunk_text`."""
+    return {chunk["chunk_id"]: chunk["chunk_text"] for chunk in chunks or []}
+
+
+def resolve_chunk_texts(group: dict[str, Any], lookup: dict[str, str]) -> list[str]:
+    """Texts of a multi-hop group, from its own `chunks_text` or else its `chunk_ids` looked up in `lookup`.
+
+    Returns an empty list when any referenced chunk is missing, so ids and texts never misalign.
+    """
+    if texts := group.get("chunks_text"):
+        return list(texts)
+    texts = [lookup.get(chunk_id) for chunk_id in group.get("chunk_ids") or []]
+    return [] if None in texts else texts
+
+
+def resolve_multihop_chunks(row: dict[str, Any]) -> list[dict[str, Any]]:
+    """Multi-hop groups of a chunked row, each with both `chunk_ids` and `chunks_text`.
+
+    Groups stored compactly (ids only) are resolved against the row's `chunks`; groups that already
+    carry their texts, and malformed entries, are returned unchanged.
+    """
+    groups = row.get("multihop_chunks") or []
+    if all(not isinstance(group, dict) or group.get("chunks_text") for group in groups):
+        return list(groups)
+
+    lookup = chunk_text_lookup(row.get("chunks"))
+    return [
+        {**group, "chunks_text": resolve_chunk_texts(group, lookup)} if isinstance(group, dict) else group
+        for group in groups
+    ]
+
+
+def expand_multihop_chunks(dataset):
+    """Compatibility view of a chunked dataset with texts inlined into every `multihop_chunks` group.
+
+    Use this for consumers that read `chunks_text` directly from a dataset written with
+    `compact_multihop` enabled.
+    """
+    return dataset.map(
+        lambda row: {"multihop_chunks": resolve_multihop_chunks(row)}, desc="Expanding multi-hop chunks"
+    )
 
 
 def get_sampling_cfg(cfg: Any) -> ChunkSamplingConfig:
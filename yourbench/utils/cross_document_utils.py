@@ -7,6 +7,7 @@ from typing import Any, Set, List, TypeVar, Sequence
 from loguru import logger
 
 from datasets import Dataset
+from yourbench.utils.chunking_utils import chunk_text_lookup, resolve_chunk_texts
 
 
 T = TypeVar("T")
@@ -138,11 +139,8 @@ def create_cross_document_dataset(dataset: Dataset, stage_cfg: dict[str, Any]) -
     for idx, row in enumerate(dataset):
         multihop_chunks = row.get("multihop_chunks", [])
         if isinstance(multihop_chunks, list) and multihop_chunks:
-            valid_chunks = [
-                chunk
-                for chunk in multihop_chunks
-                if isinstance(chunk, dict) and all(key in chunk for key in ("chunk_ids", "chunks_text"))
-            ]
+            # Groups may be compact (chunk ids only); their texts are resolved once sampled
+            valid_chunks = [chunk for chunk in multihop_chunks if isinstance(chunk, dict) and "chunk_ids" in chunk]
             if valid_chunks:
                 # Create more readable and collision-resistant document IDs
                 doc_id = row.get("document_id", f"doc_{idx}")
@@ -156,6 +154,7 @@ def create_cross_document_dataset(dataset: Dataset, stage_cfg: dict[str, Any]) -
                     "original_index": idx,
                     "document_summary": row.get("document_summary", ""),
                     "multihop_chunks": valid_chunks,
+                    "chunk_lookup": chunk_text_lookup(row.get("chunks")),
                 })
 
     if len(docs) < min_docs:
@@ -230,7 +229,7 @@ def create_cross_document_dataset(dataset: Dataset, stage_cfg: dict[str, Any]) -
                 else:
                     sampled_chunks = rng.sample(doc["multihop_chunks"], num_chunks_to_sample)
 
-                sampled_chunks_from_group.extend(sampled_chunks)
+                sampled_chunks_from_group.extend((chunk, doc["chunk_lookup"]) for chunk in sampled_chunks)
 
             # Validation: ensure we have chunks from the expected number of documents
             # (This addresses the original validation mismatch issue)
@@ -243,9 +242,9 @@ def create_cross_document_dataset(dataset: Dataset, stage_cfg: dict[str, Any]) -
             combined_ids = []
             combined_texts = []
 
-            for chunk in sampled_chunks_from_group:
+            for chunk, chunk_lookup in sampled_chunks_from_group:
                 chunk_ids = chunk.get("chunk_ids", [])
-                chunk_texts = chunk.get("chunks_text", [])
+                chunk_texts = resolve_chunk_texts(chunk, chunk_lookup)
 
                 if isinstance(chunk_ids, list):
                     combined_ids.extend(chunk_ids)
@@ -304,3 +303,6 @@ def create_cross_document_dataset(dataset: Dataset, stage_cfg: dict[str, Any]) -
     if not cross_rows:
         logger.warning("No cross-document combinations were generated.")
         return Dataset.from_list([])
+
+    logger.info(f"Created {len(cross_rows)} cross-document combinations")
+    return Dataset.from_list(cross_rows)
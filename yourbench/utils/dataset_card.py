@@ -93,9 +93,11 @@ def _serialize_config_for_card(config: Any) -> str:
         "pdf_llm_prompt": "ingestion/pdf_llm_prompt.md",
         "summarization_user_prompt": "summarization/summarization_user_prompt.md",
         "combine_summaries_user_prompt": "summarization/combine_summaries_user_prompt.md",
+        "packed_summarization_user_prompt": "summarization/packed_summarization_user_prompt.md",
         "single_shot_system_prompt": "question_generation/single_shot_system_prompt.md",
         "single_shot_system_prompt_multi": "question_generation/single_shot_system_prompt_multi.md",
         "single_shot_user_prompt": "question_generation/single_shot_user_prompt.md",
+        "single_shot_batched_user_prompt": "question_generation/single_shot_batched_user_prompt.md",
         "multi_hop_system_prompt": "question_generation/multi_hop_system_prompt.md",
         "multi_hop_user_prompt": "question_generation/multi_hop_user_prompt.md",
         "question_rewriting_system_prompt": "question_rewriting/question_rewriting_system_prompt.md",
@@ -19,6 +19,11 @@ __all__ = ["custom_load_dataset", "custom_save_dataset", "upload_dataset_card"]
 
 T = TypeVar("T")
 
+# Datasets loaded from local directories, with the on-disk fingerprint they were loaded at,
+# least recently used first
+_LOCAL_CACHE: dict[Path, tuple[tuple, Dataset | DatasetDict]] = {}
+_LOCAL_CACHE_SIZE = 8
+
 
 class ConfigurationError(Exception):
     """Configuration error."""
@@ -141,10 +146,55 @@ def _validate_repo(settings: HFSettings) -> None:
             raise
 
 
+def _disk_fingerprint(path: Path) -> tuple:
+    """Modification time and size of the metadata files rewritten by every `save_to_disk`."""
+    fingerprint = []
+    for file in [path / "dataset_dict.json", path / "state.json", *sorted(path.glob("*/state.json"))]:
+        with suppress(OSError):
+            stat = file.stat()
+            fingerprint.append((str(file.relative_to(path)), stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+def _load_from_disk_cached(path: Path) -> Dataset | DatasetDict:
+    """`load_from_disk`, reusing the copy loaded earlier in this process while the files are unchanged.
+
+    Loaded datasets are memory-mapped, so keeping them costs little memory, while stages that read
+    the same subsets (e.g. `chunked`) skip reloading the whole dataset. Entries are checked against
+    the on-disk fingerprint on every access, and dropped by `custom_save_dataset`, when their
+    directory disappears, or when more than `_LOCAL_CACHE_SIZE` directories are cached.
+    """
+    fingerprint = _disk_fingerprint(path)
+    cached = _LOCAL_CACHE.pop(path, None)
+    if cached and fingerprint and cached[0] == fingerprint:
+        logger.debug(f"Reusing dataset already loaded from {path}")
+        dataset = cached[1]
+    else:
+        dataset = load_from_disk(str(path))
+    if fingerprint:
+        _LOCAL_CACHE[path] = (fingerprint, dataset)
+        _evict_local_cache()
+    # A DatasetDict is a mutable dict (e.g. `_merge_datasets` assigns subsets), so hand out copies
+    return DatasetDict(dataset) if isinstance(dataset, DatasetDict) else dataset
+
+
+def _evict_local_cache() -> None:
+    """Drop cached datasets whose directory is gone, then the least recently used beyond the bound."""
+    for path in [path for path in _LOCAL_CACHE if not _disk_fingerprint(path)]:
+        del _LOCAL_CACHE[path]
+    while len(_LOCAL_CACHE) > _LOCAL_CACHE_SIZE:
+        del _LOCAL_CACHE[next(iter(_LOCAL_CACHE))]
+
+
+def _invalidate_local_cache(path: Path) -> None:
+    """Forget the dataset loaded from `path`, after writing to it or before removing it."""
+    _LOCAL_CACHE.pop(path, None)
+
+
 def _load_local(path: Path, subset: str | None) -> Dataset:
     """Load dataset from local path."""
     logger.info(f"Loading '{subset or 'default'}' from {path}")
-    dataset = load_from_disk(str(path))
+    dataset = _load_from_disk_cached(path)
 
     if subset is None:
         return dataset
@@ -315,9 +365,15 @@ def custom_save_dataset(
     *,
     save_local: bool = True,
     push_to_hub: bool = True,
+    overwrite: bool = False,
 ) -> None:
-    """Save dataset locally and/or push to Hub."""
+    """Save dataset locally and/or push to Hub.
+
+    `overwrite` replaces the subset even when `concat_if_exist` is set, for callers that already
+    merged the existing rows into `dataset`.
+    """
     settings = _extract_settings(config)
+    concat_if_exist = settings.concat_if_exist and not overwrite
 
     if _is_offline():
         save_local = True
@@ -330,7 +386,7 @@ def custom_save_dataset(
         existing = None
         if settings.local_dir.exists():
             try:
-                existing = load_from_disk(str(settings.local_dir))
+                existing = _load_from_disk_cached(settings.local_dir)
             except (FileNotFoundError, PermissionError, OSError) as e:
                 logger.warning(f"Error loading existing dataset from disk: {e}")
             except Exception as e:
@@ -338,12 +394,13 @@ def custom_save_dataset(
                 raise
 
         merged = (
-            _merge_datasets(existing, dataset, subset, settings.concat_if_exist)
+            _merge_datasets(existing, dataset, subset, concat_if_exist)
             if existing
             else (DatasetDict({subset: dataset}) if subset else dataset)
         )
 
         settings.local_dir.parent.mkdir(parents=True, exist_ok=True)
+        _invalidate_local_cache(settings.local_dir)
         _safe_save(merged, settings.local_dir)
 
         # Export to JSONL if enabled
@@ -352,7 +409,7 @@ def custom_save_dataset(
             _export_to_jsonl(merged, settings.jsonl_export_dir, subset)
 
     if push_to_hub and not _is_offline():
-        if settings.concat_if_exist:
+        if concat_if_exist:
             with suppress(Exception):
                 existing = _load_hub(settings.repo_id, subset, settings.token)
                 dataset = concatenate_datasets([existing, dataset])
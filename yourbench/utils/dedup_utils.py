@@ -0,0 +1,206 @@
+"""Near-duplicate detection utilities based on MinHash signatures, SimHash and LSH banding."""
+
+import re
+import zlib
+import hashlib
+from typing import Callable
+from functools import cache
+
+import numpy as np
+
+
+# Mersenne prime 2^31 - 1 keeps (a * x + b) within uint64 for 31-bit hashes
+_PRIME = np.uint64((1 << 31) - 1)
+_WORD_RE = re.compile(r"\w+")
+_BLOCK_SIZE = 4096
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+@cache
+def _permutations(num_perm: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (a, b) coefficients of the universal hash family used for MinHash."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingle_hashes(text: str, shingle_size: int = 5) -> np.ndarray:
+    """Hash the distinct word n-grams of a text to 31-bit integers."""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+
+    n_shingles = max(1, len(words) - shingle_size + 1)
+    hashes = np.fromiter(
+        (zlib.crc32(" ".join(words[i : i + shingle_size]).encode("utf-8")) for i in range(n_shingles)),
+        dtype=np.uint64,
+        count=n_shingles,
+    )
+    return np.unique(hashes % _PRIME)
+
+
+def minhash_signature(text: str, num_perm: int = 128, shingle_size: int = 5, seed: int = 42) -> np.ndarray:
+    """Compute the MinHash signature of a text over its word shingles."""
+    a, b = _permutations(num_perm, seed)
+    signature = np.full(num_perm, _PRIME, dtype=np.uint64)
+
+    hashes = shingle_hashes(text, shingle_size)
+    # Process shingles in blocks to bound the (shingles x num_perm) intermediate
+    for start in range(0, len(hashes), _BLOCK_SIZE):
+        block = hashes[start : start + _BLOCK_SIZE, None]
+        np.minimum(signature, ((block * a + b) % _PRIME).min(axis=0), out=signature)
+    return signature
+
+
+def _lsh_params(threshold: float, num_perm: int) -> tuple[int, int]:
+    """Pick (bands, rows) whose LSH S-curve threshold (1/b)^(1/r) is closest to `threshold`."""
+    candidates = ((b, num_perm // b) for b in range(1, num_perm + 1))
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class _DistinctRows:
+    """Maps rows to their distinct values, numbered in order of first occurrence."""
+
+    def __init__(self, first: np.ndarray, inverse: np.ndarray):
+        order = np.argsort(first, kind="stable")
+        self.first = first[order]
+        self.position = np.empty_like(order)
+        self.position[order] = np.arange(len(order))
+        self.inverse = inverse.ravel()
+
+    def representatives(self, value_roots: np.ndarray) -> np.ndarray:
+        """Earliest row of each row's cluster, given the root of each distinct value."""
+        return self.first[value_roots][self.position[self.inverse]]
+
+
+def _distinct_in_row_order(values: np.ndarray) -> tuple[np.ndarray, _DistinctRows]:
+    """Distinct rows of `values`, ordered by first occurrence, so identical rows are compared once."""
+    unique, first, inverse = np.unique(values, axis=0, return_index=True, return_inverse=True)
+    rows = _DistinctRows(first, inverse)
+    ordered = np.empty_like(unique)
+    ordered[rows.position] = unique
+    return ordered, rows
+
+
+def _roots(labels: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Cluster root of each of `rows`, compressing their paths in `labels` along the way."""
+    roots = labels[rows]
+    while not np.array_equal(parents := labels[roots], roots):
+        roots = parents
+    labels[rows] = roots
+    return roots
+
+
+def _union(labels: np.ndarray, first: np.ndarray, second: np.ndarray) -> None:
+    """Merge the clusters of each pair `(first[k], second[k])`; a root is the smallest row of its cluster."""
+    while len(first):
+        first_roots, second_roots = _roots(labels, first), _roots(labels, second)
+        apart = first_roots != second_roots
+        first, second = first[apart], second[apart]
+        # Hook the larger root under the smaller; pairs sharing a root are merged on the next pass
+        np.minimum.at(
+            labels, np.maximum(first_roots, second_roots)[apart], np.minimum(first_roots, second_roots)[apart]
+        )
+
+
+def _merge_buckets(
+    labels: np.ndarray, keys: np.ndarray, similar: Callable[[np.ndarray, np.ndarray], np.ndarray]
+) -> None:
+    """Merge rows with equal `keys` that `similar(i, j)` confirms, comparing each row with one leader at a time.
+
+    In each round, the first remaining row of every bucket leads it, and the other rows are checked
+    against their leader (rows already in the leader's cluster are skipped). Rows that match leave
+    the bucket; the others meet a new leader in the next round. Buckets of near-duplicates are
+    settled in one round, so the cost is close to linear in the number of rows.
+    """
+    rows = np.argsort(keys, kind="stable")
+    while len(rows) > 1:
+        bucket_keys = keys[rows]
+        leads = np.concatenate([[True], bucket_keys[1:] != bucket_keys[:-1]])
+        leaders = rows[np.flatnonzero(leads)][np.cumsum(leads) - 1]
+        i, j = leaders[~leads], rows[~leads]
+
+        settled = _roots(labels, i) == _roots(labels, j)
+        unsettled = np.flatnonzero(~settled)
+        for start in range(0, len(unsettled), _BLOCK_SIZE):
+            block = unsettled[start : start + _BLOCK_SIZE]
+            settled[block] = similar(i[block], j[block])
+        _union(labels, i[settled], j[settled])
+        rows = j[~settled]
+
+
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    """Number of set bits of each uint64."""
+    return _POPCOUNT_8[np.ascontiguousarray(values).view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def near_duplicate_clusters(signatures: np.ndarray, threshold: float = 0.85) -> np.ndarray:
+    """Cluster MinHash signatures whose estimated Jaccard similarity reaches `threshold`.
+
+    Rows sharing an LSH band are verified against the full signature by `_merge_buckets`. Returns,
+    for each row, the index of its cluster representative (the earliest row in the cluster).
+    """
+    signatures, rows = _distinct_in_row_order(signatures)
+    bands, band_rows = _lsh_params(threshold, signatures.shape[1])
+    labels = np.arange(len(signatures))
+
+    def similar(i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        return (signatures[i] == signatures[j]).mean(axis=1) >= threshold
+
+    for band in range(bands):
+        band_sigs = signatures[:, band * band_rows : (band + 1) * band_rows]
+        _merge_buckets(labels, np.unique(band_sigs, axis=0, return_inverse=True)[1].ravel(), similar)
+
+    return rows.representatives(_roots(labels, np.arange(len(signatures))))
+
+
+def _hash64(text: str) -> int:
+    """64-bit BLAKE2b hash of a string."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def exact_hash(text: str) -> int:
+    """64-bit hash of a text's lowercased words, ignoring punctuation and whitespace differences."""
+    return _hash64(" ".join(_WORD_RE.findall(text.lower())))
+
+
+def simhash64(text: str, shingle_size: int = 3) -> int:
+    """Compute the 64-bit SimHash of a text over its distinct word n-grams.
+
+    Similar texts get hashes that differ in few bits, so near-duplicates can be found by Hamming
+    distance.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return 0
+
+    n_shingles = max(1, len(words) - shingle_size + 1)
+    shingles = {" ".join(words[i : i + shingle_size]) for i in range(n_shingles)}
+    hashes = np.fromiter(map(_hash64, shingles), dtype=np.uint64, count=len(shingles))
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    # Each bit is set when most shingles have it set
+    majority = 2 * bits.sum(axis=0, dtype=np.int64) > len(hashes)
+    return int(np.packbits(majority, bitorder="little").view("<u8")[0])
+
+
+def simhash_clusters(hashes: np.ndarray, max_distance: int = 3) -> np.ndarray:
+    """Cluster 64-bit SimHashes that differ in at most `max_distance` bits.
+
+    The hash is cut into `max_distance + 1` bands; two hashes within the distance must agree on at
+    least one band, so rows sharing a band value are compared by `_merge_buckets`. Returns, for
+    each row, the index of its cluster representative (the earliest row in the cluster).
+    """
+    values, rows = _distinct_in_row_order(np.asarray(hashes, dtype=np.uint64))
+    bands = max_distance + 1
+    width = 64 // bands
+    mask = np.uint64((1 << width) - 1)
+    labels = np.arange(len(values))
+
+    def similar(i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        return _popcount64(values[i] ^ values[j]) <= max_distance
+
+    for band in range(bands):
+        _merge_buckets(labels, (values >> np.uint64(band * width)) & mask, similar)
+
+    return rows.representatives(_roots(labels, np.arange(len(values))))
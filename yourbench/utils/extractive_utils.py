@@ -0,0 +1,72 @@
+"""Extractive summarization: pick the most central sentences of a document without an LLM."""
+
+import re
+from typing import Callable
+
+import numpy as np
+
+
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|$)", re.MULTILINE)
+_WORD_RE = re.compile(r"\w+")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences on terminal punctuation and line breaks."""
+    return [s for m in _SENTENCE_RE.finditer(text) if (s := m.group().strip()) and _WORD_RE.search(s)]
+
+
+def sentence_centrality(sentences: list[str]) -> np.ndarray:
+    """Score sentences by cosine similarity of their TF-IDF vector to the document centroid.
+
+    The sentence-term matrix is kept in CSR form (indptr/indices/data arrays), so the cost is linear
+    in the number of words.
+    """
+    vocab: dict[str, int] = {}
+    indptr, indices, counts = [0], [], []
+    for sentence in sentences:
+        terms, term_counts = np.unique(
+            [vocab.setdefault(w, len(vocab)) for w in _WORD_RE.findall(sentence.lower())], return_counts=True
+        )
+        indices.extend(terms.tolist())
+        counts.extend(term_counts.tolist())
+        indptr.append(len(indices))
+
+    n_sentences = len(sentences)
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int64)
+    if not len(indices):
+        return np.zeros(n_sentences)
+
+    # Smoothed IDF, as in scikit-learn
+    df = np.bincount(indices, minlength=len(vocab))
+    idf = np.log((1 + n_sentences) / (1 + df)) + 1
+    data = np.asarray(counts, dtype=np.float64) * idf[indices]
+
+    row_lengths = np.diff(indptr)
+    rows = np.repeat(np.arange(n_sentences), row_lengths)
+    norms = np.sqrt(np.bincount(rows, weights=data**2, minlength=n_sentences))
+    data /= norms[rows]
+
+    centroid = np.bincount(indices, weights=data, minlength=len(vocab)) / n_sentences
+    return np.bincount(rows, weights=data * centroid[indices], minlength=n_sentences)
+
+
+def extractive_summary(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> str:
+    """Select the highest-scoring sentences that fit in `max_tokens`, kept in document order."""
+    sentences = split_sentences(text)
+    if not sentences:
+        return ""
+
+    scores = sentence_centrality(sentences)
+    selected, used = [], 0
+    # Stable sort so ties favour earlier sentences
+    for idx in np.argsort(-scores, kind="stable"):
+        n_tokens = count_tokens(sentences[idx])
+        if used + n_tokens <= max_tokens:
+            selected.append(idx)
+            used += n_tokens
+
+    if not selected:
+        # Even the best sentence is over budget; keep it rather than returning nothing
+        selected = [int(np.argmax(scores))]
+    return " ".join(sentences[i] for i in sorted(selected))
@@ -1,11 +1,18 @@
+import json
 import time
-from typing import Any, Dict, List
+import hashlib
+from typing import Any, Dict, List, Iterator
 from dataclasses import dataclass
 
 from loguru import logger
 
 # User prompts are now passed via configuration
-from yourbench.utils.chunking_utils import sample_multihop_groups, sample_single_hop_chunks
+from yourbench.utils.chunking_utils import (
+    chunk_text_lookup,
+    resolve_chunk_texts,
+    sample_multihop_groups,
+    sample_single_hop_chunks,
+)
 from yourbench.utils.inference.inference_core import InferenceCall
 
 
@@ -42,6 +49,23 @@ class BuilderMetrics:
             self.warnings = []
 
 
+def _generation_fingerprint(
+    call: InferenceCall, template: str, chunk_texts: List[str], position: int | None = None
+) -> str:
+    """SHA-256 of what shapes the questions of a call, for incremental runs.
+
+    Covers the system prompt (which embeds the output schema), the user prompt template, the chunk
+    texts, additional instructions and sampling parameters. Titles and summaries are left out: the
+    summary is regenerated on every run. `position` gives each chunk of a batched call its own key.
+    """
+    payload = json.dumps(
+        [call.messages[0], template, chunk_texts, position, call.temperature, call.seed, call.extra_parameters],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def _calculate_chunk_stats(chunks: List[Dict]) -> Dict[str, float]:
     """Calculate statistics for chunks."""
     if not chunks:
@@ -59,9 +83,31 @@ def _calculate_chunk_stats(chunks: List[Dict]) -> Dict[str, float]:
 
 def build_single_shot_inference_calls(dataset, system_msg, stage_cfg, sampling_cfg):
     """Build single-shot inference calls with enhanced tracking."""
+    return _collect(iter_single_shot_inference_calls(dataset, system_msg, stage_cfg, sampling_cfg))
+
+
+def build_multi_hop_inference_calls(dataset, system_msg, stage_cfg):
+    """Build multi-hop inference calls with enhanced tracking."""
+    return _collect(iter_multi_hop_inference_calls(dataset, system_msg, stage_cfg))
+
+
+def _collect(pairs: Iterator[tuple[InferenceCall, tuple]]) -> tuple[List[InferenceCall], List[tuple]]:
+    """Materialize lazily built `(call, index_entry)` pairs into the calls and index map lists."""
+    calls, index_map = [], []
+    for call, entry in pairs:
+        calls.append(call)
+        index_map.append(entry)
+    return calls, index_map
+
+
+def iter_single_shot_inference_calls(dataset, system_msg, stage_cfg, sampling_cfg):
+    """Lazily build single-shot inference calls, yielding `(call, index_entry)` pairs.
+
+    Each prompt is formatted only when the consumer asks for the next call, so a streaming
+    scheduler holds just the calls in flight. Metrics are logged once the iterator is exhausted.
+    """
     start_time = time.time()
-    calls = []
-    index_map = []
+    prompt_chars = 0
     metrics = BuilderMetrics()
 
     logger.info(f"Building single-shot inference calls for {len(dataset)} documents")
@@ -75,9 +121,22 @@ def build_single_shot_inference_calls(dataset, system_msg, stage_cfg, sampling_c
                 metrics.warnings.append(f"Document {idx} has no chunks")
                 continue
 
-            selected_chunks = sample_single_hop_chunks(document_chunks, sampling_cfg)
+            # Chunks marked by chunking's dedup_chunks would only repeat questions asked elsewhere
+            unique_chunks = [c for c in document_chunks if not (c.get("duplicate_of") or c.get("is_boilerplate"))]
+            metrics.skipped_chunks += len(document_chunks) - len(unique_chunks)
+            selected_chunks = sample_single_hop_chunks(unique_chunks, sampling_cfg)
             chunk_stats = _calculate_chunk_stats(selected_chunks)
 
+            chunks_per_call = getattr(stage_cfg, "chunks_per_call", 1) or 1
+            if chunks_per_call > 1:
+                for call, entry in _batched_single_shot_calls(
+                    row, idx, selected_chunks, chunks_per_call, system_msg, stage_cfg, metrics
+                ):
+                    metrics.total_calls_generated += 1
+                    prompt_chars += len(call.messages[-1]["content"])
+                    yield call, entry
+                continue
+
             for ch_idx, chunk in enumerate(selected_chunks):
                 try:
                     metrics.total_chunks_processed += 1
@@ -121,9 +180,12 @@ def build_single_shot_inference_calls(dataset, system_msg, stage_cfg, sampling_c
                         max_retries=stage_cfg.max_retries if hasattr(stage_cfg, "max_retries") else 12,
                     )
 
-                    calls.append(call)
-                    index_map.append((idx, row.get("document_id", f"doc_{idx}"), chunk_id))
                     metrics.total_calls_generated += 1
+                    prompt_chars += len(user_msg["content"])
+                    fingerprint = _generation_fingerprint(
+                        call, stage_cfg.single_shot_user_prompt, [chunk_text, additional_instructions]
+                    )
+                    yield call, (idx, row.get("document_id", f"doc_{idx}"), chunk_id, fingerprint)
 
                 except Exception as e:
                     metrics.error_count += 1
@@ -149,8 +211,7 @@ def build_single_shot_inference_calls(dataset, system_msg, stage_cfg, sampling_c
 
     # Calculate average chunk length
     if metrics.total_chunks_processed > 0:
-        total_length = sum(len(call.messages[-1]["content"]) for call in calls)
-        metrics.avg_chunk_length = total_length / metrics.total_chunks_processed
+        metrics.avg_chunk_length = prompt_chars / metrics.total_chunks_processed
 
     # Log final metrics
     logger.info(
@@ -167,14 +228,65 @@ def build_single_shot_inference_calls(dataset, system_msg, stage_cfg, sampling_c
         if len(metrics.warnings) > 5:
             logger.warning(f"  ... and {len(metrics.warnings) - 5} more warnings")
 
-    return calls, index_map
 
+def _batched_single_shot_calls(row, idx, chunks, chunks_per_call, system_msg, stage_cfg, metrics):
+    """Build calls that each cover up to `chunks_per_call` chunks of one document.
+
+    The system prompt, title and summary are sent once per call instead of once per chunk. The
+    index entry holds the call's chunk ids in prompt order; the model tags its output per chunk
+    with the same 1-based ids, which `parse_single_shot_responses` uses to attribute questions.
+    """
+    doc_id = row.get("document_id", f"doc_{idx}")
+    batchable = []
+    for ch_idx, chunk in enumerate(chunks):
+        metrics.total_chunks_processed += 1
+        chunk_id = chunk.get("chunk_id", f"{idx}_{ch_idx}")
+        if not chunk.get("chunk_text", "").strip():
+            metrics.skipped_chunks += 1
+            metrics.warnings.append(f"Empty chunk {chunk_id}")
+            continue
+        batchable.append((chunk_id, chunk["chunk_text"]))
 
-def build_multi_hop_inference_calls(dataset, system_msg, stage_cfg):
-    """Build multi-hop inference calls with enhanced tracking."""
-    start_time = time.time()
     calls = []
-    index_map = []
+    for start in range(0, len(batchable), chunks_per_call):
+        batch = batchable[start : start + chunks_per_call]
+        text_chunks = "".join(f'<text_chunk id="{i}">{text}</text_chunk>\n' for i, (_, text) in enumerate(batch, 1))
+        user_msg = {
+            "role": "user",
+            "content": stage_cfg.single_shot_batched_user_prompt.format(
+                title=row.get("document_filename", f"doc_{idx}"),
+                document_summary=row.get("document_summary", ""),
+                text_chunks=text_chunks,
+                additional_instructions=stage_cfg.additional_instructions,
+            ),
+        }
+        tags = ["single_shot_qa", f"doc_{idx}", f"chunk_batch_{start // chunks_per_call}", f"chunks_{len(batch)}"]
+        if "document_type" in row:
+            tags.append(f"type_{row['document_type']}")
+
+        call = InferenceCall(
+            messages=[system_msg, user_msg],
+            tags=tags,
+            temperature=stage_cfg.temperature if hasattr(stage_cfg, "temperature") else None,
+            max_retries=stage_cfg.max_retries if hasattr(stage_cfg, "max_retries") else 12,
+        )
+        # One fingerprint per chunk, so reused questions can be matched back to their chunk
+        texts = [text for _, text in batch] + [stage_cfg.additional_instructions]
+        template = stage_cfg.single_shot_batched_user_prompt
+        fingerprints = [_generation_fingerprint(call, template, texts, position) for position in range(len(batch))]
+        calls.append((call, (idx, doc_id, [chunk_id for chunk_id, _ in batch], fingerprints)))
+
+    logger.debug(f"Document {idx}: {len(batchable)} chunks in {len(calls)} batched calls")
+    return calls
+
+
+def iter_multi_hop_inference_calls(dataset, system_msg, stage_cfg):
+    """Lazily build multi-hop inference calls, yielding `(call, index_entry)` pairs.
+
+    Like `iter_single_shot_inference_calls`, prompts are formatted on demand.
+    """
+    start_time = time.time()
+    prompt_chars = 0
     metrics = BuilderMetrics()
 
     logger.info(f"Building multi-hop inference calls for {len(dataset)} documents")
@@ -192,6 +304,8 @@ def build_multi_hop_inference_calls(dataset, system_msg, stage_cfg):
             chunk_sampling = stage_cfg.chunk_sampling if hasattr(stage_cfg, "chunk_sampling") else {}
 
             groups = sample_multihop_groups(multihop_chunks, chunk_sampling)
+            # Compact groups store only chunk ids; their texts come from the row's chunks
+            chunk_lookup = chunk_text_lookup(row.get("chunks"))
 
             for group_idx, group in enumerate(groups):
                 try:
@@ -201,7 +315,7 @@ def build_multi_hop_inference_calls(dataset, system_msg, stage_cfg):
                         continue
 
                     chunk_ids = group.get("chunk_ids", [])
-                    texts = group.get("chunks_text", [])
+                    texts = resolve_chunk_texts(group, chunk_lookup)
 
                     if not texts:
                         metrics.warnings.append(f"Group {group_idx} in document {idx} has empty chunks_text")
@@ -254,9 +368,12 @@ def build_multi_hop_inference_calls(dataset, system_msg, stage_cfg):
                         max_retries=stage_cfg.max_retries if hasattr(stage_cfg, "max_retries") else 12,
                     )
 
-                    calls.append(call)
-                    index_map.append((idx, row.get("document_id", f"doc_{idx}"), chunk_ids))
                     metrics.total_calls_generated += 1
+                    prompt_chars += len(user_msg["content"])
+                    fingerprint = _generation_fingerprint(
+                        call, stage_cfg.multi_hop_user_prompt, [*texts, additional_instructions]
+                    )
+                    yield call, (idx, row.get("document_id", f"doc_{idx}"), chunk_ids, fingerprint)
 
                     # Log group statistics
                     avg_chunk_length = sum(len(t) for t in texts) / len(texts)
@@ -281,8 +398,7 @@ def build_multi_hop_inference_calls(dataset, system_msg, stage_cfg):
 
     # Calculate average chunk length
     if metrics.total_chunks_processed > 0:
-        total_length = sum(len(call.messages[-1]["content"]) for call in calls)
-        metrics.avg_chunk_length = total_length / metrics.total_chunks_processed
+        metrics.avg_chunk_length = prompt_chars / metrics.total_chunks_processed
 
     # Log final metrics
     logger.info(
@@ -298,8 +414,6 @@ def build_multi_hop_inference_calls(dataset, system_msg, stage_cfg):
         if len(metrics.warnings) > 5:
             logger.warning(f"  ... and {len(metrics.warnings) - 5} more warnings")
 
-    return calls, index_map
-
 
 def get_builder_performance_summary(calls: List[InferenceCall], processing_time: float) -> Dict[str, Any]:
     """Generate performance summary for builder operations."""
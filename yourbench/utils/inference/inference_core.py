@@ -2,7 +2,7 @@ import os
 import time
 import uuid
 import asyncio
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Iterable, Optional
 from dataclasses import field, dataclass
 
 from loguru import logger
@@ -463,6 +463,40 @@ async def _run_inference_async_helper(
     return responses
 
 
+def create_model_semaphores(models: List[Model]) -> Dict[str, asyncio.Semaphore]:
+    """Create one semaphore per model, sized by its `max_concurrent_requests`."""
+    return {model.model_name: asyncio.Semaphore(max(model.max_concurrent_requests, 1)) for model in models}
+
+
+async def run_inference_with_semaphores(
+    models: List[Model],
+    step_name: str,
+    inference_calls: List[InferenceCall],
+    semaphores: Dict[str, asyncio.Semaphore],
+) -> Dict[str, List[str]]:
+    """
+    Run inference calls inside an existing event loop, bounded by caller-owned semaphores.
+
+    Unlike `run_inference`, which starts its own event loop and semaphores per batch, this lets
+    several small batches (e.g. one per document and stage) be in flight at once while each
+    stage still respects its concurrency limits. Returns the same mapping as `run_inference`.
+    """
+    for call in inference_calls:
+        if step_name not in call.tags:
+            call.tags.append(step_name)
+
+    results = await asyncio.gather(
+        *(
+            _retry_with_backoff(model, call, semaphores[model.model_name], model.max_concurrent_requests)
+            for model in models
+            for call in inference_calls
+        )
+    )
+
+    n_calls = len(inference_calls)
+    return {model.model_name: list(results[i * n_calls : (i + 1) * n_calls]) for i, model in enumerate(models)}
+
+
 def run_inference(config, step_name: str, inference_calls: List[InferenceCall]) -> Dict[str, List[str]]:
     """
     Run inference in parallel for the given step_name and inference_calls with enhanced tracking.
@@ -507,3 +541,81 @@ def run_inference(config, step_name: str, inference_calls: List[InferenceCall])
         except Exception as e:
             logger.critical("Error running inference for step '{}': {}", step_name, e)
             return {}
+
+
+async def _run_streamed_inference_async(
+    models: List[Model], step_name: str, call_stream: Iterable[tuple[InferenceCall, Any]], max_in_flight: int
+) -> tuple[Dict[str, List[str]], List[Any]]:
+    """
+    Pull `(call, index_entry)` pairs from `call_stream` only as fast as the models can take them.
+
+    At most `max_in_flight` calls exist at once; each is dropped as soon as all models answered it,
+    so memory scales with concurrency rather than with the number of calls.
+    """
+    semaphores = create_model_semaphores(models)
+    responses: Dict[str, List[str]] = {model.model_name: [] for model in models}
+    index_map: List[Any] = []
+
+    async def run_call(position: int, call: InferenceCall) -> None:
+        if step_name not in call.tags:
+            call.tags.append(step_name)
+        results = await asyncio.gather(
+            *(_retry_with_backoff(m, call, semaphores[m.model_name], m.max_concurrent_requests) for m in models)
+        )
+        for model, result in zip(models, results):
+            responses[model.model_name][position] = result
+
+    pending = set()
+    # Calls are built in a worker thread, so slow builders (e.g. rendering PDF pages) don't stall requests in flight
+    calls = iter(call_stream)
+    while (item := await asyncio.to_thread(next, calls, None)) is not None:
+        call, entry = item
+        position = len(index_map)
+        index_map.append(entry)
+        for model_responses in responses.values():
+            model_responses.append("")
+        pending.add(asyncio.create_task(run_call(position, call)))
+        if len(pending) >= max_in_flight:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+    if pending:
+        await asyncio.gather(*pending)
+
+    return responses, index_map
+
+
+def run_inference_stream(
+    config, step_name: str, call_stream: Iterable[tuple[InferenceCall, Any]]
+) -> tuple[Dict[str, List[str]], List[Any]]:
+    """
+    Run inference over lazily built `(call, index_entry)` pairs, e.g. from the `iter_*` builders.
+
+    Returns the responses in the same shape as `run_inference`, plus the index entries in call order.
+    """
+    with log_step(f"inference_{step_name}", streamed=True):
+        models = _load_models(config, step_name)
+        if not models:
+            logger.warning("No models found for step '{}'. Returning empty dictionary.", step_name)
+            return {}, []
+
+        # Enough calls in flight to keep every model's semaphore busy, plus one refill per slot
+        max_in_flight = 2 * max(max(model.max_concurrent_requests, 1) for model in models)
+        logger.info(f"Starting streamed inference for step '{step_name}' with up to {max_in_flight} calls in flight")
+        try:
+            start_time = time.time()
+            responses, index_map = asyncio.run(
+                _run_streamed_inference_async(models, step_name, call_stream, max_in_flight)
+            )
+        except Exception as e:
+            logger.critical("Error running inference for step '{}': {}", step_name, e)
+            return {}, []
+
+        logger.success(
+            "Inference completed for step '{}' in {:.2f}s with {} models ({} calls)",
+            step_name,
+            time.time() - start_time,
+            len(models),
+            len(index_map),
+        )
+        return responses, index_map
@@ -315,6 +315,34 @@ def normalize_multi_choice(pair: dict[str, Any]) -> Optional[dict[str, Any]]:
     return pair
 
 
+_CHUNK_OUTPUT_RE = re.compile(r'<chunk_output id="(\d+)">(.*?)</chunk_output>', re.DOTALL)
+
+
+def _split_chunk_replies(reply: str, chunk_ref: str | list[str]) -> list[tuple[str, str]]:
+    """Pair a single-shot reply with the chunk(s) it covers.
+
+    `chunk_ref` is a chunk id for per-chunk calls, or the list of chunk ids of a batched call, whose
+    reply holds one `<chunk_output id="N">` block per chunk (1-based, in prompt order).
+    """
+    if isinstance(chunk_ref, str):
+        return [(chunk_ref, reply)]
+
+    segments = []
+    for chunk_num, segment in _CHUNK_OUTPUT_RE.findall(reply or ""):
+        position = int(chunk_num) - 1
+        if 0 <= position < len(chunk_ref):
+            segments.append((chunk_ref[position], segment))
+    if missing := len(set(chunk_ref) - {chunk_id for chunk_id, _ in segments}):
+        logger.warning(f"Batched reply has no output for {missing} of {len(chunk_ref)} chunks")
+    return segments
+
+
+def _chunk_fingerprint(entry: tuple, chunk_id: str) -> str:
+    """Generation fingerprint of a single-shot chunk; batched calls hold one per chunk, in prompt order."""
+    fingerprint = entry[3]
+    return fingerprint[entry[2].index(chunk_id)] if isinstance(fingerprint, list) else fingerprint
+
+
 def parse_single_shot_responses(responses, index_map, stage_cfg):
     rows = []
     question_mode = (
@@ -334,10 +362,16 @@ def parse_single_shot_responses(responses, index_map, stage_cfg):
             logger.error(f"Mismatch: model '{model}' replies={len(replies)}, expected={len(index_map)}")
             continue
 
-        for i, reply in enumerate(replies):
+        # Batched calls cover several chunks; split their replies back into one segment per chunk
+        segments = [
+            (i, chunk_id, segment)
+            for i, reply in enumerate(replies)
+            for chunk_id, segment in _split_chunk_replies(reply, index_map[i][2])
+        ]
+        for i, chunk_id, reply in segments:
             parsed_qa_pairs = parse_qa_pairs_from_response(reply)
             if not parsed_qa_pairs:
-                logger.warning(f"No parseable QA pairs at index {i}.")
+                logger.warning(f"No parseable QA pairs at index {i} (chunk {chunk_id}).")
                 continue
 
             for pair in parsed_qa_pairs:
@@ -367,7 +401,7 @@ def parse_single_shot_responses(responses, index_map, stage_cfg):
 
                     # Build standard QuestionRow output
                     base_row = QuestionRow(
-                        chunk_id=index_map[i][2],
+                        chunk_id=chunk_id,
                         source_chunk_ids=None,
                         document_id=index_map[i][1],
                         additional_instructions=stage_cfg.additional_instructions,
@@ -389,6 +423,9 @@ def parse_single_shot_responses(responses, index_map, stage_cfg):
                     custom_fields = _extract_custom_fields(pair)
                     if custom_fields:
                         base_row.update(custom_fields)
+                    # Lets incremental runs recognize calls whose questions already exist
+                    if len(index_map[i]) > 3:
+                        base_row["generation_fingerprint"] = _chunk_fingerprint(index_map[i], chunk_id)
                     rows.append(base_row)
                 except Exception as e:
                     logger.error(f"Error parsing QA pair at index {i}: {e}")
@@ -463,6 +500,9 @@ def parse_multi_hop_responses(responses, index_map, stage_cfg):
                     custom_fields = _extract_custom_fields(pair)
                     if custom_fields:
                         base_row.update(custom_fields)
+                    # Lets incremental runs recognize calls whose questions already exist
+                    if len(index_map[i]) > 3:
+                        base_row["generation_fingerprint"] = index_map[i][3]
                     rows.append(base_row)
                 except Exception as e:
                     logger.warning(f"Parse error in multi-hop QA for doc {index_map[i][1]}: {e}")
@@ -0,0 +1,133 @@
+"""Chunk embeddings and k-nearest-neighbour search for similarity-guided multi-hop sampling."""
+
+import re
+import zlib
+from functools import cache
+
+import numpy as np
+
+
+_WORD_RE = re.compile(r"\w+")
+_HASHED_DIM = 512
+# Rows of the query block compared at once, bounding the (block x n) similarity matrix
+_BLOCK_SIZE = 1024
+
+
+def hashed_tfidf_vectors(texts: list[str], dim: int = _HASHED_DIM) -> np.ndarray:
+    """Embed texts as L2-normalized TF-IDF vectors over `dim` hashed word features.
+
+    Words are mapped to features with a signed CRC32 hash, so no vocabulary is kept. IDF is computed
+    over `texts` themselves, which is what matters when comparing the chunks of one document.
+    """
+    rows, cols, values = [], [], []
+    hashed: dict[str, int] = {}
+    for row, text in enumerate(texts):
+        words, counts = np.unique(_WORD_RE.findall(text.lower()), return_counts=True)
+        for word, count in zip(words.tolist(), counts.tolist()):
+            if (h := hashed.get(word)) is None:
+                h = hashed[word] = zlib.crc32(word.encode("utf-8"))
+            rows.append(row)
+            cols.append(h % dim)
+            # The top hash bit picks the sign, so colliding words tend to cancel out
+            values.append((1.0 + np.log(count)) * (1 if h >> 31 else -1))
+
+    vectors = np.zeros((len(texts), dim))
+    if not rows:
+        return vectors
+    rows, cols = np.asarray(rows), np.asarray(cols)
+    np.add.at(vectors, (rows, cols), values)
+
+    # Smoothed IDF per hashed feature, as in scikit-learn
+    df = np.bincount(cols, minlength=dim)
+    vectors *= np.log((1 + len(texts)) / (1 + df)) + 1
+    return _normalize(vectors)
+
+
+def embed_texts(texts: list[str], model_name: str | None = None) -> np.ndarray:
+    """Embed texts on CPU with a sentence-transformers model, or hashed TF-IDF when none is given."""
+    if not model_name:
+        return hashed_tfidf_vectors(texts)
+    return _normalize(np.asarray(_get_sentence_transformer(model_name).encode(texts, batch_size=32)))
+
+
+@cache
+def _get_sentence_transformer(model_name: str):
+    """Load a sentence-transformers model on CPU, once per process."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "embedding_model requires the 'sentence-transformers' package. "
+            "Install it with: pip install 'yourbench[embeddings]'"
+        ) from e
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def nearest_neighbors(vectors: np.ndarray, k: int) -> np.ndarray:
+    """Exact top-`k` cosine neighbours of every row (excluding itself), most similar first.
+
+    `vectors` must be L2-normalized. Results are deterministic for a given input.
+    """
+    n = len(vectors)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64)
+    neighbors = np.empty((n, k), dtype=np.int64)
+    for start in range(0, n, _BLOCK_SIZE):
+        sims = vectors[start : start + _BLOCK_SIZE] @ vectors.T
+        block_rows = np.arange(len(sims))
+        sims[block_rows, block_rows + start] = -np.inf
+        candidates = np.broadcast_to(np.arange(n), sims.shape)
+        neighbors[start : start + len(sims)] = _top_k(sims, candidates, k)
+    return neighbors
+
+
+def approximate_neighbors(vectors: np.ndarray, k: int, rng: np.random.Generator, num_tables: int = 4) -> np.ndarray:
+    """Approximate top-`k` cosine neighbours using SimHash orderings, for large sets of vectors.
+
+    Each table sorts the rows by a random-hyperplane SimHash code; rows close in that order share
+    most code bits and are likely similar. The `2k` rows around each row in every table are the
+    candidates, re-ranked by exact cosine similarity. Cost is O(n * k * num_tables) instead of O(n^2).
+    """
+    n, dim = vectors.shape
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64)
+    offsets = np.concatenate([np.arange(-k, 0), np.arange(1, k + 1)])
+    bit_weights = 1 << np.arange(16, dtype=np.int64)
+
+    candidate_sets = []
+    for _ in range(num_tables):
+        codes = (vectors @ rng.standard_normal((dim, 16)) > 0) @ bit_weights
+        order = np.argsort(codes, kind="stable")
+        position = np.empty(n, dtype=np.int64)
+        position[order] = np.arange(n)
+        candidate_sets.append(order[np.clip(position[:, None] + offsets, 0, n - 1)])
+    candidates = np.sort(np.concatenate(candidate_sets, axis=1), axis=1)
+
+    neighbors = np.empty((n, k), dtype=np.int64)
+    for start in range(0, n, _BLOCK_SIZE):
+        block = candidates[start : start + _BLOCK_SIZE]
+        sims = np.einsum("nd,ncd->nc", vectors[start : start + len(block)], vectors[block])
+        # Drop the row itself and repeated candidates (candidates are sorted, so repeats are adjacent)
+        rows = np.arange(start, start + len(block))[:, None]
+        repeated = np.zeros_like(block, dtype=bool)
+        repeated[:, 1:] = block[:, 1:] == block[:, :-1]
+        sims[(block == rows) | repeated] = -np.inf
+        neighbors[start : start + len(block)] = _top_k(sims, block, k)
+    return neighbors
+
+
+def _top_k(sims: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    """Per row, the `k` candidates with the highest similarity, most similar first."""
+    if k < sims.shape[1]:
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        sims, candidates = np.take_along_axis(sims, part, axis=1), np.take_along_axis(candidates, part, axis=1)
+    order = np.lexsort((candidates, -sims), axis=-1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows, leaving all-zero rows as they are."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)